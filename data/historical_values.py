@@ -1,12 +1,23 @@
 """
 Historical cUSD/cEUR/cREAL price and volume data
+
+The values are read and computed on the first call of historical_values(),
+importing the module doesn't read the data.
 """
+from functools import lru_cache
 import os
+from typing import Any, Dict
 
 import numpy as np
-import pandas as pd
+
 
 def create_dataframes(input_data: str):
+    """
+    Reads the price, market cap and volume data of an asset and its supply
+    """
+    # pylint: disable=import-outside-toplevel
+    import pandas as pd
+
     data_csv = os.path.join(os.path.dirname(__file__), input_data)
     data = pd.read_csv(data_csv, na_values=[0])
     data = data.set_index(['snapped_at'], drop=False)
@@ -16,25 +27,30 @@ def create_dataframes(input_data: str):
     return data
 
 
-# Get df for historical data for CELO and cUSD
-DF_CELO_PRICE_CAP_VOLUME_SUPPLY = create_dataframes(
-    input_data="celo_price_cap_volume.csv")
-DF_CUSD_PRICE_CAP_VOLUME_SUPPLY = create_dataframes(
-    input_data="cusd_price_cap_volume.csv")
-DF_CEUR_PRICE_CAP_VOLUME_SUPPLY = create_dataframes(
-    input_data="cusd_price_cap_volume.csv")
-DF_CREAL_PRICE_CAP_VOLUME_SUPPLY = create_dataframes(
-    input_data="cusd_price_cap_volume.csv")
-
-CELO_PRICE_MEAN = DF_CELO_PRICE_CAP_VOLUME_SUPPLY['price'].mean()
-CELO_SUPPLY_MEAN = DF_CELO_PRICE_CAP_VOLUME_SUPPLY['supply'].mean()
-CUSD_PRICE_MEAN = DF_CUSD_PRICE_CAP_VOLUME_SUPPLY['price'].mean()
-CUSD_SUPPLY_MEAN = DF_CUSD_PRICE_CAP_VOLUME_SUPPLY['supply'].mean()
-CEUR_PRICE_MEAN = DF_CEUR_PRICE_CAP_VOLUME_SUPPLY['price'].mean()
-CEUR_SUPPLY_MEAN = DF_CEUR_PRICE_CAP_VOLUME_SUPPLY['supply'].mean()
-CREAL_PRICE_MEAN = DF_CREAL_PRICE_CAP_VOLUME_SUPPLY['price'].mean()
-CREAL_SUPPLY_MEAN = DF_CREAL_PRICE_CAP_VOLUME_SUPPLY['supply'].mean()
-
-DF_CUSD_PRICE_CAP_VOLUME_SUPPLY['return'] = DF_CUSD_PRICE_CAP_VOLUME_SUPPLY['price'].pct_change()
-CUSD_SUPPLY_RETURNS_VOLA_DAILY = DF_CUSD_PRICE_CAP_VOLUME_SUPPLY['return'] .std()
-CUSD_SUPPLY_RETURNS_VOLA_ANNUALLY = CUSD_SUPPLY_RETURNS_VOLA_DAILY * np.sqrt(365)
+@lru_cache(maxsize=None)
+def historical_values() -> Dict[str, Any]:
+    """
+    Reads the data and computes all historical values once
+    """
+    values = {}
+    # Get df for historical data for CELO and cUSD
+    values["DF_CELO_PRICE_CAP_VOLUME_SUPPLY"] = create_dataframes(
+        input_data="celo_price_cap_volume.csv")
+    values["DF_CUSD_PRICE_CAP_VOLUME_SUPPLY"] = create_dataframes(
+        input_data="cusd_price_cap_volume.csv")
+    values["DF_CEUR_PRICE_CAP_VOLUME_SUPPLY"] = create_dataframes(
+        input_data="cusd_price_cap_volume.csv")
+    values["DF_CREAL_PRICE_CAP_VOLUME_SUPPLY"] = create_dataframes(
+        input_data="cusd_price_cap_volume.csv")
+
+    for asset in ["CELO", "CUSD", "CEUR", "CREAL"]:
+        data = values[f"DF_{asset}_PRICE_CAP_VOLUME_SUPPLY"]
+        values[f"{asset}_PRICE_MEAN"] = data['price'].mean()
+        values[f"{asset}_SUPPLY_MEAN"] = data['supply'].mean()
+
+    cusd_data = values["DF_CUSD_PRICE_CAP_VOLUME_SUPPLY"]
+    cusd_data['return'] = cusd_data['price'].pct_change()
+    values["CUSD_SUPPLY_RETURNS_VOLA_DAILY"] = cusd_data['return'].std()
+    values["CUSD_SUPPLY_RETURNS_VOLA_ANNUALLY"] = (
+        values["CUSD_SUPPLY_RETURNS_VOLA_DAILY"] * np.sqrt(365))
+    return values
@@ -13,7 +13,7 @@ from radcad import Simulation, Experiment, Backend
 from experiments.simulation_configuration import TIMESTEPS, MONTE_CARLO_RUNS
 from model.utils.engine import Engine
 
-from model import model
+from model import model  # pylint: disable=no-name-in-module
 
 # Create Model Simulation
 simulation = Simulation(
@@ -29,6 +29,8 @@ experiment.engine = Engine()
 
 # Configure Simulation & Experiment engine
 simulation.engine = experiment.engine
+# Backend.MULTIPROCESSING runs and sweep subsets in a process pool
 experiment.engine.backend = Backend.SINGLE_PROCESS
 experiment.engine.deepcopy = False
 experiment.engine.drop_substeps = True  # Do not store data for substeps
+experiment.engine.columnar_results = True  # Record results into preallocated columns
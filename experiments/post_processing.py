@@ -2,10 +2,14 @@
 Post processing results
 """
 
+from collections.abc import Mapping
+from typing import Iterator
 import pandas as pd
 from radcad.core import generate_parameter_sweep
 
+from model.state_update_blocks import post_processing_blocks
 from model.system_parameters import parameters as base_parameters, Parameters
+from model.utils.sink import ParquetDataset
 
 
 def assign_parameters(dataframe: pd.DataFrame, parameters: Parameters, set_params=None):
@@ -54,12 +58,42 @@ def post_process(dataframe: pd.DataFrame, drop_timestep_zero=True, parameters=No
         / dataframe['mento_buckets_creal_celo.reserve_asset']
     )
 
+    # Blocks moved out of the simulation are evaluated column-wise
+    for block in post_processing_blocks:
+        dataframe = block["post_process"](dataframe, parameters)
+
     # Drop the initial state for plotting
     if drop_timestep_zero:
         dataframe = dataframe.drop(dataframe.query('timestep == 0').index)
 
     return dataframe
 
+
+def post_process_dataset(dataset: ParquetDataset, drop_timestep_zero=True, parameters=None
+                         ) -> Iterator[pd.DataFrame]:
+    """
+    Lazily applies post_process to every run of a ParquetDataset,
+    only one run is held in memory at a time
+    """
+    for dataframe in dataset:
+        yield post_process(
+            dataframe,
+            drop_timestep_zero=drop_timestep_zero,
+            parameters=parameters
+        )
+
+def as_dict(value):
+    """
+    Converts NamedTuple records like MentoBuckets and mappings like
+    Balance in nested dicts to dicts, so they are expanded to columns as well
+    """
+    if isinstance(value, Mapping):
+        return {key: as_dict(item) for key, item in value.items()}
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        return value._asdict()
+    return value
+
+
 def dict_to_columns(dataframe):
     """
     Expands dicts to columns in a dataframe
@@ -67,9 +101,9 @@ def dict_to_columns(dataframe):
     :return: pandas dataframe
     """
     for column in dataframe:
-        if isinstance(dataframe[column][0], dict):
+        if isinstance(dataframe[column][0], Mapping):
             expanded_dicts = pd.json_normalize(
-                dataframe[column]
+                [as_dict(value) for value in dataframe[column]]
             ).add_prefix(f"{dataframe[column].name}_")
             dataframe = pd.concat([dataframe, expanded_dicts], axis=1)
             dataframe = dataframe.drop(columns=column)
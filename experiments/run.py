@@ -8,7 +8,8 @@ import time
 import pandas as pd
 
 from experiments.default_experiment import experiment
-from experiments.post_processing import post_process
+from experiments.post_processing import post_process, post_process_dataset
+from model.utils.sink import ParquetDataset
 
 # Configure logging framework
 # e.g. Use logging.info(...) to log to log file
@@ -23,7 +24,9 @@ logger.addHandler(handler)
 
 def run(executable=experiment):
     """
-    executes experiment
+    executes experiment, if the engine streams results to a ParquetSink
+    the post processed results are returned as a lazy iterator of
+    dataframes, one per run and subset
     """
     logging.info("Running experiment")
     start_time = time.time()
@@ -35,14 +38,15 @@ def run(executable=experiment):
 
     logging.info("Post-processing results")
 
-    df = pd.DataFrame(executable.results)
-
     try:
         parameters = executable.simulations[0].model.params
     except:
         parameters = executable.model.params
 
-    df = post_process(df, parameters=parameters)
+    if isinstance(executable.results, ParquetDataset):
+        df = post_process_dataset(executable.results, parameters=parameters)
+    else:
+        df = post_process(pd.DataFrame(executable.results), parameters=parameters)
 
     post_processing_duration = time.time() - start_time - experiment_duration
     logging.info(f"Post-processing complete in {post_processing_duration} seconds")
@@ -3,7 +3,9 @@ Default simulation_configuration configuration such as the number of timesteps a
 """
 from model.constants import blocks_per_day, blocks_per_year
 
-BLOCKS_PER_TIMESTEP = 1  # number of blocks per timestep (=1 if sim on per-block-basis)
+# number of blocks per timestep (=1 if sim on per-block-basis),
+# e.g. 12 for 1-minute or 720 for 1-hour timesteps, see ASSUMPTIONS.md
+BLOCKS_PER_TIMESTEP = 1
 SIMULATION_TIME_DAYS = 2  # number of days
 # number of simulation_configuration timesteps
 TIMESTEPS = SIMULATION_TIME_DAYS * blocks_per_day // BLOCKS_PER_TIMESTEP
@@ -11,3 +13,16 @@ TIMESTEPS_PER_YEAR = blocks_per_year // BLOCKS_PER_TIMESTEP
 MONTE_CARLO_RUNS = 2  # number of runs
 DATA_SOURCE = 'historical'   # 'mock' or 'historical'
 TOTAL_BLOCKS = (BLOCKS_PER_TIMESTEP * TIMESTEPS) + 1
+# recompute incrementally maintained totals (e.g. the tracked floating
+# supply) on every access and check them, slow, for debugging only
+CHECK_INVARIANTS = False
+# store arbitrage traders in the struct of arrays AccountRegistry
+# instead of one Trader object each, for large trader populations
+ACCOUNT_REGISTRY = False
+# compute the reserve statistics column-wise in post processing instead
+# of in a state update block on every timestep, see ASSUMPTIONS.md
+POST_PROCESS_RESERVE_STATISTICS = False
+# folder to persist the generated QuantLib and NumPy GBM market increments
+# in, shared by worker processes and experiments, or None to only keep
+# them in memory for the subsets of an experiment
+MARKET_INCREMENTS_FOLDER = None
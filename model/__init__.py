@@ -1,18 +1,26 @@
 """
 Mento2 Model
+
+The radCAD model is created on first access of `model.model`,
+importing the package or one of its modules doesn't build it.
 """
 __version__ = "0.0.1"
 
-from radcad import Model
 
-from model.system_parameters import parameters
-from model.state_variables import initial_state
-from model.state_update_blocks import state_update_blocks
+def __getattr__(name):
+    if name == "model":
+        # pylint: disable=import-outside-toplevel
+        from radcad import Model
 
+        from model.system_parameters import parameters
+        from model.state_variables import initial_state
+        from model.state_update_blocks import state_update_blocks
 
-# Instantiate a new Model
-model = Model(
-    params=parameters,
-    initial_state=initial_state,
-    state_update_blocks=state_update_blocks
-)
+        # Instantiate a new Model
+        globals()["model"] = Model(
+            params=parameters,
+            initial_state=initial_state,
+            state_update_blocks=state_update_blocks
+        )
+        return globals()["model"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -29,3 +29,11 @@ class Account():
         self.account_id = account_id
         self.account_name = account_name
         self.balance = balance
+
+    def transfer(self, delta: Balance):
+        """
+        Adds delta to the balance and lets the generator
+        update its running floating supply total
+        """
+        self.balance += delta
+        self.parent.balance_changed(self, delta)
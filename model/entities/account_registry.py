@@ -0,0 +1,177 @@
+"""
+AccountRegistry stores the traders of large populations as rows of
+contiguous NumPy columns instead of one Trader object per account.
+RegisteredTrader is a lightweight view of a single row for the per-trader
+code, views hold no state of their own and are created on demand.
+"""
+# pylint: disable=too-many-instance-attributes
+from typing import TYPE_CHECKING, Dict, List
+from uuid import UUID
+import numpy as np
+
+from model.entities import strategies
+from model.entities.balance import Balance
+from model.entities.trader import Trader
+from model.generators.mento import MentoExchangeGenerator
+from model.types.base import CURRENCIES, MentoExchange, TraderType
+from model.types.configs import TraderConfig
+
+if TYPE_CHECKING:
+    from model.generators.accounts import AccountGenerator
+
+# Trader types whose strategies don't keep per-trader state,
+# other traders (e.g. random traders and their order books) stay objects
+REGISTERED_TRADER_TYPES = {TraderType.ARBITRAGE_TRADER}
+
+TRADER_TYPES = list(TraderType)
+EXCHANGES = list(MentoExchange)
+
+
+class AccountRegistry():
+    """
+    Struct of arrays holding the balances, trader type, exchange and
+    acting frequency of every registered account. Only the first `size`
+    rows of the columns are in use, the columns grow by doubling.
+    """
+    size: int
+    account_ids: List[UUID]
+    rows_by_id: Dict[UUID, int]
+    configs: List[TraderConfig]
+    balances: np.ndarray
+    holdings: np.ndarray
+    trader_type: np.ndarray
+    exchange: np.ndarray
+    acting_frequency: np.ndarray
+    config: np.ndarray
+
+    def __init__(self):
+        self.size = 0
+        self.account_ids = []
+        self.rows_by_id = {}
+        self.configs = []
+        self.balances = np.zeros((0, len(CURRENCIES)))
+        # which currencies a balance holds, see Balance.present
+        self.holdings = np.zeros((0, len(CURRENCIES)), dtype=bool)
+        self.trader_type = np.zeros(0, dtype=np.int8)
+        self.exchange = np.zeros(0, dtype=np.int8)
+        self.acting_frequency = np.zeros(0, dtype=np.int64)
+        self.config = np.zeros(0, dtype=np.int32)
+
+    def grow(self, rows: int):
+        """
+        Grows the columns to hold at least `rows` rows
+        """
+        capacity = len(self.trader_type)
+        if rows <= capacity:
+            return
+        capacity = max(rows, 2 * capacity)
+        for column in ["balances", "holdings", "trader_type",
+                       "exchange", "acting_frequency", "config"]:
+            values = getattr(self, column)
+            grown = np.zeros((capacity, *values.shape[1:]), dtype=values.dtype)
+            grown[:self.size] = values[:self.size]
+            setattr(self, column, grown)
+
+    def add(self, account_ids: List[UUID], config: TraderConfig) -> np.ndarray:
+        """
+        Registers accounts with the initial balance of their config and returns
+        their rows. An account with an id that's already registered is replaced
+        in place, like accounts_by_id would replace it. The acting frequency
+        is set by the caller, as it's defined by the strategy.
+        """
+        if config not in self.configs:
+            self.configs.append(config)
+        rows = []
+        for account_id in account_ids:
+            row = self.rows_by_id.get(account_id)
+            if row is None:
+                row = self.rows_by_id[account_id] = len(self.account_ids)
+                self.account_ids.append(account_id)
+            rows.append(row)
+        self.grow(len(self.account_ids))
+        self.size = len(self.account_ids)
+
+        rows = np.array(rows, dtype=np.int64)
+        self.balances[rows] = config.balance.vector
+        self.holdings[rows] = config.balance.present
+        self.trader_type[rows] = TRADER_TYPES.index(config.trader_type)
+        self.exchange[rows] = EXCHANGES.index(config.exchange)
+        self.config[rows] = self.configs.index(config)
+        return rows
+
+    def balance(self, row: int) -> Balance:
+        return Balance.from_vector(self.balances[row].copy(), self.holdings[row].copy())
+
+    def set_balance(self, row: int, balance: Balance):
+        self.balances[row] = balance.vector
+        self.holdings[row] = balance.present
+
+    def total_balance(self) -> Balance:
+        return Balance.from_vector(
+            np.add.reduce(self.balances[:self.size], axis=0),
+            np.logical_or.reduce(self.holdings[:self.size], axis=0),
+        )
+
+    def view(self, parent: "AccountGenerator", row: int) -> "RegisteredTrader":
+        return RegisteredTrader(parent, self, row)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the columns, excluding the account id index
+        """
+        return sum(
+            getattr(self, column).nbytes
+            for column in ["balances", "holdings", "trader_type",
+                           "exchange", "acting_frequency", "config"]
+        )
+
+
+class RegisteredTrader(Trader):
+    """
+    View of a trader stored in an AccountRegistry row, balance updates
+    are written to the registry. The strategy is built on access, which
+    is fine for the registered trader types as their strategies don't
+    keep state between accesses.
+    """
+    registry: AccountRegistry
+    row: int
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, parent: "AccountGenerator", registry: AccountRegistry, row: int):
+        self.parent = parent
+        self.registry = registry
+        self.row = row
+
+    @property
+    def account_id(self) -> UUID:
+        return self.registry.account_ids[self.row]
+
+    @property
+    def config(self) -> TraderConfig:
+        return self.registry.configs[self.registry.config[self.row]]
+
+    @property
+    def rngp(self):
+        return self.parent.rngp
+
+    @property
+    def mento(self) -> MentoExchangeGenerator:
+        return self.parent.container.get(MentoExchangeGenerator)
+
+    @property
+    def exchange_config(self):
+        return self.mento.configs.get(self.config.exchange)
+
+    @property
+    def strategy(self) -> strategies.TraderStrategy:
+        strategy_class = getattr(strategies, self.config.trader_type.value)
+        return strategy_class(self)
+
+    @property
+    def balance(self) -> Balance:
+        return self.registry.balance(self.row)
+
+    @balance.setter
+    def balance(self, balance: Balance):
+        self.registry.set_balance(self.row, balance)
@@ -0,0 +1,173 @@
+"""
+ArbitrageCohort evaluates all arbitrage traders of a single
+Mento exchange in one fused substep.
+"""
+from typing import TYPE_CHECKING, List
+import numpy as np
+
+from model.entities.strategies.strategy_arbitrage_trader import TradingRegime
+from model.types.base import CURRENCY_INDEX, MentoExchange
+from model.types.pair import Pair
+from model.utils.timesteps import events_in_timestep
+
+if TYPE_CHECKING:
+    from model.entities.account_registry import AccountRegistry
+    from model.entities.trader import Trader
+    from model.generators.accounts import AccountGenerator
+
+
+class ArbitrageCohort():
+    """
+    Batched arbitrage engine for the ArbitrageTrading traders of one exchange.
+    Acting masks, budgets and volume caps are evaluated with NumPy across
+    the whole cohort. Bucket updates are applied sequentially in the order
+    the traders would have acted in separate substeps, which keeps the
+    results identical to the per-trader state update blocks.
+    As soon as the exchange is arbitrage-free every remaining trader passes,
+    so the sequential part is proportional to the number of trades,
+    not the number of traders.
+    """
+    parent: "AccountGenerator"
+    traders: List["Trader"]
+    exchange: MentoExchange
+
+    def __init__(self, parent: "AccountGenerator", traders: List["Trader"]):
+        assert traders, "An ArbitrageCohort needs at least one trader"
+        self.parent = parent
+        self.traders = traders
+        self.exchange = traders[0].config.exchange
+        self.exchange_config = traders[0].exchange_config
+        self.mento = traders[0].mento
+        # the closed form arbitrage only depends on the exchange,
+        # so one strategy serves the whole cohort
+        self.strategy = traders[0].strategy
+        self.acting_frequency = np.array([
+            trader.strategy.acting_frequency for trader in traders
+        ])
+        self.acting_frequencies = np.unique(self.acting_frequency).tolist()
+
+    def balances(self, indices, currency) -> np.ndarray:
+        """
+        Balances of a currency of the traders at the given cohort indices
+        """
+        return np.array([self.traders[index].balance.get(currency) for index in indices])
+
+    def trader(self, index) -> "Trader":
+        return self.traders[index]
+
+    def acts_on(self, timestep) -> bool:
+        """
+        Activation schedule of the cohort, i.e. whether any of its traders can act
+        """
+        return any(
+            events_in_timestep(timestep, frequency) > 0 for frequency in self.acting_frequencies
+        )
+
+    def execute(self, params, prev_state):
+        """
+        Executes the arbitrage trades of the cohort for one timestep
+        """
+        no_trades = {
+            "mento_buckets": prev_state["mento_buckets"],
+            "floating_supply": prev_state["floating_supply"],
+            "reserve_balance": prev_state["reserve_balance"],
+        }
+
+        acting = np.flatnonzero(
+            events_in_timestep(prev_state["timestep"], self.acting_frequency) > 0)
+        market_price = self.market_price(prev_state)
+        spread = self.exchange_config.spread
+        regime = self.trading_regime(prev_state["mento_buckets"][self.exchange], market_price)
+        if acting.size == 0 or regime == TradingRegime.PASS:
+            return no_trades
+
+        stable = self.exchange_config.stable
+        reserve_asset = self.exchange_config.reserve_asset
+        balance_stable = self.balances(acting, stable)
+        balance_reserve_asset = self.balances(acting, reserve_asset)
+        adv_sell_stable = params["average_daily_volume"].get(
+            Pair(reserve_asset, self.exchange_config.reference_fiat))
+        adv_sell_reserve_asset = params["average_daily_volume"].get(
+            Pair(stable, self.exchange_config.reference_fiat))
+        # Budgets only depend on the trader's own balance, which doesn't
+        # change before the trader acts, so they can be computed upfront.
+        max_sell_stable = np.minimum(
+            balance_stable + market_price * balance_reserve_asset,
+            adv_sell_stable)
+        max_sell_reserve_asset = np.minimum(
+            balance_reserve_asset + balance_stable / market_price,
+            adv_sell_reserve_asset)
+
+        state = dict(prev_state)
+        for position, index in enumerate(acting):
+            buckets = state["mento_buckets"][self.exchange]
+            regime = self.trading_regime(buckets, market_price)
+            if regime == TradingRegime.PASS:
+                break
+            if regime == TradingRegime.SELL_STABLE:
+                sell_amount = min(
+                    self.strategy.optimal_sell_amount(
+                        buckets.stable, buckets.reserve_asset, market_price, spread),
+                    max_sell_stable[position]
+                )
+            else:
+                sell_amount = min(
+                    self.strategy.optimal_sell_amount(
+                        buckets.reserve_asset, buckets.stable, 1 / market_price, spread),
+                    max_sell_reserve_asset[position]
+                )
+            if sell_amount == 0:
+                continue
+            order = {
+                "sell_amount": float(sell_amount),
+                "sell_reserve_asset": regime == TradingRegime.SELL_RESERVE_ASSET,
+            }
+            state["mento_buckets"] = state["mento_buckets"].replace(
+                self.exchange, self.trader(index).execute_order(order, state))
+
+        return {
+            "mento_buckets": state["mento_buckets"],
+            "floating_supply": self.parent.floating_supply,
+            "reserve_balance": self.parent.reserve.balance,
+        }
+
+    def trading_regime(self, buckets, market_price) -> TradingRegime:
+        """
+        Same regime evaluation as ArbitrageTrading.trading_regime
+        for a given bucket and market price
+        """
+        mento_price = buckets.stable / buckets.reserve_asset
+        spread = self.exchange_config.spread
+        if market_price * (1 - spread) > mento_price:
+            return TradingRegime.SELL_STABLE
+        if market_price / (1 - spread) < mento_price:
+            return TradingRegime.SELL_RESERVE_ASSET
+        return TradingRegime.PASS
+
+    def market_price(self, prev_state) -> float:
+        return self.strategy.market_price(prev_state)
+
+
+class RegisteredArbitrageCohort(ArbitrageCohort):
+    """
+    ArbitrageCohort of traders stored in an AccountRegistry. Budgets are
+    read from the registry columns and only the traders that trade are
+    materialised as RegisteredTrader views, `traders` only holds the view
+    of the first trader the cohort's strategy is built from.
+    """
+    registry: "AccountRegistry"
+    rows: np.ndarray
+
+    def __init__(self, parent: "AccountGenerator", registry: "AccountRegistry", rows: np.ndarray):
+        assert rows.size, "An ArbitrageCohort needs at least one trader"
+        super().__init__(parent, [registry.view(parent, rows[0])])
+        self.registry = registry
+        self.rows = rows
+        self.acting_frequency = registry.acting_frequency[rows]
+        self.acting_frequencies = np.unique(self.acting_frequency).tolist()
+
+    def balances(self, indices, currency) -> np.ndarray:
+        return self.registry.balances[self.rows[indices], CURRENCY_INDEX[currency]]
+
+    def trader(self, index) -> "Trader":
+        return self.registry.view(self.parent, self.rows[index])
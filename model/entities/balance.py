@@ -4,24 +4,45 @@ Balance class for easy balance manipulation
 Balance.zero() == Balance(celo=0, cusd=0)
 Balance(celo=2, cusd=10) + Balance(celo=5, cusd=0) = Balance(celo=7, cusd=10)
 """
-from typing import Callable, Dict, TYPE_CHECKING
+from collections.abc import MutableMapping
+from typing import Dict, Iterable, TYPE_CHECKING
 
-from model.types.base import Fiat
+import numpy as np
+
+from model.types.base import CURRENCIES, CURRENCY_INDEX, Fiat
 from model.types.pair import Pair
 if TYPE_CHECKING:
     from model.types.base import Currency
 
+USD_PAIRS = [Pair(currency, Fiat.USD) for currency in CURRENCIES]
+
 
-class Balance(dict):
+class Balance(MutableMapping):
     """
     Balance class holds various token balances and overloads
     addition and subtraction to make it easy to handle deltas.
+
+    The amounts live in a fixed length vector indexed by the global
+    currency enumeration (CURRENCY_INDEX) next to a mask of the currencies
+    the balance holds, so arithmetic is a single vector operation while the
+    balance still behaves like a dict of the currencies it holds.
     """
-    values: Dict["Currency", float]
+    __slots__ = ("vector", "present")
+    vector: np.ndarray
+    present: np.ndarray
 
     def __init__(self, initial_values: Dict["Currency", float] = None):
-        super().__init__()
-        self.update(initial_values or {})
+        self.vector = np.zeros(len(CURRENCIES))
+        self.present = np.zeros(len(CURRENCIES), dtype=bool)
+        for currency, value in (initial_values or {}).items():
+            self[currency] = value
+
+    @classmethod
+    def from_vector(cls, vector: np.ndarray, present: np.ndarray) -> "Balance":
+        balance = cls.__new__(cls)
+        balance.vector = vector
+        balance.present = present
+        return balance
 
     def __str__(self) -> str:
         values = ", ".join([
@@ -30,31 +51,87 @@ class Balance(dict):
         ])
         return f"Balance({values})"
 
+    __repr__ = __str__
+
+    def __getitem__(self, currency: "Currency") -> float:
+        index = CURRENCY_INDEX[currency]
+        if not self.present[index]:
+            raise KeyError(currency)
+        return self.vector.item(index)
+
+    def get(self, key: "Currency", default=None):
+        index = CURRENCY_INDEX[key]
+        return self.vector.item(index) if self.present[index] else default
+
+    def __setitem__(self, currency: "Currency", value: float):
+        index = CURRENCY_INDEX[currency]
+        self.vector[index] = value
+        self.present[index] = True
+
+    def __delitem__(self, currency: "Currency"):
+        index = CURRENCY_INDEX[currency]
+        if not self.present[index]:
+            raise KeyError(currency)
+        self.vector[index] = 0
+        self.present[index] = False
+
+    def __iter__(self):
+        return (CURRENCIES[index] for index in self.present.nonzero()[0].tolist())
+
+    def __len__(self) -> int:
+        return int(self.present.sum())
+
+    def __contains__(self, currency) -> bool:
+        index = CURRENCY_INDEX.get(currency)
+        return index is not None and bool(self.present[index])
+
+    def items(self):
+        indices = self.present.nonzero()[0]
+        return zip([CURRENCIES[index] for index in indices.tolist()], self.vector[indices].tolist())
+
+    def values(self):
+        return self.vector[self.present].tolist()
+
+    def copy(self) -> "Balance":
+        return Balance.from_vector(self.vector.copy(), self.present.copy())
+
     @staticmethod
     def zero():
         return Balance()
 
+    @staticmethod
+    def total(balances: Iterable["Balance"]) -> "Balance":
+        """
+        Sum of many balances as a single reduction over
+        the matrix of their vectors
+        """
+        balances = list(balances)
+        if not balances:
+            return Balance.zero()
+        return Balance.from_vector(
+            np.add.reduce([balance.vector for balance in balances], axis=0),
+            np.logical_or.reduce([balance.present for balance in balances], axis=0),
+        )
+
+    @staticmethod
+    def __as_balance__(other) -> "Balance":
+        return other if isinstance(other, Balance) else Balance(other)
+
     def __add__(self, other: "Balance"):
-        return self.__combine__(other, lambda a, b: a + b)
+        other = self.__as_balance__(other)
+        return Balance.from_vector(self.vector + other.vector, self.present | other.present)
 
     def __sub__(self, other: "Balance"):
-        return self.__combine__(other, lambda a, b: a - b)
-
-    def __combine__(self, other: "Balance", combinator: Callable[[int, int], int]):
-        return Balance({
-            currency: combinator(self.get(currency, 0), other.get(currency, 0))
-            for currency in set(self.keys()).union(other.keys())
-        })
+        other = self.__as_balance__(other)
+        return Balance.from_vector(self.vector - other.vector, self.present | other.present)
 
     def values_in_usd(self, prev_state):
+        indices = self.present.nonzero()[0]
         values_in_usd = {
-            key: inventory * Pair(key, Fiat.USD).get_rate(prev_state).value
-            for key, inventory in self.items()}
+            CURRENCIES[index]: inventory * USD_PAIRS[index].get_rate(prev_state).value
+            for index, inventory in zip(indices.tolist(), self.vector[indices].tolist())}
         return values_in_usd
 
     @property
     def any_negative(self) -> bool:
-        for (_, value) in self.items():
-            if value < 0:
-                return True
-        return False
+        return bool((self.vector[self.present] < 0).any())
@@ -36,7 +36,7 @@ class ArbitrageTrading(TraderStrategy):
         and market price
         """
         mento_buckets = self.mento_buckets(prev_state)
-        mento_price = mento_buckets['stable'] / mento_buckets['reserve_asset']
+        mento_price = mento_buckets.stable / mento_buckets.reserve_asset
         market_price = self.market_price(prev_state)
 
         price_up_profit = (
@@ -66,25 +66,25 @@ class ArbitrageTrading(TraderStrategy):
         if self.trading_regime(prev_state) == TradingRegime.SELL_STABLE:
             self.expressions["profit"] = (
                 -1 * self.variables["sell_amount"]
-                * mento_buckets['reserve_asset']
+                * mento_buckets.reserve_asset
                 * (1 - spread)
-                / mento_buckets['stable']
+                / mento_buckets.stable
                 + (1 - spread) * self.variables["sell_amount"]
                 + market_price * self.variables["sell_amount"]
             )
         elif self.trading_regime(prev_state) == TradingRegime.SELL_RESERVE_ASSET:
             self.expressions["profit"] = (
                 -self.variables["sell_amount"]
-                * mento_buckets['stable']
+                * mento_buckets.stable
                 * (1 - spread)
-                / mento_buckets['reserve_asset']
+                / mento_buckets.reserve_asset
                 + (1 - spread) * self.variables["sell_amount"]
                 + 1 / market_price * self.variables["sell_amount"]
             )
 
     def trader_passes_step(self, _params, prev_state):
         return (self.trading_regime(prev_state) == "PASS") or \
-               (prev_state["timestep"] % self.acting_frequency != 0)
+               not self.acts_on(prev_state["timestep"])
 
     # # pylint: disable=attribute-defined-outside-init
     def calculate(self, _params, prev_state):
@@ -94,7 +94,7 @@ class ArbitrageTrading(TraderStrategy):
         market_price = self.market_price(prev_state)
         mento_buckets = self.mento_buckets(prev_state)
         spread = self.exchange_config.spread
-        mento_price = mento_buckets['stable'] / mento_buckets['reserve_asset']
+        mento_price = mento_buckets.stable / mento_buckets.reserve_asset
 
         if market_price * (1 - spread) > mento_price:
             self.sell_order_stable(
@@ -121,8 +121,8 @@ class ArbitrageTrading(TraderStrategy):
 
         max_budget_stable = balance_stable + market_price * balance_reserve_asset
         sell_amount = self.optimal_sell_amount(
-            buckets['stable'],
-            buckets['reserve_asset'],
+            buckets.stable,
+            buckets.reserve_asset,
             market_price,
             spread
         )
@@ -148,8 +148,8 @@ class ArbitrageTrading(TraderStrategy):
 
         max_budget_celo = balance_reserve_asset + balance_stable / market_price
         sell_amount = self.optimal_sell_amount(
-            buckets['reserve_asset'],
-            buckets['stable'],
+            buckets.reserve_asset,
+            buckets.stable,
             1 / market_price,
             spread
         )
@@ -1,7 +1,6 @@
 """
 Strategy: Random Trader
 """
-from cvxpy import Variable
 import numpy as np
 
 from experiments import simulation_configuration
@@ -16,15 +15,16 @@ class RandomTrading(TraderStrategy):
     def __init__(self, parent, acting_frequency=1):
         # The following is used to define the strategy and needs to be provided in subclass
         super().__init__(parent, acting_frequency)
+        self.rng = parent.rngp.get_rng("RandomTrader", self.parent.account_id)
         self.generate_sell_amounts()
         self.sell_amount = None
-        self.rng = parent.rngp.get_rng("RandomTrader", self.parent.account_id)
 
     def sell_reserve_asset(self, _params, prev_state):
         return self.orders[prev_state["timestep"]]["sell_reserve_asset"]
 
     def define_variables(self):
-        self.variables["sell_amount"] = Variable(pos=True)
+        import cvxpy  # pylint: disable=import-outside-toplevel
+        self.variables["sell_amount"] = cvxpy.Variable(pos=True)
 
     def define_expressions(self, params, prev_state):
         """
@@ -39,29 +39,25 @@ class RandomTrading(TraderStrategy):
         self.objective_function = self.variables["sell_amount"]
         self.optimization_direction = "maximize"
 
-    def define_constraints(self, params, prev_state):
+    def problem_key(self, _params, _prev_state):
+        return None
+
+    def update_parameters(self, params, prev_state):
         """
-        Defines and returns the constraints under which the optimization is conducted
+        Bounds the sell amount by the budget and the random order size
         """
-        self.constraints = []
         # TODO: Get budget based on account
         max_budget_stable = self.parent.balance.get(self.stable)
         max_budget_reserve_asset = self.parent.balance.get(self.reserve_asset)
         if self.sell_reserve_asset(params, prev_state):
-            self.constraints.append(
-                self.variables["sell_amount"]
-                <= min(
-                    max_budget_reserve_asset,
-                    self.orders[prev_state["timestep"]]["sell_amount"]
-                )
+            self.parameters["max_budget"].value = min(
+                max_budget_reserve_asset,
+                self.orders[prev_state["timestep"]]["sell_amount"]
             )
         else:
-            self.constraints.append(
-                self.variables["sell_amount"]
-                <= min(
-                    max_budget_stable,
-                    self.orders[prev_state["timestep"]]["sell_amount"]
-                )
+            self.parameters["max_budget"].value = min(
+                max_budget_stable,
+                self.orders[prev_state["timestep"]]["sell_amount"]
             )
 
     def generate_sell_amounts(
@@ -70,15 +66,23 @@ class RandomTrading(TraderStrategy):
         timesteps=simulation_configuration.TIMESTEPS,
     ):
         """
-        This function generates lognormal returns
+        This function generates lognormal returns, one order per block.
+        The orders of the blocks within a timestep are netted into a single order.
         """
         # timesteps_per_year = constants.blocks_per_year // blocks_per_timestep
         sample_size = timesteps * blocks_per_timestep + 1
         # TODO parametrise random params incl. seed
         sell_gold = self.rng.binomial(1, 0.5, sample_size)
-        orders = np.vstack(
-            [sell_gold, np.abs(self.rng.normal(100, 5, size=sample_size))]
-        )
+        sell_amount = np.abs(self.rng.normal(100, 5, size=sample_size))
+        if blocks_per_timestep > 1:
+            signed_amount = np.where(sell_gold, sell_amount, -sell_amount)
+            net_amount = np.concatenate([
+                signed_amount[:1],
+                signed_amount[1:].reshape(timesteps, blocks_per_timestep).sum(axis=1)
+            ])
+            sell_gold = (net_amount > 0).astype(int)
+            sell_amount = np.abs(net_amount)
+        orders = np.vstack([sell_gold, sell_amount])
         self.orders = np.core.records.fromarrays(
             orders, names=["sell_reserve_asset", "sell_amount"]
         )
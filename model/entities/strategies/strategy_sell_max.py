@@ -1,7 +1,7 @@
 """
 Sell Max Strategy
 """
-from cvxpy import Variable
+from model.types.pair import Pair
 from .trader_strategy import TraderStrategy
 
 class SellMax(TraderStrategy):
@@ -18,40 +18,57 @@ class SellMax(TraderStrategy):
         # Arb trade will sell reserve_asset if market price > mento price
         mento_buckets = self.mento_buckets(prev_state)
         return (
-            prev_state["market_price"].get(self.reserve_asset).get(self.reference_fiat)
+            prev_state["market_price"].get(Pair(self.reserve_asset, self.reference_fiat))
             < (1 - self.exchange_config.spread)
-            * mento_buckets['stable']
-            / mento_buckets['reserve_asset']
+            * mento_buckets.stable
+            / mento_buckets.reserve_asset
         )
 
     def define_variables(self):
-        self.variables["sell_amount"] = Variable(pos=True)
+        import cvxpy  # pylint: disable=import-outside-toplevel
+        self.variables["sell_amount"] = cvxpy.Variable(pos=True)
+
+    def define_parameters(self):
+        import cvxpy  # pylint: disable=import-outside-toplevel
+        super().define_parameters()
+        self.parameters["bucket_stable"] = cvxpy.Parameter()
+        self.parameters["bucket_reserve_asset"] = cvxpy.Parameter()
+        self.parameters["spread"] = cvxpy.Parameter()
+
+    def update_parameters(self, params, prev_state):
+        mento_buckets = self.mento_buckets(prev_state)
+        # TODO: Get budget based on account
+        self.parameters["max_budget"].value = 10000
+        self.parameters["bucket_stable"].value = mento_buckets.stable
+        self.parameters["bucket_reserve_asset"].value = mento_buckets.reserve_asset
+        self.parameters["spread"].value = self.exchange_config.spread
 
     def define_expressions(self, params, prev_state):
         """
         Can be used as part of the objective and/or as constraints
         """
-        mento_buckets = self.mento_buckets(prev_state)
-        spread = self.exchange_config.spread
+        bucket_stable = self.parameters["bucket_stable"]
+        bucket_reserve_asset = self.parameters["bucket_reserve_asset"]
+        spread = self.parameters["spread"]
 
         if self.sell_reserve_asset(params, prev_state):
             nominator = (
-                mento_buckets['reserve_asset'] * mento_buckets['stable']
+                bucket_reserve_asset * bucket_stable
             )
             denominator = (
-                mento_buckets['reserve_asset'] + self.variables["sell_amount"]
+                bucket_reserve_asset + self.variables["sell_amount"]
             ) * (
-                mento_buckets['reserve_asset'] - self.variables["sell_amount"] * (spread - 1)
+                bucket_reserve_asset - self.variables["sell_amount"] * (spread - 1)
             )
         else:
             nominator = (
-                mento_buckets['stable'] + self.variables["sell_amount"]
+                bucket_stable + self.variables["sell_amount"]
             ) * (
-                mento_buckets['stable']
+                bucket_stable
                 - self.variables["sell_amount"] * (spread - 1)
             )
             denominator = (
-                mento_buckets['reserve_asset'] * mento_buckets['stable']
+                bucket_reserve_asset * bucket_stable
             )
 
         oracle_rate_after_trade = nominator / denominator
@@ -66,13 +83,3 @@ class SellMax(TraderStrategy):
         """
         self.objective_function = self.variables["sell_amount"]
         self.optimization_direction = "maximize"
-
-    def define_constraints(self, params, prev_state):
-        self.constraints = []
-        # TODO: Get budget based on account
-        max_budget_stable = 10000
-        max_budget_reserve_asset = 10000
-        if self.sell_reserve_asset(params, prev_state):
-            self.constraints.append(self.variables["sell_amount"] <= max_budget_reserve_asset)
-        else:
-            self.constraints.append(self.variables["sell_amount"] <= max_budget_stable)
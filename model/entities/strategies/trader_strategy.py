@@ -8,26 +8,48 @@
   inside of solve() but the
  objective_function and the constraints should still be specified for completeness!
 """
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Dict, Hashable, NamedTuple, Optional
 import logging
-from cvxpy import Maximize, Minimize, Problem, Variable
-import cvxpy
 
 from model.types.base import MentoBuckets
 from model.types.pair import Pair
 from model.types.configs import MentoExchangeConfig
+from model.utils.timesteps import events_in_timestep
 if TYPE_CHECKING:
+    import cvxpy
     from model.entities.trader import Trader
 
+# cvxpy is imported by the methods building and solving problems,
+# so strategies solved in closed form don't import it
+# pylint: disable=import-outside-toplevel
+
+
+class CompiledProblem(NamedTuple):
+    """
+    A cvxpy problem compiled once per trader and problem structure,
+    only its parameters change between solves.
+    """
+    problem: "cvxpy.Problem"
+    variables: Dict[str, "cvxpy.Variable"]
+    parameters: Dict[str, "cvxpy.Parameter"]
+    expressions: Dict[str, "cvxpy.Expression"]
+    # Set if the problem is `maximize x s.t. x <= bound`
+    # in which case it's solved in closed form
+    bound: Optional["cvxpy.Parameter"]
+
 
 class TraderStrategy:
     """
     Base trader strategy class to solve a convex optimisation problem.
     Subclasses are responsible for defining the strategy via constraints.
 
+    The problem is defined in terms of cvxpy Parameters and compiled once per
+    problem_key, on every acting timestep only update_parameters is called
+    before re-solving the cached problem.
     """
     parent: "Trader"
     exchange_config: MentoExchangeConfig
+    problems: Dict[Hashable, CompiledProblem]
 
     def __init__(self, parent: "Trader", acting_frequency):
         self.parent = parent
@@ -37,10 +59,12 @@ class TraderStrategy:
         # The following is used to define the strategy and needs to be
         #  provided in subclass
         self.variables = {}
+        self.parameters = {}
         self.expressions = {}
         self.objective_function = None
         self.optimization_direction = None
         self.constraints = []
+        self.problems = {}
         # TODO order vs sell_amount ???
         self.sell_amount = None
         self.order = None
@@ -69,8 +93,34 @@ class TraderStrategy:
         """
         raise NotImplementedError("Subclasses must implement sell_reserve_asset()")
 
+    def problem_key(self, params, prev_state) -> Hashable:
+        """
+        Identifies the structure of the optimisation problem, a problem
+        is compiled once for every key. Subclasses whose expressions
+        don't depend on the trade direction can return a constant.
+        """
+        return self.sell_reserve_asset(params, prev_state)
+
     def define_variables(self):
-        self.variables["sell_amount"] = Variable(pos=True)
+        import cvxpy
+        self.variables["sell_amount"] = cvxpy.Variable(pos=True)
+
+    def define_parameters(self):
+        """
+        Defines the cvxpy Parameters that are updated before every solve
+        """
+        import cvxpy
+        self.parameters["max_budget"] = cvxpy.Parameter()
+
+    def update_parameters(self, params, prev_state):
+        """
+        Sets the values of the cvxpy Parameters for the current timestep
+        """
+        # TODO: Get budget based on account
+        if self.sell_reserve_asset(params, prev_state):
+            self.parameters["max_budget"].value = self.parent.balance.get(self.reserve_asset)
+        else:
+            self.parameters["max_budget"].value = self.parent.balance.get(self.stable)
 
     def define_expressions(self, _params, _prev_state):
         """
@@ -79,19 +129,11 @@ class TraderStrategy:
         """
         raise NotImplementedError("Subclasses must implement define_expressions()")
 
-    def define_constraints(self, params, prev_state):
+    def define_constraints(self, _params, _prev_state):
         """
         Defines and returns the constraints under which the optimization is conducted
         """
-        self.constraints = []
-        # TODO: Get budget based on account
-        max_budget_stable = self.parent.balance.get(self.stable)
-        max_budget_reserve_asset = self.parent.balance.get(self.reserve_asset)
-        if self.sell_reserve_asset(params, prev_state):
-            self.constraints.append(
-                self.variables["sell_amount"] <= max_budget_reserve_asset)
-        else:
-            self.constraints.append(self.variables["sell_amount"] <= max_budget_stable)
+        self.constraints = [self.variables["sell_amount"] <= self.parameters["max_budget"]]
 
     def define_objective_function(self, _params, _prev_state):
         """
@@ -100,36 +142,79 @@ class TraderStrategy:
         self.objective_function = self.variables["sell_amount"]
         self.optimization_direction = "maximize"
 
-    def solve(self, _params, _prev_state):
+    def compile(self, params, prev_state) -> CompiledProblem:
         """
-        Solves the optimisation problem algorithmically
+        Generates the cvxpy optimization problem
         """
-        # Generate cvxpy optimization problem
+        import cvxpy
+        self.variables = {}
+        self.parameters = {}
+        self.expressions = {}
+        self.define_variables()
+        self.define_parameters()
+        self.define_expressions(params, prev_state)
+        self.define_objective_function(params, prev_state)
+        self.define_constraints(params, prev_state)
+
         assert self.optimization_direction in (
             "minimize",
             "maximize",
         ), "Optimization direction not specified."
         if self.optimization_direction == "minimize":
-            obj = Minimize(self.objective_function)
+            obj = cvxpy.Minimize(self.objective_function)
         else:
-            obj = Maximize(self.objective_function)
-        prob = Problem(obj, self.constraints)
+            obj = cvxpy.Maximize(self.objective_function)
+
+        return CompiledProblem(
+            problem=cvxpy.Problem(obj, self.constraints),
+            variables=self.variables,
+            parameters=self.parameters,
+            expressions=self.expressions,
+            bound=self.single_bound()
+        )
+
+    def single_bound(self) -> Optional["cvxpy.Parameter"]:
+        """
+        Returns the bounding Parameter if the problem is to maximize
+        the sell amount subject to a single upper bound
+        """
+        import cvxpy
+        sell_amount = self.variables.get("sell_amount")
+        if (
+            self.optimization_direction == "maximize"
+            and self.objective_function is sell_amount
+            and len(self.constraints) == 1
+        ):
+            lhs, rhs = self.constraints[0].args
+            if lhs is sell_amount and isinstance(rhs, cvxpy.Parameter):
+                return rhs
+        return None
 
+    def solve(self, _params, _prev_state, compiled: CompiledProblem):
+        """
+        Solves the optimisation problem algorithmically, or in closed form
+        if the constraint set is a single bound
+        """
+        if compiled.bound is not None:
+            assert compiled.bound.value >= 0, "Optimization NOT successful!"
+            self.sell_amount = compiled.bound.value
+            return
+
+        import cvxpy
         # The optimization problem of SellMax is quasi-convex
-        prob.solve(
+        compiled.problem.solve(
             solver=cvxpy.ECOS,
             abstol=1e-6,
             reltol=1e-6,
             max_iters=10000,
-            verbose=True,
+            warm_start=True,
         )
 
-        assert prob.status == "optimal", "Optimization NOT successful!"
-        logging.debug('Objective value in optimum is %s', prob.value)
-        logging.debug(self.variables['sell_amount'].value)
-        logging.debug(self.expressions['oracle_rate_after_trade'].value)
+        assert compiled.problem.status == "optimal", "Optimization NOT successful!"
+        self.sell_amount = compiled.variables["sell_amount"].value
+        logging.debug('Objective value in optimum is %s', compiled.problem.value)
+        logging.debug(self.sell_amount)
 
-    # pylint: disable=duplicate-code
     def optimize(self, params, prev_state):
         """
         Runs the optimization
@@ -138,11 +223,15 @@ class TraderStrategy:
         if hasattr(self, "calculate"):
             self.calculate(params, prev_state)
         else:
-            self.define_variables()
-            self.define_expressions(params, prev_state)
-            self.define_objective_function(params, prev_state)
-            self.define_constraints(params, prev_state)
-            self.solve(params, prev_state)
+            key = self.problem_key(params, prev_state)
+            compiled = self.problems.get(key)
+            if compiled is None:
+                compiled = self.problems[key] = self.compile(params, prev_state)
+            self.variables = compiled.variables
+            self.parameters = compiled.parameters
+            self.expressions = compiled.expressions
+            self.update_parameters(params, prev_state)
+            self.solve(params, prev_state, compiled)
 
     # pylint: disable=duplicate-code
 
@@ -166,8 +255,15 @@ class TraderStrategy:
             )
         return sell_amount_adjusted
 
+    def acts_on(self, timestep) -> bool:
+        """
+        Activation schedule of the trader, it can only trade every acting_frequency
+        blocks, i.e. on timesteps that span one of those blocks
+        """
+        return events_in_timestep(timestep, self.acting_frequency) > 0
+
     def trader_passes_step(self, _params, prev_state):
-        return prev_state["timestep"] % self.acting_frequency != 0
+        return not self.acts_on(prev_state["timestep"])
 
     def return_optimal_trade(self, params, prev_state):
         """
@@ -178,11 +274,7 @@ class TraderStrategy:
             trade = None
         else:
             self.optimize(params=params, prev_state=prev_state)
-            sell_amount = (
-                self.variables["sell_amount"].value
-                if self.variables
-                else self.sell_amount
-            )
+            sell_amount = self.sell_amount
             if sell_amount is None or sell_amount == 0:
                 trade = None
             else:
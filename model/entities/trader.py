@@ -4,12 +4,12 @@ Agents implement the Actor type.
 """
 # pylint: disable=too-few-public-methods
 from typing import TYPE_CHECKING
-from copy import deepcopy
 from uuid import UUID
 
 from model.generators.mento import MentoExchangeGenerator
 from model.entities import strategies
 from model.entities.account import Account, Balance
+from model.types.base import MentoBuckets
 from model.types.pair import Pair
 from model.types.configs import MentoExchangeConfig, TraderConfig
 from model.utils.rng_provider import RNGProvider
@@ -46,6 +46,9 @@ class Trader(Account):
         assert strategy_class is not None, f"{config.trader_type.value} is not a strategy"
         self.strategy = strategy_class(self)
 
+    def acts_on(self, timestep) -> bool:
+        return self.strategy.acts_on(timestep)
+
     def execute(
         self,
         params,
@@ -62,6 +65,20 @@ class Trader(Account):
                 "reserve_balance": prev_state["reserve_balance"],
             }
 
+        next_bucket = self.execute_order(order, prev_state)
+
+        return {
+            "mento_buckets": prev_state["mento_buckets"].replace(
+                self.config.exchange, next_bucket),
+            "floating_supply": self.parent.floating_supply,
+            "reserve_balance": self.parent.reserve.balance,
+        }
+
+    def execute_order(self, order, prev_state) -> MentoBuckets:
+        """
+        Settles an order against the Mento exchange, updating the trader
+        and reserve balances, and returns the resulting bucket.
+        """
         sell_amount = order["sell_amount"]
         sell_reserve_asset = order["sell_reserve_asset"]
         self.rebalance_portfolio(sell_amount, sell_reserve_asset, prev_state)
@@ -73,21 +90,13 @@ class Trader(Account):
             prev_state
         )
 
-        self.balance += delta
+        self.transfer(delta)
         reserve_delta = Balance({
             self.exchange_config.reserve_asset:
                 -1 * delta.get(self.exchange_config.reserve_asset),
         })
         self.parent.reserve.balance += reserve_delta
-
-        next_buckets = deepcopy(prev_state["mento_buckets"])
-        next_buckets[self.config.exchange] = next_bucket
-
-        return {
-            "mento_buckets": next_buckets,
-            "floating_supply": self.parent.floating_supply,
-            "reserve_balance": self.parent.reserve.balance,
-        }
+        return next_bucket
 
     def rebalance_portfolio(self, target_amount, target_is_reserve_asset, prev_state):
         """
@@ -115,5 +124,5 @@ class Trader(Account):
             delta[stable] = self.balance.get(reserve_asset) * market_price
             delta[reserve_asset] = -1 * self.balance.get(reserve_asset)
 
-        self.balance += delta
+        self.transfer(delta)
         self.parent.untracked_floating_supply -= delta
@@ -3,31 +3,50 @@ Accounts Generator
 
 Account management, equivalent to addresses on the blockchain
 """
-from uuid import UUID, uuid4, uuid5
-from typing import List, Dict
+from uuid import NAMESPACE_OID, UUID, uuid5
+from typing import Hashable, List, Dict, Optional, Union
 
+import numpy as np
+
+from experiments import simulation_configuration
 from model.entities.account import Account
+from model.entities.account_registry import AccountRegistry, REGISTERED_TRADER_TYPES
+from model.entities.arbitrage_cohort import ArbitrageCohort, RegisteredArbitrageCohort
 from model.entities.trader import Trader
 from model.entities.balance import Balance
+from model.types.base import MentoExchange, TraderType
 from model.types.configs import TraderConfig
 from model.utils import update_from_signal
 from model.utils.generator import Generator, state_update_blocks
 from model.utils.generator_container import GeneratorContainer
 from model.utils.rng_provider import RNGProvider
 
-ACCOUNTS_NS = uuid4()
+# Deterministic namespace so account ids (and the RNGs seeded from them)
+# are identical across worker processes
+ACCOUNTS_NS = uuid5(NAMESPACE_OID, "mento.accounts")
 
 
 class AccountGenerator(Generator):
     """
     AccountsManager Generator
     """
-    accounts_by_id: Dict[UUID, Account] = {}
+    accounts_by_id: Dict[UUID, Account]
     reserve: Account
     # Holds the amount of floating supply in circulation
     # with entities that aren't tracked as part of the
     # generator.
     untracked_floating_supply: Balance
+    # Running total of the balances of all tracked accounts,
+    # updated by the balance deltas the accounts report
+    _tracked_floating_supply: Balance
+    # With simulation_configuration.ACCOUNT_REGISTRY traders of the
+    # REGISTERED_TRADER_TYPES are stored in the registry instead of
+    # accounts_by_id
+    registry: Optional[AccountRegistry]
+    # Trader account ids and ("registered", segment) keys of the registered
+    # traders between two other traders in the order their execution units
+    # act, the keys of registered traders hold their rows
+    execution_order: Dict[Hashable, Optional[List[np.ndarray]]]
     container: GeneratorContainer
     rngp: RNGProvider
 
@@ -39,14 +58,21 @@ class AccountGenerator(Generator):
                  rngp: RNGProvider):
         self.container = container
         self.rngp = rngp
+        self.accounts_by_id = {}
+        self._tracked_floating_supply = Balance.zero()
+        self.registry = AccountRegistry() if simulation_configuration.ACCOUNT_REGISTRY else None
+        self.execution_order = {}
         self.reserve = self.create_reserve_account(
             initial_balance=reserve_inventory
         )
 
         for trader in traders:
-            for index in range(trader.count):
+            if self.registry is not None and trader.trader_type in REGISTERED_TRADER_TYPES:
+                self.register_traders(trader)
+                continue
+            for account_name in trader.account_names():
                 self.create_trader(
-                    account_name=f"{trader.trader_type}_{index}",
+                    account_name=account_name,
                     config=trader
                 )
 
@@ -64,6 +90,15 @@ class AccountGenerator(Generator):
 
         return accounts
 
+    def fork(self, params):
+        """
+        Traders and their strategies keep the config of their exchange,
+        registered traders look it up on access
+        """
+        for trader in self.accounts_by_id.values():
+            trader.exchange_config = params["mento_exchanges_config"].get(trader.config.exchange)
+            trader.strategy.exchange_config = trader.exchange_config
+
     def create_reserve_account(self, initial_balance: Balance):
         """
         separate reserve account which is not part of the self.all_accounts list
@@ -77,6 +112,9 @@ class AccountGenerator(Generator):
         return reserve_account
 
     def create_trader(self, account_name: str, config: TraderConfig):
+        """
+        Creates a trader, a trader with the same name replaces the previous one
+        """
         account = Trader(
             self,
             account_id=uuid5(ACCOUNTS_NS, account_name),
@@ -84,34 +122,138 @@ class AccountGenerator(Generator):
             config=config,
             rngp=self.rngp
         )
+        replaced = self.accounts_by_id.get(account.account_id)
+        if replaced is not None:
+            self._tracked_floating_supply -= replaced.balance
         self.accounts_by_id[account.account_id] = account
+        self.execution_order.setdefault(account.account_id)
+        self._tracked_floating_supply += account.balance
         return account
 
+    def register_traders(self, config: TraderConfig):
+        """
+        Stores the traders of a config as rows of the account registry
+        """
+        if config.count == 0:
+            return
+        account_ids = [
+            uuid5(ACCOUNTS_NS, account_name) for account_name in config.account_names()
+        ]
+        added = np.array([
+            account_id not in self.registry.rows_by_id for account_id in account_ids
+        ])
+        for account_id in account_ids:
+            replaced = self.registry.rows_by_id.get(account_id)
+            if replaced is not None:
+                self._tracked_floating_supply -= self.registry.balance(replaced)
+            self._tracked_floating_supply += config.balance
+        rows = self.registry.add(account_ids, config)
+        # acting frequencies are defined by the strategy
+        self.registry.acting_frequency[rows] = (
+            self.registry.view(self, rows[0]).strategy.acting_frequency)
+        # like replaced accounts, replaced rows keep acting where they were
+        # first registered, any other trader starts a new segment
+        segment = sum(not isinstance(key, tuple) for key in self.execution_order)
+        self.execution_order.setdefault(("registered", segment), []).append(rows[added])
+
+    def is_tracked(self, account: Account) -> bool:
+        return account.account_id in self.accounts_by_id or (
+            self.registry is not None and account.account_id in self.registry.rows_by_id)
+
+    def balance_changed(self, account: Account, delta: Balance):
+        """
+        Keeps the tracked floating supply in sync with the balance
+        deltas of tracked accounts, the reserve is not tracked
+        """
+        if self.is_tracked(account):
+            self._tracked_floating_supply += delta
+
     @state_update_blocks("traders")
     def traders_execute(self):
+        """
+        Arbitrage traders of the same exchange are fused into a single
+        ArbitrageCohort block, all other traders get one block each.
+        Blocks are only active on timesteps their traders can act on.
+        """
         return [
             {
                 "description": f"""
-                    Trader update blocks for {trader.account_id}
+                    Trader update blocks for {self.execution_unit_name(unit)}
                 """,
                 "policies": {
-                    "trader_policy": self.get_trader_policy(trader.account_id)
+                    "trader_policy": self.get_trader_policy(unit)
                 },
+                "active": unit.acts_on,
                 "variables": {
                     "mento_buckets": update_from_signal("mento_buckets"),
                     "reserve_balance": update_from_signal("reserve_balance"),
                     "floating_supply": update_from_signal("floating_supply"),
                 },
-            } for trader in self.traders()
+            } for unit in self.execution_units()
+        ]
+
+    def execution_units(self) -> List[Union[Trader, ArbitrageCohort]]:
+        """
+        Groups consecutive arbitrage traders by exchange, positioned where
+        the first arbitrage trader of the exchange would have acted. Any other
+        trader ends the cohorts, so arbitrage traders acting after it form
+        new ones. Registered arbitrage traders are grouped the same way.
+        """
+        units = []
+        cohorts: Dict[MentoExchange, List[Trader]] = {}
+        for key, registered_rows in self.execution_order.items():
+            if isinstance(key, tuple):
+                rows = np.concatenate(registered_rows)
+                exchanges = self.registry.exchange[rows]
+                _, first_rows = np.unique(exchanges, return_index=True)
+                units.extend(
+                    RegisteredArbitrageCohort(self, self.registry, rows[exchanges == exchange])
+                    for exchange in exchanges[np.sort(first_rows)]
+                )
+                continue
+            trader = self.accounts_by_id[key]
+            if trader.config.trader_type != TraderType.ARBITRAGE_TRADER:
+                units.append(trader)
+                cohorts.clear()
+            elif trader.config.exchange not in cohorts:
+                cohorts[trader.config.exchange] = [trader]
+                units.append(cohorts[trader.config.exchange])
+            else:
+                cohorts[trader.config.exchange].append(trader)
+        return [
+            ArbitrageCohort(self, unit) if isinstance(unit, list) else unit
+            for unit in units
         ]
 
-    def get_trader_policy(self, account_id):
+    @staticmethod
+    def execution_unit_name(unit: Union[Trader, ArbitrageCohort]) -> str:
+        """
+        Name of an execution unit in the description of its block
+        """
+        if isinstance(unit, ArbitrageCohort):
+            return f"arbitrage cohort {unit.exchange}"
+        return str(unit.account_id)
+
+    def get_trader_policy(self, unit: Union[Trader, ArbitrageCohort]):
+        """
+        Policy executing the trades of a trader or an arbitrage cohort
+        """
+        if isinstance(unit, ArbitrageCohort):
+            def cohort_policy(params, _substep, _state_history, prev_state):
+                return unit.execute(params, prev_state)
+            return cohort_policy
+
+        account_id = unit.account_id
+
         def policy(params, _substep, _state_history, prev_state):
             trader = self.get(account_id)
             return trader.execute(params, prev_state)
         return policy
 
     def traders(self) -> List[Trader]:
+        """
+        Traders stored as objects, registered traders are not included
+        """
         return [
             account
             for account in self.accounts_by_id.values()
@@ -120,18 +262,37 @@ class AccountGenerator(Generator):
 
     def get(self, account_id) -> Account:
         account = self.accounts_by_id.get(account_id)
+        if account is None and self.registry is not None and account_id in self.registry.rows_by_id:
+            account = self.registry.view(self, self.registry.rows_by_id[account_id])
         assert account is not None, f"No account with id: {account_id}"
         return account
 
     @property
     def tracked_floating_supply(self) -> Balance:
         """
-        Tracked floating supply which originates from
+        Tracked floating supply which originates from the accounts
+        in the generator, maintained incrementally. With
+        simulation_configuration.CHECK_INVARIANTS it's compared
+        against the sum of all account balances on every access.
+        """
+        if simulation_configuration.CHECK_INVARIANTS:
+            self.check_tracked_floating_supply()
+        return self._tracked_floating_supply
+
+    def check_tracked_floating_supply(self):
+        """
+        Recomputes the tracked floating supply from all accounts and
+        checks that the running total only differs by rounding
         """
-        return sum(
-            [account.balance for account in self.accounts_by_id.values()],
-            Balance.zero()
+        recomputed = Balance.total(
+            account.balance for account in self.accounts_by_id.values()
         )
+        if self.registry is not None:
+            recomputed += self.registry.total_balance()
+        tracked = self._tracked_floating_supply
+        assert np.allclose(
+            tracked.vector, recomputed.vector, rtol=1e-9, atol=1e-6
+        ), f"Tracked floating supply {tracked} drifted from {recomputed}"
 
     @property
     def floating_supply(self) -> Balance:
@@ -3,28 +3,47 @@ market price generator and related functions
 """
 
 import logging
+from typing import Callable, Dict, List
 import numpy as np
 
+from experiments import simulation_configuration
 from experiments.simulation_configuration import TOTAL_BLOCKS
 from model.system_parameters import Parameters
 
 from model.types.base import MarketPriceModel
+from model.types.pair import Pair
 from model.utils.data_feed import DATA_FOLDER, DataFeed
+from model.utils.gbm_path_generator import GBMPathGenerator
 from model.utils.generator import Generator
+from model.utils.increments_cache import IncrementsCache
 from model.utils.price_impact_valuator import PriceImpactValuator
-from model.utils.quantlib_wrapper import QuantLibWrapper
 from model.utils.rng_provider import RNGProvider
+from model.utils.timesteps import blocks_per_timestep, timesteps_for_blocks
 
 # raise numpy warnings as errors
 np.seterr(all='raise')
 
+# QuantLib and NumPy GBM increments shared by the subsets of an experiment
+INCREMENTS = IncrementsCache()
+
 
 class MarketPriceGenerator(Generator):
     """
-    This class is providing a market environment
+    This class is providing a market environment.
+    The price paths of all pairs are known upfront, they are precomputed
+    once per run as cumulative products of the increments and the
+    price impact is applied as a multiplicative correction on top.
+    Increments are per timestep, historical log returns are per block
+    and summed over the blocks of a timestep.
     """
 
     price_impact_valuator: PriceImpactValuator
+    pairs: List[Pair]
+    pair_index: Dict[Pair, int]
+    # (pairs x sample_size + 1) market prices before price impact
+    price_paths: np.ndarray
+    # accumulated relative price impact per pair
+    price_impact: np.ndarray
 
     # TODO multi currency configurable
     # TODO in particular delay for Celo supply
@@ -36,58 +55,116 @@ class MarketPriceGenerator(Generator):
         model,
         impacted_assets,
         rngp: RNGProvider,
+        initial_market_price: Dict[Pair, float],
         increments=None,
     ):
         self.model = model
         self.increments = increments
+        # number of timesteps covering all blocks of the simulation
+        self.sample_size = timesteps_for_blocks(TOTAL_BLOCKS)
         self.price_impact_valuator = PriceImpactValuator(
-            impacted_assets, TOTAL_BLOCKS)
+            impacted_assets, self.sample_size)
         self.rng = rngp.get_rng("MarketPriceGenerator")
+        self.pairs = list(initial_market_price)
+        self.pair_index = {pair: index for index, pair in enumerate(self.pairs)}
+        self.initial_prices = np.array([initial_market_price[pair] for pair in self.pairs])
+        self.price_impact = np.ones(len(self.pairs))
+        self.price_paths = None
 
     @classmethod
-    def from_parameters(cls, params: Parameters, _initial_state, _container):
+    def from_parameters(cls, params: Parameters, initial_state, _container):
         model = params["market_price_model"]
+        market_price_generator = cls(
+            model,
+            params['impacted_assets'],
+            params['rngp'],
+            initial_state['market_price']
+        )
         if model == MarketPriceModel.QUANTLIB:
-            market_price_generator = cls(
-                model,
-                params['impacted_assets'],
-                params['rngp']
-            )
             seed_sequence = params['rngp'].__seed__(["QuantLib"])
             quant_lib_seed = int(seed_sequence.generate_state(1)[0])
-            quant_lib_wrapper = QuantLibWrapper(
-                params['market_price_processes'],
-                params['market_price_correlation_matrix'],
-                TOTAL_BLOCKS,
-                quant_lib_seed
+
+            def quant_lib_paths():
+                # pylint: disable=import-outside-toplevel
+                from model.utils.quantlib_wrapper import QuantLibWrapper
+                return QuantLibWrapper(
+                    params['market_price_processes'],
+                    params['market_price_correlation_matrix'],
+                    market_price_generator.sample_size,
+                    quant_lib_seed
+                ).generate_correlated_paths()
+            market_price_generator.cached_increments(params, quant_lib_seed, quant_lib_paths)
+        elif model == MarketPriceModel.NUMPY_GBM:
+            # the same seed sequence as rngp.get_rng("GBMPathGenerator"),
+            # whose RNG is only used for the paths
+            seed_sequence = params['rngp'].__seed__(["GBMPathGenerator"])
+            market_price_generator.cached_increments(
+                params,
+                (seed_sequence.entropy, seed_sequence.spawn_key),
+                lambda: GBMPathGenerator(
+                    params['market_price_processes'],
+                    params['market_price_correlation_matrix'],
+                    market_price_generator.sample_size,
+                    np.random.default_rng(seed_sequence)
+                ).generate_correlated_paths()[0]
             )
-            market_price_generator.increments = quant_lib_wrapper.correlated_returns()
-        elif model == MarketPriceModel.PRICE_IMPACT:
-            market_price_generator = cls(model, params['impacted_assets'], params['rngp'])
         elif model == MarketPriceModel.HIST_SIM:
-            market_price_generator = cls(model, params['impacted_assets'], params['rngp'])
             market_price_generator.historical_returns()
             logging.info("increments updated")
         elif model == MarketPriceModel.SCENARIO:
-            market_price_generator = cls(model, params['impacted_assets'], params['rngp'])
             market_price_generator.historical_returns()
             logging.info("increments updated")
+        market_price_generator.precompute_price_paths()
         return market_price_generator
 
+    def cached_increments(self, params: Parameters, seed, generate: Callable[[], np.ndarray]):
+        """
+        Sets the increments of the processes, generated only once for all
+        subsets sharing the market price configuration and seed, see
+        INCREMENTS
+        """
+        processes = params['market_price_processes']
+        log_returns = INCREMENTS.get(
+            (
+                self.model,
+                processes,
+                params['market_price_correlation_matrix'],
+                self.sample_size,
+                blocks_per_timestep(),
+                seed,
+            ),
+            generate,
+            simulation_configuration.MARKET_INCREMENTS_FOLDER
+        )
+        self.increments = {
+            config.pair: path for config, path in zip(processes, log_returns)
+        }
+
+    def precompute_price_paths(self):
+        """
+        Computes the market prices of all pairs for every step, column s
+        holds the initial prices scaled by the first s increments.
+        Pairs without increments keep their initial price.
+        """
+        increments = self.increments or {}
+        log_returns = np.zeros((len(self.pairs), self.sample_size))
+        for pair, index in self.pair_index.items():
+            pair_increments = increments.get(pair)
+            if pair_increments is not None:
+                log_returns[index] = pair_increments[:self.sample_size]
+        self.price_paths = np.empty((len(self.pairs), self.sample_size + 1))
+        self.price_paths[:, 0] = self.initial_prices
+        self.price_paths[:, 1:] = self.initial_prices[:, None] * np.exp(
+            np.cumsum(log_returns, axis=1))
+
     def market_price(self, state):
         """
-        This method returns a market price
+        This method returns the market price after the increment
+        of the current step and the price impact so far
         """
-        step = state["timestep"]
-        market_prices = {}
-        for asset in state["market_price"]:
-            increments = self.increments.get(asset)
-            if increments is None:
-                scale_factor = 1
-            else:
-                scale_factor = np.exp(increments[step])
-            market_prices[asset] = state["market_price"][asset] * scale_factor
-        return market_prices
+        return self.as_market_price(
+            self.price_paths[:, state["timestep"] + 1] * self.price_impact
+        )
 
     def valuate_price_impact(
         self,
@@ -97,24 +174,39 @@ class MarketPriceGenerator(Generator):
         market_prices,
         params
     ):
-        return self.price_impact_valuator.price_impact(floating_supply,
-                                                       pre_floating_supply,
-                                                       current_step,
-                                                       market_prices,
-                                                       params)
+        """
+        Adds the relative price impact of the supply changes to the
+        accumulated correction and returns the impacted market prices
+        """
+        impacted_prices = market_prices.copy()
+        for pair, relative_price_impact in self.price_impact_valuator.relative_price_impact(
+            floating_supply,
+            pre_floating_supply,
+            current_step,
+            params
+        ).items():
+            self.price_impact[self.pair_index[pair]] *= 1 + relative_price_impact
+            impacted_prices[pair] *= 1 + relative_price_impact
+        return impacted_prices
+
+    def as_market_price(self, prices: np.ndarray) -> Dict[Pair, float]:
+        return dict(zip(self.pairs, prices.tolist()))
 
     def historical_returns(self):
         """Passes a historic scenario or creates a random sample from a set of
         historical log-returns"""
         # TODO Consider different sampling options
-        # TODO Random Seed
         data_feed = DataFeed(data_folder=DATA_FOLDER)
-        data = data_feed.data.copy()
+        data = data_feed.data
+        blocks = blocks_per_timestep()
         if self.model == MarketPriceModel.HIST_SIM:
-            random_index_array = np.random.randint(low=0,
+            random_index_array = self.rng.integers(low=0,
                                                    high=data_feed.length - 1,
-                                                   size=TOTAL_BLOCKS)
+                                                   size=self.sample_size * blocks)
             data = data_feed.data[random_index_array, :]
+        # log returns of the blocks within a timestep add up
+        timesteps = len(data) // blocks
+        data = data[:timesteps * blocks].reshape(timesteps, blocks, -1).sum(axis=1)
         increments = {}
         for index, asset in enumerate(data_feed.assets):
             increments[asset] = data[:, index]
@@ -7,13 +7,13 @@ Handles one or more mento instances
 from typing import Any, Dict, Set
 import numpy as np
 
-from model.constants import blocktime_seconds
 from model.entities.balance import Balance
-from model.types.base import MentoBuckets, MentoExchange, Stable
+from model.types.base import MentoBuckets, MentoBucketState, MentoExchange, Stable
 from model.types.pair import Pair
 from model.types.configs import MentoExchangeConfig
 from model.utils.generator import Generator, state_update_blocks
 from model.utils import update_from_signal
+from model.utils.timesteps import events_in_timestep, period_in_blocks
 
 # raise numpy warnings as errors
 np.seterr(all='raise')
@@ -43,6 +43,9 @@ class MentoExchangeGenerator(Generator):
             set(params['mento_exchanges_active'])
         )
 
+    def fork(self, params):
+        self.configs = params['mento_exchanges_config']
+
     @state_update_blocks('bucket_update')
     def bucket_update(self):
         return [{
@@ -52,6 +55,7 @@ class MentoExchangeGenerator(Generator):
             'policies': {
                 'bucket_update': self.get_bucket_update_policy()
             },
+            'active': self.any_buckets_reset_due,
             'variables': {
                 'mento_buckets': update_from_signal('mento_buckets')
             }
@@ -67,10 +71,10 @@ class MentoExchangeGenerator(Generator):
             _state_history,
             prev_state,
         ):
-            mento_buckets = {
+            mento_buckets = MentoBucketState({
                 exchange: self.get_next_buckets(prev_state, exchange)
                 for exchange in self.active_exchanges
-            }
+            })
 
             return {
                 'mento_buckets': mento_buckets
@@ -90,11 +94,26 @@ class MentoExchangeGenerator(Generator):
         """
         Returns true if the buckets for a particular exchange have to be reset
         """
+        return self.bucket_reset_due(exchange, prev_state['timestep'])
+
+    def bucket_reset_due(self, exchange: MentoExchange, timestep) -> bool:
+        """
+        Buckets are reset once at the end of a timestep
+        that spans one or more bucket update blocks
+        """
         bucket_update_frequency = self.configs[exchange].bucket_update_frequency_second
-        update_required = (
-            (blocktime_seconds * prev_state['timestep']) % bucket_update_frequency == 0
-        ) or (prev_state['timestep'] == 1)
-        return update_required
+        return (
+            events_in_timestep(timestep, period_in_blocks(bucket_update_frequency)) > 0
+        ) or (timestep == 1)
+
+    def any_buckets_reset_due(self, timestep) -> bool:
+        """
+        Activation schedule of the bucket update block
+        """
+        return any(
+            self.bucket_reset_due(exchange, timestep)
+            for exchange in self.active_exchanges
+        )
 
     def recalculate_buckets(self, exchange: MentoExchange, prev_state):
         """
@@ -127,11 +146,11 @@ class MentoExchangeGenerator(Generator):
         reduced_sell_amount = sell_amount * (1 - spread)
 
         if sell_reserve_asset:
-            buy_token_bucket = prev_state["mento_buckets"][exchange]['stable']
-            sell_token_bucket = prev_state["mento_buckets"][exchange]['reserve_asset']
+            buy_token_bucket = prev_state["mento_buckets"][exchange].stable
+            sell_token_bucket = prev_state["mento_buckets"][exchange].reserve_asset
         else:
-            buy_token_bucket = prev_state["mento_buckets"][exchange]['reserve_asset']
-            sell_token_bucket = prev_state["mento_buckets"][exchange]['stable']
+            buy_token_bucket = prev_state["mento_buckets"][exchange].reserve_asset
+            sell_token_bucket = prev_state["mento_buckets"][exchange].stable
 
         numerator = sell_amount * (1 - spread) * buy_token_bucket
         denominator = sell_token_bucket + reduced_sell_amount
@@ -161,8 +180,8 @@ class MentoExchangeGenerator(Generator):
 
         prev_bucket = prev_state["mento_buckets"][exchange]
         next_bucket = MentoBuckets(
-            stable=prev_bucket['stable'] + delta_stable,
-            reserve_asset=prev_bucket['reserve_asset'] + delta_reserve_asset
+            stable=prev_bucket.stable + delta_stable,
+            reserve_asset=prev_bucket.reserve_asset + delta_reserve_asset
         )
 
         delta = Balance({
@@ -2,8 +2,8 @@
 oracle generator and related functions
 """
 
-from typing import Dict, List
-from uuid import UUID, uuid4, uuid5
+from typing import Dict, List, NamedTuple
+from uuid import NAMESPACE_OID, UUID, uuid5
 import numpy as np
 
 
@@ -13,22 +13,44 @@ from model.types.configs import OracleConfig
 from model.utils import update_from_signal
 from model.utils.generator import Generator, state_update_blocks
 from model.utils.rng_provider import RNGProvider
+from model.utils.state_history import lagged
+from model.utils.timesteps import blocks_per_timestep, events_in_timestep, period_in_blocks
 
-ORACLES_NS = uuid4()
+# pylint: disable=too-many-instance-attributes
+
+ORACLES_NS = uuid5(NAMESPACE_OID, "mento.oracles")
 
 # raise numpy warnings as errors
 np.seterr(all='raise')
 
 
+class ReportSchedule(NamedTuple):
+    """
+    Oracle providers reporting on every `period`-th block starting at `offset`
+    """
+    period: int
+    offset: int
+    oracles: np.ndarray
+
+
 class OracleRateGenerator(Generator):
     """
     This class is providing oracle rates and is responsible generating oracle providers
-     and emulate the functionality of sorted_oracles.sol
+     and emulate the functionality of sorted_oracles.sol.
+    The reports of all oracle providers are held in a (pairs x oracles) matrix,
+    the median of a pair is only recomputed when one of its reports changed.
+    Scheduled reports are precomputed once per run and deviation triggered
+    reports are evaluated per group of providers sharing delay and threshold,
+    so the cost per block is proportional to the number of reports.
     """
     oracles_by_id: Dict[UUID, OracleProvider]
     oracles_by_pair: Dict[Pair, List[OracleProvider]]
     oracle_pairs: List[Pair]
     rngp: RNGProvider
+    reports: np.ndarray
+    medians: np.ndarray
+    dirty: np.ndarray
+    report_schedules: List[ReportSchedule]
 
     def __init__(
         self,
@@ -43,24 +65,45 @@ class OracleRateGenerator(Generator):
         self.oracles_by_id = {}
         for oracle_config in oracles:
             for index in range(oracle_config.count):
-                self.create_oracle(index, oracle_config, self.oracle_pairs)
+                self.create_oracle(index, oracle_config)
+
+        # providers sharing delay and price threshold report the same prices
+        groups = {
+            (oracle.config.delay, oracle.config.price_threshold): None
+            for oracle in self.oracles_by_id.values()
+        }
+        group_keys = list(groups)
+        self.group_delay = np.array([delay for delay, _ in group_keys], dtype=int)
+        self.group_price_threshold = np.array(
+            [price_threshold for _, price_threshold in group_keys], dtype=float)
+        self.group_index = np.array([
+            group_keys.index((oracle.config.delay, oracle.config.price_threshold))
+            for oracle in self.oracles_by_id.values()
+        ], dtype=int)
+
+        self.reports = np.full((len(oracle_pairs), len(self.oracles_by_id)), np.nan)
+        self.medians = np.zeros(len(oracle_pairs))
+        self.dirty = np.zeros(len(oracle_pairs), dtype=bool)
+        self.report_schedules = self.precompute_report_schedules()
 
     @classmethod
     def from_parameters(cls, params, _initial_state, _container):
         oracle_generator = cls(params['oracles'], params['oracle_pairs'], params['rngp'])
         return oracle_generator
 
-    def create_oracle(self, index: int, oracle_config: OracleConfig, oracle_pairs: List[Pair]):
+    def create_oracle(self, index: int, oracle_config: OracleConfig):
         """
         Creates Oracle Providers
         """
         oracle_name = f"{oracle_config.type}_{index}"
-        oracle_id = uuid5(ORACLES_NS, oracle_name)
+        # names repeat across configs of the same type, the position doesn't
+        position = len(self.oracles_by_id)
+        oracle_id = uuid5(ORACLES_NS, f"{position}_{oracle_name}")
 
         oracle_provider = OracleProvider(name=oracle_name,
                                          oracle_id=oracle_id,
                                          config=oracle_config,
-                                         pairs=oracle_pairs,
+                                         index=position,
                                          rngp=self.rngp)
         self.oracles_by_id[oracle_id] = oracle_provider
         for pair in self.oracle_pairs:
@@ -72,18 +115,124 @@ class OracleRateGenerator(Generator):
 
     def aggregation(self, state_history, prev_state):
         self.update_oracles(state_history, prev_state)
-        median_per_asset = {
-            pair: np.median([
-                oracle_provider.reports[pair]
-                for oracle_provider in self.oracles_by_pair[pair]
-            ] or [0])
-            for pair in self.oracle_pairs
-        }
-        return median_per_asset
+        return self.median_rates()
+
+    def median_rates(self) -> Dict[Pair, float]:
+        """
+        Median of the reports of every pair, only recomputed
+        for the pairs whose reports changed
+        """
+        if self.dirty.any() and self.reports.shape[1] > 0:
+            self.medians[self.dirty] = np.median(self.reports[self.dirty], axis=1)
+        self.dirty[:] = False
+        return dict(zip(self.oracle_pairs, self.medians.tolist()))
+
+    def precompute_report_schedules(self) -> List[ReportSchedule]:
+        """
+        A provider reports every reporting_interval seconds, which falls on every
+        reporting_interval / gcd(blocktime_seconds, reporting_interval)-th block.
+        With reporting_jitter the first report is offset by a random number of
+        blocks within the period, drawn from the provider's rng.
+        """
+        schedules: Dict[tuple, List[int]] = {}
+        for oracle in self.oracles_by_id.values():
+            period = period_in_blocks(oracle.config.reporting_interval)
+            offset = int(oracle.rng.integers(period)) if oracle.config.reporting_jitter else 0
+            schedules.setdefault((period, offset), []).append(oracle.index)
+        return [
+            ReportSchedule(period, offset, np.array(oracles, dtype=int))
+            for (period, offset), oracles in schedules.items()
+        ]
+
+    def scheduled_reports(self, timestep: int) -> np.ndarray:
+        reporting = [
+            schedule.oracles for schedule in self.report_schedules
+            if events_in_timestep(timestep, schedule.period, schedule.offset) > 0
+        ]
+        return np.concatenate(reporting) if reporting else np.empty(0, dtype=int)
 
     def update_oracles(self, state_history, prev_state):
-        for _id, oracle in self.oracles_by_id.items():
-            oracle.update(state_history, prev_state)
+        """
+        Updates the reports of the oracle providers, in the first timestep every
+        provider reports the market price, afterwards the market price lagged
+        by its delay on its scheduled blocks and for pairs whose oracle rate
+        deviates by more than its price threshold from that price.
+        A provider reports at most once per timestep.
+        """
+        timestep = prev_state['timestep']
+        all_oracles = np.arange(self.reports.shape[1])
+        if timestep == 1:
+            market_price = self.pair_values(prev_state['market_price'])
+            self.report(
+                all_oracles,
+                np.repeat(market_price[:, None], all_oracles.size, axis=1)
+            )
+            return
+        if all_oracles.size == 0:
+            return
+
+        delays = np.minimum(self.group_delay, (timestep - 1) * blocks_per_timestep())
+        lagged_market_prices = {
+            delay: self.lagged_market_price(state_history, prev_state, delay)
+            for delay in np.unique(delays)
+        }
+        # (pairs x groups) market prices seen by each group of providers
+        group_reports = np.column_stack([lagged_market_prices[delay] for delay in delays])
+
+        reporting = self.scheduled_reports(timestep)
+        if reporting.size:
+            self.report(reporting, group_reports[:, self.group_index[reporting]])
+
+        oracle_rate = self.pair_values(prev_state['oracle_rate'])
+        deviating = (np.abs(group_reports / oracle_rate[:, None] - 1)
+                     > self.group_price_threshold)
+        if deviating.any():
+            reporting = all_oracles[deviating.any(axis=0)[self.group_index]]
+            group_index = self.group_index[reporting]
+            self.report(reporting, group_reports[:, group_index], deviating[:, group_index])
+
+    def lagged_market_price(self, state_history, prev_state, delay: int) -> np.ndarray:
+        """
+        Market prices `delay` blocks ago, if the delay doesn't fall on the end
+        of a timestep they are interpolated geometrically between the market
+        prices at the end of the timesteps around it, i.e. toward the
+        next older timestep
+        """
+        blocks = blocks_per_timestep()
+        timesteps, remainder = divmod(int(delay), blocks)
+        market_price = self.market_price_timesteps_ago(state_history, prev_state, timesteps)
+        if remainder == 0:
+            return market_price
+        earlier_market_price = self.market_price_timesteps_ago(
+            state_history, prev_state, timesteps + 1)
+        return market_price * (earlier_market_price / market_price) ** (remainder / blocks)
+
+    def market_price_timesteps_ago(self, state_history, prev_state, timesteps: int) -> np.ndarray:
+        """
+        Market prices at the end of the timestep `timesteps` timesteps before
+        the current one. The report block runs after the market price block,
+        so prev_state already holds the market prices of the current timestep
+        and lagged(state_history, ..., k) those at the end of timestep t - k.
+        """
+        if timesteps == 0:
+            return self.pair_values(prev_state['market_price'])
+        return self.pair_values(lagged(state_history, 'market_price', timesteps))
+
+    def report(self, oracles: np.ndarray, oracle_reports: np.ndarray, pairs=None):
+        """
+        Replaces the reports of the given oracles, optionally only for a
+        (pairs x oracles) mask, and marks the pairs with changed reports as dirty
+        """
+        reports = self.reports[:, oracles]
+        changed = oracle_reports != reports
+        if pairs is not None:
+            changed &= pairs
+        reports[changed] = oracle_reports[changed]
+        self.reports[:, oracles] = reports
+        self.dirty |= changed.any(axis=1)
+
+    def pair_values(self, values_by_pair: Dict[Pair, float]) -> np.ndarray:
+        return np.array([values_by_pair[pair] for pair in self.oracle_pairs], dtype=float)
 
     @state_update_blocks("report")
     def oracle_report(self):
@@ -5,10 +5,27 @@ General Celo blockchain mechanisms:
 """
 from model.entities.balance import Balance
 from model.generators.accounts import AccountGenerator
-from model.constants import target_epoch_rewards_downscaled, seconds_per_epoch, blocktime_seconds
+from model.constants import target_epoch_rewards_downscaled, seconds_per_epoch
 from model.types.base import CryptoAsset, Fiat, Stable
 from model.types.pair import Pair
 from model.utils.generator_container import inject
+from model.utils.timesteps import events_in_timestep, period_in_blocks
+
+
+def epochs_in_timestep(timestep) -> int:
+    """
+    Number of epochs ending within the timestep
+    """
+    if timestep == 0:
+        return 0
+    return events_in_timestep(timestep, period_in_blocks(seconds_per_epoch))
+
+
+def is_epoch_block(timestep) -> bool:
+    """
+    Activation schedule of the epoch rewards, paid out at the end of every epoch
+    """
+    return epochs_in_timestep(timestep) > 0
 
 
 @inject(AccountGenerator)
@@ -20,16 +37,17 @@ def p_epoch_rewards(_params, _substep, _state_history, prev_state,
     that logarithmically. Here it's only about the next 15 linear years
     """
 
-    is_not_epoch_block = (
-        (prev_state['timestep'] * blocktime_seconds) % seconds_per_epoch) != 0
-    if is_not_epoch_block or prev_state['timestep'] == 0:
+    epochs = epochs_in_timestep(prev_state['timestep'])
+    if epochs == 0:
         return {
             "floating_supply": prev_state["floating_supply"],
             "reserve_balance": prev_state["reserve_balance"],
         }
 
-    validator_rewards = 0.07 * target_epoch_rewards_downscaled
-    celo_rewards = target_epoch_rewards_downscaled - validator_rewards
+    # the rewards of all epochs ending within the timestep are paid out at once
+    epoch_rewards = epochs * target_epoch_rewards_downscaled
+    validator_rewards = 0.07 * epoch_rewards
+    celo_rewards = epoch_rewards - validator_rewards
     validator_rewards_in_cusd = (
         validator_rewards
         / prev_state["oracle_rate"].get(Pair(CryptoAsset.CELO, Fiat.USD))
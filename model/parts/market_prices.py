@@ -6,6 +6,7 @@
 from model.generators.markets import MarketPriceGenerator
 from model.state_variables import StateVariables
 from model.utils.generator_container import inject
+from model.utils.state_history import lagged
 
 
 @inject(MarketPriceGenerator)
@@ -42,7 +43,7 @@ def p_price_impact(
     # TODO make sure the right step is picked
     market_price = market_price_generator.valuate_price_impact(
         floating_supply=prev_state["floating_supply"],
-        pre_floating_supply=state_history[-1][-1]["floating_supply"],
+        pre_floating_supply=lagged(state_history, "floating_supply"),
         current_step=prev_state["timestep"],
         market_prices=prev_state["market_price"],
         params=params
@@ -1,9 +1,13 @@
 """
 Reserve metric and advanced balance calculation
 """
+from typing import TYPE_CHECKING
 
+from model.types.base import CURRENCIES, CryptoAsset, Fiat
+from model.types.pair import Pair
 
-from model.types.base import CryptoAsset
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def p_reserve_statistics(
@@ -36,3 +40,47 @@ def p_reserve_statistics(
         'reserve_ratio': reserve_ratio,
         'collateralisation_ratio': collateralisation_ratio
     }
+
+
+def reserve_statistics(dataframe: "pd.DataFrame", parameters) -> "pd.DataFrame":
+    """
+    Column-wise p_reserve_statistics over the post processed results, used
+    when the reserve statistics block is a post processing block. The balances
+    are valued at the market prices at the end of each timestep, i.e. after
+    the price impact, while the block values them before the price impact.
+    """
+    # pylint: disable=import-outside-toplevel
+    from model.state_variables import initial_state
+
+    market_price = {
+        "market_price": {
+            pair: dataframe[f"market_price_{pair}"].to_numpy()
+            for pair in initial_state["market_price"]
+        }
+    }
+
+    def values_in_usd(balance):
+        # same order and operations as Balance.values_in_usd
+        return {
+            currency: dataframe[f"{balance}_{currency}"].to_numpy()
+            * Pair(currency, Fiat.USD).get_rate(market_price).value
+            for currency in CURRENCIES
+            if f"{balance}_{currency}" in dataframe
+        }
+
+    reserve_values_usd = values_in_usd("reserve_balance")
+    reserve_balance_usd = sum(list(reserve_values_usd.values()))
+    floating_supply_balance_usd = sum(list(values_in_usd("floating_supply").values()))
+
+    if "reserve_target_weight" in dataframe:
+        # swept parameters are assigned as columns
+        reserve_target_weight = dataframe["reserve_target_weight"].to_numpy()
+    else:
+        reserve_target_weight = parameters["reserve_target_weight"][0]
+
+    dataframe["reserve_balance_in_usd"] = reserve_balance_usd
+    dataframe["floating_supply_stables_in_usd"] = floating_supply_balance_usd
+    dataframe["reserve_ratio"] = (reserve_values_usd.get(CryptoAsset.CELO) /
+                                  reserve_target_weight / floating_supply_balance_usd)
+    dataframe["collateralisation_ratio"] = reserve_balance_usd / floating_supply_balance_usd
+    return dataframe
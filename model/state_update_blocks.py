@@ -4,6 +4,7 @@ cadCAD model State Update Block structure, composed of Policy and State Update F
 import logging
 
 # from model.system_parameters import parameters
+from experiments import simulation_configuration
 from model.generators import (
     AccountGenerator,
     OracleRateGenerator,
@@ -48,6 +49,7 @@ state_update_block_epoch_rewards = {
     'policies': {
         'target_epoch_rewards': celo_system.p_epoch_rewards
     },
+    'active': celo_system.is_epoch_block,
     'variables': {
         'floating_supply': update_from_signal('floating_supply'),
         "reserve_balance": update_from_signal("reserve_balance")
@@ -61,6 +63,10 @@ state_update_block_reserve_statistics = {
     'policies': {
         'reserve_statistics': reserve.p_reserve_statistics
     },
+    # none of the other blocks use the statistics, so they can be computed
+    # column-wise over the results instead, see reserve.reserve_statistics
+    'post_processing': simulation_configuration.POST_PROCESS_RESERVE_STATISTICS,
+    'post_process': reserve.reserve_statistics,
     'variables': {
         'reserve_balance_in_usd': update_from_signal('reserve_balance_in_usd'),
         'reserve_ratio': update_from_signal('reserve_ratio'),
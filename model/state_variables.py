@@ -12,17 +12,13 @@ from model.types.base import (
     CryptoAsset,
     Fiat,
     MentoBuckets,
+    MentoBucketState,
     MentoExchange,
     Stable,
 )
 from model.types.pair import Pair
 from model.entities.balance import Balance
-from data.historical_values import (
-    CELO_SUPPLY_MEAN,
-    CUSD_SUPPLY_MEAN,
-    CEUR_SUPPLY_MEAN,
-    CREAL_SUPPLY_MEAN,
-)
+from data.historical_values import historical_values
 
 
 class StateVariables(TypedDict):
@@ -33,7 +29,7 @@ class StateVariables(TypedDict):
     floating_supply: Balance
     oracle_rate: Dict[Pair, float]
     reserve_balance: Balance
-    mento_buckets: Dict[MentoExchange, MentoBuckets]
+    mento_buckets: MentoBucketState
     market_price: Dict[Pair, float]
     reserve_balance_in_usd: float
     floating_supply_stables_in_usd: float
@@ -43,10 +39,10 @@ class StateVariables(TypedDict):
 # Initialize State Variables instance with default values
 initial_state = StateVariables(
     floating_supply=Balance({
-        CryptoAsset.CELO: CELO_SUPPLY_MEAN,
-        Stable.CUSD: CUSD_SUPPLY_MEAN,
-        Stable.CEUR: CEUR_SUPPLY_MEAN,
-        Stable.CREAL: CREAL_SUPPLY_MEAN,
+        CryptoAsset.CELO: historical_values()["CELO_SUPPLY_MEAN"],
+        Stable.CUSD: historical_values()["CUSD_SUPPLY_MEAN"],
+        Stable.CEUR: historical_values()["CEUR_SUPPLY_MEAN"],
+        Stable.CREAL: historical_values()["CREAL_SUPPLY_MEAN"],
     }),
     oracle_rate={
         Pair(CryptoAsset.CELO, Fiat.USD): 3,
@@ -59,11 +55,11 @@ initial_state = StateVariables(
         CryptoAsset.ETH: 15000.0,
         CryptoAsset.DAI: 80000000.0,
     }),
-    mento_buckets={
+    mento_buckets=MentoBucketState({
         MentoExchange.CUSD_CELO: MentoBuckets(stable=0, reserve_asset=0),
         MentoExchange.CEUR_CELO: MentoBuckets(stable=0, reserve_asset=0),
         MentoExchange.CREAL_CELO: MentoBuckets(stable=0, reserve_asset=0),
-    },
+    }),
     market_price={
         Pair(CryptoAsset.CELO, Fiat.USD): 3,
         Pair(CryptoAsset.CELO, Fiat.EUR): 2.4,
@@ -7,7 +7,6 @@ By using a dataclass to represent the System Parameters:
 """
 
 from typing import List, Dict, TypedDict
-from QuantLib import GeometricBrownianMotionProcess
 
 from model.entities.balance import Balance
 from model.types.base import (
@@ -27,10 +26,26 @@ from model.types.configs import (
     MentoExchangeConfig,
     OracleConfig,
     TraderConfig,
-    ImpactDelayConfig
+    ImpactDelayConfig,
+    QuantLibProcess,
 )
 from model.utils.rng_provider import RNGProvider
 
+GEOMETRIC_BROWNIAN_MOTION = QuantLibProcess("GeometricBrownianMotionProcess")
+
+
+# Parameters that the subsets of a sweep can change after a shared prefix
+# (see Engine fork_after). They're read on every timestep or applied to the
+# generators by Generator.fork, subsets differing in any other parameter
+# don't share a prefix.
+FORKABLE_PARAMETERS = {
+    "mento_exchanges_config",
+    "average_daily_volume",
+    "variance_market_price",
+    "impact_delay",
+    "reserve_target_weight",
+}
+
 
 class Parameters(TypedDict):
     """
@@ -116,6 +131,8 @@ parameters = InitParameters(
     ]],
 
     # Market parameters for MarketPriceGenerator
+    # MarketPriceModel.NUMPY_GBM draws the GBM paths with NumPy instead of QuantLib,
+    # which is much faster for long horizons
     market_price_model=[MarketPriceModel.QUANTLIB],
 
     # check order of parameters for each model, e.g. for GBM param_1 is drift and
@@ -124,55 +141,55 @@ parameters = InitParameters(
         [
             MarketPriceConfig(
                 pair=Pair(CryptoAsset.CELO, Fiat.USD),
-                process=GeometricBrownianMotionProcess,
+                process=GEOMETRIC_BROWNIAN_MOTION,
                 param_1=0,
                 param_2=1,
             ),
             MarketPriceConfig(
                 pair=Pair(CryptoAsset.CELO, Fiat.EUR),
-                process=GeometricBrownianMotionProcess,
+                process=GEOMETRIC_BROWNIAN_MOTION,
                 param_1=0,
                 param_2=1,
             ),
             MarketPriceConfig(
                 pair=Pair(CryptoAsset.CELO, Fiat.BRL),
-                process=GeometricBrownianMotionProcess,
+                process=GEOMETRIC_BROWNIAN_MOTION,
                 param_1=0,
                 param_2=1,
             ),
             MarketPriceConfig(
                 pair=Pair(CryptoAsset.BTC, Fiat.USD),
-                process=GeometricBrownianMotionProcess,
+                process=GEOMETRIC_BROWNIAN_MOTION,
                 param_1=0,
                 param_2=0.1,
             ),
             MarketPriceConfig(
                 pair=Pair(CryptoAsset.ETH, Fiat.USD),
-                process=GeometricBrownianMotionProcess,
+                process=GEOMETRIC_BROWNIAN_MOTION,
                 param_1=0,
                 param_2=0.2,
             ),
             MarketPriceConfig(
                 pair=Pair(CryptoAsset.DAI, Fiat.USD),
-                process=GeometricBrownianMotionProcess,
+                process=GEOMETRIC_BROWNIAN_MOTION,
                 param_1=0,
                 param_2=0.001,
             ),
             MarketPriceConfig(
                 pair=Pair(Stable.CUSD, Fiat.USD),
-                process=GeometricBrownianMotionProcess,
+                process=GEOMETRIC_BROWNIAN_MOTION,
                 param_1=0,
                 param_2=0.01,
             ),
             MarketPriceConfig(
                 pair=Pair(Stable.CEUR, Fiat.EUR),
-                process=GeometricBrownianMotionProcess,
+                process=GEOMETRIC_BROWNIAN_MOTION,
                 param_1=0,
                 param_2=0.015,
             ),
             MarketPriceConfig(
                 pair=Pair(Stable.CREAL, Fiat.BRL),
-                process=GeometricBrownianMotionProcess,
+                process=GEOMETRIC_BROWNIAN_MOTION,
                 param_1=0,
                 param_2=0.02,
             ),
@@ -2,7 +2,7 @@
 Various Python types used in the model
 """
 from __future__ import annotations
-from typing import TypedDict, Union
+from typing import NamedTuple, Union
 from enum import Enum
 
 
@@ -50,14 +50,59 @@ class MentoExchange(SerializableEnum):
 
 Currency = Union[Stable, Fiat, CryptoAsset]
 
-
-class MentoBuckets(TypedDict):
+# Global enumeration of all currencies, the position of a currency is its
+# index in array backed balances. The order matches the order in which the
+# currencies appear in the initial state so that iterating a balance yields
+# them in the familiar order.
+CURRENCIES = (
+    CryptoAsset.CELO,
+    Stable.CUSD,
+    Stable.CEUR,
+    Stable.CREAL,
+    CryptoAsset.BTC,
+    CryptoAsset.ETH,
+    CryptoAsset.DAI,
+    Fiat.USD,
+    Fiat.EUR,
+    Fiat.BRL,
+)
+assert set(CURRENCIES) == {*Stable, *CryptoAsset, *Fiat}
+CURRENCY_INDEX = {currency: index for index, currency in enumerate(CURRENCIES)}
+
+
+class MentoBuckets(NamedTuple):
+    """
+    Immutable bucket sizes of a single Mento exchange
+    """
     stable: float
     reserve_asset: float
 
 
+class MentoBucketState(dict):
+    """
+    Immutable mapping of MentoExchange to MentoBuckets. It's shared between
+    substeps instead of being copied, replace returns a new mapping with
+    one exchange changed that shares the buckets of all other exchanges.
+    """
+
+    def replace(self, exchange: MentoExchange, buckets: MentoBuckets) -> MentoBucketState:
+        state = MentoBucketState(self)
+        dict.__setitem__(state, exchange, buckets)
+        return state
+
+    def __reduce__(self):
+        return (MentoBucketState, (dict(self),))
+
+    def __immutable__(self, *_args, **_kwargs):
+        raise TypeError("MentoBucketState is immutable, use replace")
+
+    __setitem__ = __delitem__ = __immutable__
+    clear = pop = popitem = setdefault = update = __immutable__
+
+
 class MarketPriceModel(Enum):
     QUANTLIB = "quantlib"
+    NUMPY_GBM = "numpy_gbm"
     PRICE_IMPACT = "price_impact"
     HIST_SIM = "hist_sim"
     SCENARIO = "scenario"
@@ -71,6 +116,9 @@ class PriceImpact(Enum):
 class ImpactDelayType(Enum):
     INSTANT = "instant"
     NBLOCKS = "nblocks"
+    LINEAR = "linear"
+    EXPONENTIAL = "exponential"
+    CUSTOM = "custom"
 
 
 class AggregationMethod(Enum):
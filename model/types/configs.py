@@ -2,7 +2,7 @@
 Typing for Configs
 """
 
-from typing import Any, NamedTuple
+from typing import Any, List, NamedTuple, Optional, Tuple
 from model.entities.balance import Balance
 
 from model.types.base import (AggregationMethod,
@@ -17,10 +17,18 @@ from model.types.pair import Pair
 
 
 class TraderConfig(NamedTuple):
+    """
+    Traders are named <name>_<index>, name defaults to the trader type.
+    Traders of configs with the same name replace each other.
+    """
     trader_type: TraderType
     count: int
     balance: Balance
     exchange: MentoExchange
+    name: Optional[str] = None
+
+    def account_names(self) -> List[str]:
+        return [f"{self.name or self.trader_type}_{index}" for index in range(self.count)]
 
 
 class MentoExchangeConfig(NamedTuple):
@@ -33,6 +41,19 @@ class MentoExchangeConfig(NamedTuple):
     max_sell_fraction_of_float: float
 
 
+class QuantLibProcess(NamedTuple):
+    """
+    A QuantLib stochastic process class referenced by name, QuantLib
+    is only imported once a process is created by the QuantLib model
+    """
+    name: str
+
+    def __call__(self, *args):
+        # pylint: disable=import-outside-toplevel
+        import QuantLib
+        return getattr(QuantLib, self.name)(*args)
+
+
 class MarketPriceConfig(NamedTuple):
     pair: Pair
     process: Any
@@ -41,13 +62,26 @@ class MarketPriceConfig(NamedTuple):
 
 
 class OracleConfig(NamedTuple):
+    """
+    reporting_interval is in seconds, delay in blocks and price_threshold the relative
+    deviation of the oracle rate from the market price that triggers a report.
+    With reporting_jitter the providers don't report on the same blocks.
+    """
     type: OracleType
     count: int
     aggregation: AggregationMethod
     delay: int
     reporting_interval: int
-    price_threshold: int
+    price_threshold: float
+    reporting_jitter: bool = False
 
 class ImpactDelayConfig(NamedTuple):
+    """
+    param_1 is the number of blocks a supply change is spread over,
+    param_2 the decay rate per block of the EXPONENTIAL model and
+    kernel the weights per block of the CUSTOM model
+    """
     model: ImpactDelayType
     param_1: float
+    param_2: Optional[float] = None
+    kernel: Optional[Tuple[float, ...]] = None
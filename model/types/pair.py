@@ -2,12 +2,17 @@
 Provides a Pair class with exchange rate functionality
 """
 from __future__ import annotations
-from typing import TYPE_CHECKING, NamedTuple, Union
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Tuple
 from model.types.base import CryptoAsset, Currency, Fiat, Stable
 
 if TYPE_CHECKING:
     from model.state_variables import StateVariables
 
+# pylint: disable=too-few-public-methods
+
+# Evaluates a conversion route on the market prices of a timestep
+RouteValue = Callable[[Dict["Pair", float]], float]
+
 
 class Rate(NamedTuple):
     """
@@ -47,24 +52,40 @@ class Pair(NamedTuple):
     def inverse(self) -> Pair:
         return Pair(self.quote, self.base)
 
-    def get_rate(self, state: StateVariables) -> float:
+    def get_rate(self, state: StateVariables) -> Rate:
         """
         Get the market rate for any pair as long as there's a path
-        of other pairs with prices in market_price
+        of other pairs with prices in market_price. The route is
+        resolved once per set of market pairs, see ROUTES.
         """
-        if self in state['market_price']:
-            rate = Rate(state['market_price'].get(self), self)
-        elif self.inverse in state['market_price']:
-            rate = Rate(1 / state['market_price'].get(self.inverse), self)
+        market_price = state['market_price']
+        routes = ROUTES.for_market_price(market_price)
+        route = routes.get(self)
+        if route is None:
+            route = routes[self] = self.resolve_route(market_price.keys())
+        value, pair = route
+        return Rate(value(market_price), pair)
 
-        else:
-            pairs = self.get_pairs(state)
-            rate = pairs[0].get_rate(state)
-            for pair in pairs[1:]:
-                rate *= pair.get_rate(state)
-        return rate
+    def resolve_route(self, market_pairs: Iterable[Pair]) -> Tuple[RouteValue, Pair]:
+        """
+        Resolves the path of pairs with prices in market_pairs. Returns a function
+        evaluating the rate with the same operations as multiplying the Rates of
+        the path, and the pair the rate is quoted in.
+        """
+        if self in market_pairs:
+            return (lambda market_price: market_price.get(self)), self
+        if self.inverse in market_pairs:
+            inverse = self.inverse
+            return (lambda market_price: 1 / market_price.get(inverse)), self
+
+        pairs = self.get_pairs(market_pairs)
+        value, rate_pair = pairs[0].resolve_route(market_pairs)
+        for pair in pairs[1:]:
+            value, rate_pair = multiply_routes(
+                (value, rate_pair), pair.resolve_route(market_pairs))
+        return value, rate_pair
 
-    def get_pairs(self, state) -> Union[Currency, Pair]:
+    def get_pairs(self, market_pairs: Iterable[Pair]) -> List[Pair]:
         """
         Get the list of pairs between self.base -> self.quote
         """
@@ -74,30 +95,90 @@ class Pair(NamedTuple):
         elif isinstance(self.base, CryptoAsset) and isinstance(self.quote, CryptoAsset):
             pairs = [Pair(self.base, Fiat.USD), Pair(self.quote, Fiat.USD)]
         elif isinstance(self.base, Stable) and isinstance(self.quote, Stable):
-            end_pair = self.get_simulated_pair(state, match_base=False)
+            end_pair = self.get_simulated_pair(market_pairs, match_base=False)
             return [Pair(self.base, end_pair.quote), end_pair]
         elif isinstance(self.base, CryptoAsset) and isinstance(self.quote, Fiat):
             pairs = Pair(self.base, CryptoAsset.CELO).get_pairs(
-                state)
+                market_pairs)
             pairs.extend([Pair(CryptoAsset.CELO, self.quote)])
         elif isinstance(self.base, CryptoAsset) and isinstance(self.quote, Stable):
-            end_pair = self.get_simulated_pair(state, match_base=False)
+            end_pair = self.get_simulated_pair(market_pairs, match_base=False)
             pairs = [Pair(self.base, end_pair.quote), end_pair]
         elif isinstance(self.base, Stable) and isinstance(self.quote, Fiat):
-            start_pair = self.get_simulated_pair(state)
+            start_pair = self.get_simulated_pair(market_pairs)
             pairs = [start_pair]
             pairs.extend(
-                Pair(start_pair.quote, self.quote).get_pairs(state))
+                Pair(start_pair.quote, self.quote).get_pairs(market_pairs))
         else:
-            pairs = self.inverse.get_pairs(state)
+            pairs = self.inverse.get_pairs(market_pairs)
         return pairs
 
-    def get_simulated_pair(self, state, match_base=True):
+    def get_simulated_pair(self, market_pairs: Iterable[Pair], match_base=True):
         def match_reference(x):
             return self.base if x else self.quote
-        market_prices = state['market_price']
-        pair = [pair for pair in market_prices if pair.base ==
+        pair = [pair for pair in market_pairs if pair.base ==
                 match_reference(match_base)]
         assert len(
             pair) == 1, f'No or multiple pairs simulated for {match_reference(match_base)}'
         return pair[0]
+
+
+def multiply_routes(
+    route: Tuple[RouteValue, Pair], other: Tuple[RouteValue, Pair]
+) -> Tuple[RouteValue, Pair]:
+    """
+    Route equivalent of Rate.__mul__, the inversions only depend
+    on the pairs so they're decided when resolving the route
+    """
+    (value, pair), (other_value, other_pair) = route, other
+    common_ccy = set([pair.base, pair.quote]).intersection(
+        set([other_pair.base, other_pair.quote]))
+    assert common_ccy, "Pairs are not compatible"
+
+    invert, invert_other = False, False
+    if pair.quote == other_pair.quote:
+        invert_other = True
+    elif pair.base == other_pair.quote:
+        invert, invert_other = True, True
+    elif pair.base == other_pair.base:
+        invert = True
+
+    def product(market_price):
+        lhs = value(market_price)
+        rhs = other_value(market_price)
+        return (1 / lhs if invert else lhs) * (1 / rhs if invert_other else rhs)
+
+    return product, Pair(
+        pair.quote if invert else pair.base,
+        other_pair.base if invert_other else other_pair.quote,
+    )
+
+
+class RouteCache():
+    """
+    Conversion routes by pair for every set of market pairs. All market_price
+    dicts of a run share their pairs, so the routes of the last market_price
+    dict are looked up by identity and the set of pairs is only hashed
+    once per dict, or again when pairs were added to or removed from it.
+    """
+
+    def __init__(self):
+        self.routes: Dict[FrozenSet[Pair], Dict[Pair, Tuple[RouteValue, Pair]]] = {}
+        # keeps the last market_price alive so its id isn't reused
+        self.last_market_price = None
+        self.last_size = 0
+        self.last_routes = None
+
+    def for_market_price(self, market_price) -> Dict[Pair, Tuple[RouteValue, Pair]]:
+        """
+        Routes for the pairs of market_price. A market_price dict whose pairs
+        are replaced in place by as many other pairs must not be reused.
+        """
+        if market_price is not self.last_market_price or len(market_price) != self.last_size:
+            self.last_routes = self.routes.setdefault(frozenset(market_price), {})
+            self.last_market_price = market_price
+            self.last_size = len(market_price)
+        return self.last_routes
+
+
+ROUTES = RouteCache()
@@ -0,0 +1,130 @@
+"""
+Checkpoint periodically saves everything a run needs to continue, so that
+an interrupted experiment can be resumed and produces the same results as
+an uninterrupted one. Besides radCAD's state, the generators keep state of
+their own (prices, oracle reports, balances, price impact, RNGs), which is
+saved with the parameters holding the GeneratorContainer and RNGProvider.
+
+Layout: <path>/simulation=<s>/subset=<s>/run=<r>.pkl
+"""
+import hashlib
+import logging
+import pickle
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from radcad import wrappers
+
+from model.utils.files import write_atomically
+from model.utils.state_history import StateHistory
+
+
+class RunSnapshot(NamedTuple):
+    """
+    State of a run after `timestep` timesteps. Generators and their
+    numpy Generators (incl. the bit generator states) are pickled as part
+    of params. The state update blocks aren't picklable, they are
+    hydrated again from the restored generators.
+    """
+    fingerprint: str
+    timestep: int
+    completed: bool
+    initial_state: Dict[str, Any]
+    state_history: StateHistory
+    recorder: Any
+    params: Dict[str, Any]
+
+
+class Checkpoint():
+    """
+    Engine checkpoints. Every run is saved by the process that executes it
+    every `every` timesteps and once it has completed. When the experiment
+    is run again, runs continue from their last checkpoint, completed runs
+    aren't executed again. The checkpoints are removed once the experiment
+    has completed.
+
+    A checkpoint is only used if the parameters, initial state and number of
+    timesteps of its run are unchanged. Changes of the model code aren't
+    detected, clear the checkpoints after changing the model.
+    """
+    path: Path
+    every: int
+
+    def __init__(self, path: Union[str, Path], every: int = 1000):
+        self.path = Path(path)
+        self.every = every
+
+    def prepare(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def run(
+        self,
+        simulation: int,
+        subset: int,
+        run: int,
+        run_args: wrappers.RunArgs
+    ) -> "RunCheckpoint":
+        return RunCheckpoint(
+            self,
+            self.path / f"simulation={simulation}" / f"subset={subset}" / f"run={run}.pkl",
+            fingerprint(run_args)
+        )
+
+    def runs(self) -> List[Tuple[int, int, int]]:
+        """
+        Simulation, subset and run of all checkpointed runs
+        """
+        return [
+            tuple(
+                int(part.split("=")[1])
+                for part in file.relative_to(self.path).with_suffix("").parts
+            )
+            for file in self.path.glob("simulation=*/subset=*/run=*.pkl")
+        ]
+
+    def clear(self):
+        for file in self.path.glob("simulation=*/subset=*/run=*.pkl"):
+            file.unlink()
+
+
+class RunCheckpoint(NamedTuple):
+    """
+    The checkpoint of a single run
+    """
+    checkpoint: Checkpoint
+    file: Path
+    fingerprint: str
+
+    def due(self, timestep: int, timesteps: int) -> bool:
+        return timestep % self.checkpoint.every == 0 or timestep == timesteps
+
+    def save(self, snapshot: RunSnapshot):
+        """
+        Writes the snapshot atomically, a crash while writing
+        leaves the previous checkpoint in place
+        """
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        write_atomically(
+            self.file, lambda file: pickle.dump(snapshot, file, pickle.HIGHEST_PROTOCOL))
+
+    def load(self) -> Optional[RunSnapshot]:
+        if not self.file.exists():
+            return None
+        with open(self.file, "rb") as file:
+            snapshot = pickle.load(file)
+        if snapshot.fingerprint != self.fingerprint:
+            logging.warning("Ignoring checkpoint %s of a different run", self.file)
+            return None
+        return snapshot
+
+
+def fingerprint(run_args: wrappers.RunArgs) -> str:
+    """
+    Hash of everything defining a run besides the model code
+    """
+    return hashlib.sha256(pickle.dumps((
+        run_args.timesteps,
+        run_args.initial_state,
+        run_args.parameters,
+        run_args.drop_substeps,
+    ), pickle.HIGHEST_PROTOCOL)).hexdigest()
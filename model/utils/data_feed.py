@@ -1,21 +1,38 @@
 """
 DataFeed class used for loading and parsing of
 historical data required by the simulation.
+
+Sources are converted once into a binary cache next to them
+(data/.cache), keyed by the content hash of the source file.
+The cached log returns are memory-mapped read-only, so all runs
+of a process and all worker processes share the same pages and
+only the first one pays for parsing the source. pandas is only
+imported to parse a source.
 """
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+import hashlib
+import json
 import os
 import numpy as np
-import pandas as pd
 
 from experiments.simulation_configuration import DATA_SOURCE
-# pylint: disable = unused-import
-# pylint: disable = redefined-outer-name
-import data.mock_data  # this is necessary to create mock data if not existent
+from model.utils.files import write_atomically
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 DATA_FOLDER = Path(__file__, "../../../data/").resolve()
+CACHE_FOLDER_NAME = ".cache"
 MOCK_DATA_FILE_NAME = "mock_logreturns.prq"
 HISTORICAL_DATA_FILE_NAME = "historical_market_data/scenario_data_example.csv"
 
+# Log returns and asset names by content hash, shared by all DataFeeds of a process
+CachedData = Tuple[np.ndarray, List[str]]
+_loaded: Dict[str, CachedData] = {}
+# Content hash by source path, modification time and size
+_hashes: Dict[Tuple[str, int, int], str] = {}
+
 # pylint: disable = too-few-public-methods
 
 
@@ -28,20 +45,48 @@ class DataFeed:
         self.data_folder = data_folder
 
         if DATA_SOURCE == 'mock':
-            self.historical_data = self.load_mock_data(MOCK_DATA_FILE_NAME)
+            mock_data_path = Path(data_folder, MOCK_DATA_FILE_NAME)
+            if not mock_data_path.exists():
+                # pylint: disable=import-outside-toplevel
+                from data.mock_data import create_mock_data
+                create_mock_data(mock_data_path)
+            self.data, self.assets = self.cached(MOCK_DATA_FILE_NAME, self.load_mock_data)
         elif DATA_SOURCE == 'historical':
-            self.historical_data = self.load_historical_data(HISTORICAL_DATA_FILE_NAME)
+            self.data, self.assets = self.cached(
+                HISTORICAL_DATA_FILE_NAME, self.load_historical_data)
         else:
             raise NotImplementedError("Data source not supported")
 
-        self.data = np.array(self.historical_data)
-        self.length = len(self.historical_data)
-        self.assets = list(self.historical_data.columns)
+        self.length = len(self.data)
+
+    def cached(self, data_file_name: str,
+               load: Callable[[str], "pd.DataFrame"]) -> CachedData:
+        """
+        Returns the read-only log returns and asset names of a source,
+        converting the source with load only if it isn't cached yet
+        """
+        source = Path(self.data_folder, data_file_name)
+        content_hash = file_hash(source)
+        if content_hash not in _loaded:
+            cache_file = Path(
+                self.data_folder, CACHE_FOLDER_NAME, f"{source.stem}-{content_hash[:16]}")
+            try:
+                _loaded[content_hash] = read_cache(cache_file)
+            except (OSError, ValueError):
+                log_returns = load(data_file_name)
+                write_cache(cache_file, log_returns)
+                _loaded[content_hash] = (
+                    np.array(log_returns, dtype=float), list(log_returns.columns))
+                _loaded[content_hash][0].flags.writeable = False
+        return _loaded[content_hash]
 
     def load_mock_data(self, data_file_name):
         """
         loads mock logreturns as generated in data/mock_data.py
         """
+        # pylint: disable=import-outside-toplevel
+        import pandas as pd
+
         mock_data = pd.read_parquet(Path(self.data_folder, data_file_name))
         return mock_data
 
@@ -50,6 +95,9 @@ class DataFeed:
         loads historical data for cusd_usd and celo_usd from one file
         currently .csv and .prq file extensions are supported
         """
+        # pylint: disable=import-outside-toplevel
+        import pandas as pd
+
         if data_file_name.endswith('.prq'):
             historical_prices = pd.read_parquet(Path(self.data_folder, data_file_name))
         elif data_file_name.endswith('.csv'):
@@ -66,3 +114,47 @@ class DataFeed:
         calculates log returns out of a data frame with price time series in its columns
         """
         return data_frame.apply(lambda column: np.log((column/column.shift(1)).dropna()))
+
+
+def file_hash(path: Path) -> str:
+    """
+    SHA-256 of the file content, only rehashed when the file changed
+    """
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+        _hashes[key] = digest.hexdigest()
+    return _hashes[key]
+
+
+def read_cache(cache_file: Path) -> CachedData:
+    """
+    Memory-maps the cached log returns read-only
+    """
+    with open(cache_file.with_suffix(".json"), encoding="utf-8") as file:
+        assets = json.load(file)
+    return np.load(cache_file.with_suffix(".npy"), mmap_mode="r"), assets
+
+
+def write_cache(cache_file: Path, log_returns: "pd.DataFrame"):
+    """
+    Writes the cache atomically, so concurrent workers converting the same
+    source don't see partial files, and removes caches of older versions of
+    the source. The cache is an optimisation, failing to write it is ignored.
+    """
+    try:
+        cache_file.parent.mkdir(exist_ok=True)
+        for stale in cache_file.parent.glob(f"{cache_file.name.rsplit('-', 1)[0]}-*"):
+            if stale.stem != cache_file.name:
+                stale.unlink(missing_ok=True)
+        for suffix, write in [
+            (".npy", lambda file: np.save(file, np.array(log_returns, dtype=float))),
+            (".json", lambda file: file.write(json.dumps(list(log_returns.columns)).encode())),
+        ]:
+            write_atomically(cache_file.with_suffix(suffix), write)
+    except OSError:
+        pass
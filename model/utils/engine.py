@@ -2,12 +2,25 @@
 radCAD Engine extension to give us more control over how simulations happen
 """
 import copy
-from functools import reduce
-from typing import Any, Callable, Dict, List, NamedTuple
+import logging
+import multiprocessing
+import pickle
+import traceback
+from functools import partial, reduce
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+import pandas as pd
 from radcad.engine import Engine as RadCadEngine
+from radcad.backends import Backend, Executor
 from radcad import core, wrappers
+from radcad.utils import extract_exceptions
 
+from model.system_parameters import FORKABLE_PARAMETERS
+from model.utils.checkpoint import Checkpoint, RunCheckpoint, RunSnapshot
+from model.utils.recorder import ColumnarRecorder, HistoryRecorder
 from model.utils.rng_provider import RNGProvider
+from model.utils.sink import ParquetDataset, ParquetSink
+from model.utils.state_history import StateHistory, history_size
 
 from .generator_container import GENERATOR_CONTAINER_PARAM_KEY, GeneratorContainer
 
@@ -18,15 +31,126 @@ class SimulationConfig(NamedTuple):
     state_update_blocks: List[Any]
     run_index: int
 
+
+class RunOptions(NamedTuple):
+    """
+    Engine options that are shipped to the executors with every run
+    """
+    raise_exceptions: bool
+    columnar_results: bool
+    sink: Optional[ParquetSink]
+    checkpoint: Optional[Checkpoint]
+    fork_after: Optional[int]
+
 # pylint: disable=too-many-locals,protected-access,too-few-public-methods
 class Engine(RadCadEngine):
     """
     Extends the radcad.Engine with the ability to:
     - Inject generators into a simulation run
     - Dynamically generate state update blocks based on the generators
+    - Execute runs and sweep subsets in a process pool, hydrating
+      generators and RNGs inside the worker processes
+    - Record results into preallocated columns (columnar_results=True),
+      in which case executable.results is a flat pandas DataFrame
+    - Stream results to a partitioned Parquet dataset (sink=ParquetSink(...)),
+      in which case executable.results is a lazy ParquetDataset
+    - Skip inert state update blocks according to their "active" schedule
+    - Checkpoint runs periodically (checkpoint=Checkpoint(...)) and resume
+      them from their last checkpoint when an interrupted experiment is rerun
+    - Simulate the first fork_after timesteps of the subsets of a run once
+      (fork_after=...) and fork the subsets from there, see shared_prefixes
     """
 
+    def __init__(self, **kwargs):
+        self.columnar_results = kwargs.pop("columnar_results", False)
+        self.sink = kwargs.pop("sink", None)
+        self.checkpoint = kwargs.pop("checkpoint", None)
+        self.fork_after = kwargs.pop("fork_after", None)
+        super().__init__(**kwargs)
+
+    def run_options(self) -> RunOptions:
+        return RunOptions(
+            raise_exceptions=self.raise_exceptions,
+            columnar_results=self.columnar_results,
+            sink=self.sink,
+            checkpoint=self.checkpoint,
+            fork_after=self.fork_after
+        )
+
+    def _run(self, executable=None, **kwargs):
+        if not executable:
+            raise Exception("Experiment or simulation required as Executable argument")
+        self.executable = executable
+
+        if kwargs:
+            raise Exception(f"Invalid Engine option in {kwargs}")
+
+        simulations = (
+            executable.simulations
+            if isinstance(executable, wrappers.Experiment)
+            else [executable]
+        )
+        executor_class = EXECUTORS.get(self.backend)
+        if executor_class is None:
+            raise Exception(
+                f"Execution backend must be one of {[backend.name for backend in EXECUTORS]}"
+            )
+        configs = [
+            (
+                sim.model.initial_state,
+                sim.model.state_update_blocks,
+                sim.model.params,
+                sim.timesteps,
+                sim.runs,
+            )
+            for sim in simulations
+        ]
+
+        self.executable._before_experiment(
+            experiment=(executable if isinstance(executable, wrappers.Experiment) else None)
+        )
+
+        if self.checkpoint is not None:
+            self.checkpoint.prepare()
+        if self.sink is not None:
+            # the results written so far by checkpointed runs are kept
+            self.sink.prepare(keep=[
+                self.sink.partition(*run) for run in self.checkpoint.runs()
+            ] if self.checkpoint is not None else [])
+
+        self._run_generator = self._run_stream(configs)
+        if self.fork_after is not None:
+            self._run_generator = shared_prefixes(self._run_generator)
+        result = executor_class(self).execute_runs()
+        if self.fork_after is not None:
+            # subsets sharing a prefix are executed together
+            result.sort(key=lambda run: (
+                run[1]['simulation'], run[1]['run'], run[1]['subset']))
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+
+        if self.sink is not None:
+            self.executable.results = ParquetDataset(self.sink.path)
+            self.executable.exceptions = [run_info for _, run_info in result]
+        elif self.columnar_results:
+            self.executable.results = pd.concat(
+                [pd.DataFrame(columns) for columns, _ in result],
+                ignore_index=True
+            )
+            self.executable.exceptions = [run_info for _, run_info in result]
+        else:
+            self.executable.results, self.executable.exceptions = extract_exceptions(result)
+        self.executable._after_experiment(
+            experiment=(executable if isinstance(executable, wrappers.Experiment) else None)
+        )
+        return self.executable.results
+
     def _run_stream(self, configs):
+        """
+        Yields one picklable RunArgs per run and subset. Generators and
+        RNGs are not part of the RunArgs, they are hydrated by
+        _single_run_wrapper right before the run is executed.
+        """
         simulations = [Engine._get_simulation_from_config(config) for config in configs]
 
         for simulation_index, simulation in enumerate(simulations):
@@ -37,7 +161,7 @@ class Engine(RadCadEngine):
             initial_state = simulation.model.initial_state
             state_update_blocks = simulation.model.state_update_blocks
             params = simulation.model.params
-            param_sweep = core.generate_parameter_sweep(params)
+            param_sweep = core.generate_parameter_sweep(params) or [params]
 
             self.executable._before_simulation(
                 simulation=simulation
@@ -45,78 +169,441 @@ class Engine(RadCadEngine):
 
             # NOTE Hook allows mutation of RunArgs
             for run_index in range(0, runs):
-                if param_sweep:
+                context = wrappers.Context(
+                    simulation_index,
+                    run_index,
+                    None,
+                    timesteps,
+                    initial_state,
+                    params
+                )
+                self.executable._before_run(context=context)
+                for subset_index, param_set in enumerate(param_sweep):
                     context = wrappers.Context(
                         simulation_index,
                         run_index,
-                        None,
+                        subset_index,
                         timesteps,
                         initial_state,
                         params
                     )
-                    self.executable._before_run(context=context)
-                    for subset_index, param_set in enumerate(param_sweep):
-                        context = wrappers.Context(
-                            simulation_index,
-                            run_index,
-                            subset_index,
-                            timesteps,
-                            initial_state,
-                            params
-                        )
-                        self.executable._before_subset(context=context)
-                        config = __prepare_simulation_config__(SimulationConfig(
-                                param_set,
-                                initial_state,
-                                state_update_blocks,
-                                run_index))
-                        yield wrappers.RunArgs(
-                            simulation_index,
-                            timesteps,
-                            run_index,
-                            subset_index,
-                            copy.deepcopy(config.state),
-                            config.state_update_blocks,
-                            config.params,
-                            self.deepcopy,
-                            self.drop_substeps)
-                        self.executable._after_subset(context=context)
-                    self.executable._after_run(context=context)
-                else:
-                    context = wrappers.Context(
-                        simulation_index,
-                        run_index,
-                        0,
-                        timesteps,
-                        initial_state,
-                        params)
-                    self.executable._before_run(context=context)
                     self.executable._before_subset(context=context)
-
-                    config = __prepare_simulation_config__(SimulationConfig(
-                            param_set,
-                            initial_state,
-                            state_update_blocks,
-                            run_index))
-
                     yield wrappers.RunArgs(
                         simulation_index,
                         timesteps,
                         run_index,
-                        0,
-                        copy.deepcopy(config.state),
-                        config.state_update_blocks,
-                        config.params,
+                        subset_index,
+                        copy.deepcopy(initial_state),
+                        state_update_blocks,
+                        dict(param_set),
                         self.deepcopy,
-                        self.drop_substeps,
-                    )
+                        self.drop_substeps)
                     self.executable._after_subset(context=context)
-                    self.executable._after_run(context=context)
+                self.executable._after_run(context=context)
 
             self.executable._after_simulation(
                 simulation=simulation
             )
 
+
+class ExecutorSingleProcess(Executor):
+    """
+    Executes all runs sequentially in the current process
+    """
+
+    def execute_runs(self):
+        return [
+            result
+            for run_args in self.engine._run_generator
+            for result in _execute((run_args, self.engine.run_options()))
+        ]
+
+
+class ExecutorProcessPool(Executor):
+    """
+    Executes runs in a pool of worker processes. Only the picklable
+    RunArgs are shipped to the workers, generators are hydrated
+    worker-side. The results of all runs are collected in the parent
+    in submission order before they are returned, unless there is a
+    sink, to which the workers write the results of their runs directly.
+    """
+
+    def execute_runs(self):
+        with multiprocessing.Pool(processes=self.engine.processes) as pool:
+            result = [
+                result
+                for results in pool.imap(
+                    _execute,
+                    (
+                        (run_args, self.engine.run_options())
+                        for run_args in self.engine._run_generator
+                    ),
+                    chunksize=1
+                )
+                for result in results
+            ]
+            pool.close()
+            pool.join()
+        return result
+
+
+EXECUTORS: Dict[Backend, Callable[[RadCadEngine], Executor]] = {
+    Backend.SINGLE_PROCESS: ExecutorSingleProcess,
+    Backend.DEFAULT: ExecutorProcessPool,
+    Backend.MULTIPROCESSING: ExecutorProcessPool,
+    Backend.PATHOS: ExecutorProcessPool,
+}
+
+
+def _execute(args):
+    """
+    Executes a run, or the subsets of a run sharing a prefix,
+    this is the unit of work sent to the executor backends.
+    """
+    run_args, options = args
+    if isinstance(run_args, list):
+        return _forked_runs(run_args, options)
+    return [_single_run_wrapper(args)]
+
+
+def _single_run_wrapper(args, snapshot: Optional[RunSnapshot] = None):
+    """
+    Hydrates the generators and RNGs for a single run and executes it.
+    A run continuing from a snapshot, i.e. its checkpoint or the prefix
+    it shares with other subsets, restores its generators and RNGs instead.
+    """
+    run_args, options = args
+    run_checkpoint = None
+    if options.checkpoint is not None:
+        run_checkpoint = options.checkpoint.run(
+            run_args.simulation, run_args.subset, run_args.run + 1, run_args)
+        checkpointed = run_checkpoint.load()
+        if checkpointed is not None:
+            snapshot = checkpointed
+    if snapshot is None:
+        config = __prepare_simulation_config__(SimulationConfig(
+            dict(run_args.parameters),
+            run_args.initial_state,
+            run_args.state_update_blocks,
+            run_args.run))
+    else:
+        config = __hydrate_state_update_blocks__(SimulationConfig(
+            snapshot.params,
+            snapshot.initial_state,
+            run_args.state_update_blocks,
+            run_args.run))
+    hydrated_run_args = run_args._replace(
+        initial_state=config.state,
+        state_update_blocks=config.state_update_blocks,
+        parameters=config.params
+    )
+    result, run_info = _recorded_single_run(
+        hydrated_run_args, options, run_checkpoint, snapshot)
+    if isinstance(run_info, dict):
+        # Generators aren't picklable, so only send back the raw parameters
+        run_info['parameters'] = run_args.parameters
+    return result, run_info
+
+
+def shared_prefixes(stream: Iterable[wrappers.RunArgs]) -> Iterator[List[wrappers.RunArgs]]:
+    """
+    Groups the subsets of every run whose parameters only differ in
+    FORKABLE_PARAMETERS. The subsets of a group share their prefix,
+    simulated with the parameters of the first subset of the group,
+    and continue with their own parameters after it.
+    """
+    for _, runs in groupby(stream, key=lambda run_args: (run_args.simulation, run_args.run)):
+        groups: List[List[wrappers.RunArgs]] = []
+        for run_args in runs:
+            group = next((group for group in groups if shares_prefix(group[0], run_args)), None)
+            if group is None:
+                groups.append([run_args])
+            else:
+                group.append(run_args)
+        yield from groups
+
+
+def shares_prefix(run_args: wrappers.RunArgs, other: wrappers.RunArgs) -> bool:
+    def prefix_parameters(run_args: wrappers.RunArgs):
+        return {
+            key: value for key, value in run_args.parameters.items()
+            if key not in FORKABLE_PARAMETERS
+        }
+    return (
+        run_args.timesteps == other.timesteps
+        and run_args.initial_state == other.initial_state
+        and prefix_parameters(run_args) == prefix_parameters(other)
+    )
+
+
+class ForkPoint():
+    """
+    Stands in for a RunCheckpoint to keep the snapshot at the end of a shared
+    prefix in memory, every subset continues from its own copy of it
+    """
+    fingerprint = ""
+    timestep: int
+    snapshot: Optional[bytes]
+
+    def __init__(self, timestep: int, rows: int, rows_per_timestep: int):
+        self.timestep = timestep
+        self.rows = rows
+        self.rows_per_timestep = rows_per_timestep
+        self.snapshot = None
+
+    def due(self, timestep: int, _timesteps: int) -> bool:
+        return timestep == self.timestep
+
+    def save(self, snapshot: RunSnapshot):
+        self.snapshot = pickle.dumps(snapshot, pickle.HIGHEST_PROTOCOL)
+
+    def fork(self, run_args: wrappers.RunArgs, options: RunOptions) -> RunSnapshot:
+        """
+        Returns a copy of the snapshot for a subset, with the forkable
+        parameters of the subset applied to the generators and the
+        states recorded so far relabelled with the subset
+        """
+        snapshot: RunSnapshot = pickle.loads(self.snapshot)
+        params = snapshot.params
+        container = params[GENERATOR_CONTAINER_PARAM_KEY]
+        for key in FORKABLE_PARAMETERS & run_args.parameters.keys():
+            params[key] = copy.deepcopy(run_args.parameters[key])
+            container.params[key] = copy.deepcopy(run_args.parameters[key])
+        for generator in container.generators.values():
+            generator.fork(params)
+
+        snapshot.initial_state["subset"] = run_args.subset
+        for states in snapshot.state_history:
+            for state in states:
+                state["subset"] = run_args.subset
+        recorder = snapshot.recorder
+        recorder.overwrite("subset", run_args.subset)
+        if options.sink is not None:
+            prefix = recorder.to_columns()
+            recorder = options.sink.recorder(
+                run_args.simulation,
+                run_args.subset,
+                run_args.run + 1,
+                self.rows,
+                self.rows_per_timestep
+            )
+            recorder.on_full(prefix)
+        return snapshot._replace(completed=False, recorder=recorder)
+
+
+def _forked_runs(forks: List[wrappers.RunArgs], options: RunOptions):
+    """
+    Simulates the first fork_after timesteps of a group of subsets once
+    and continues every subset from a copy of the snapshot after them
+    """
+    prefix = forks[0]
+    if len(forks) == 1 or not 0 < options.fork_after < prefix.timesteps:
+        return [_single_run_wrapper((run_args, options)) for run_args in forks]
+
+    config = __prepare_simulation_config__(SimulationConfig(
+        dict(prefix.parameters),
+        prefix.initial_state,
+        prefix.state_update_blocks,
+        prefix.run))
+    substeps = len(config.state_update_blocks)
+    rows = ColumnarRecorder.rows_for(prefix.timesteps, substeps, prefix.drop_substeps)
+    if options.sink is None and not options.columnar_results:
+        recorder = HistoryRecorder()
+    elif options.sink is None:
+        recorder = ColumnarRecorder(rows)
+    else:
+        recorder = ColumnarRecorder(ColumnarRecorder.rows_for(
+            options.fork_after, substeps, prefix.drop_substeps))
+    fork_point = ForkPoint(
+        options.fork_after,
+        rows,
+        ColumnarRecorder.rows_per_timestep(substeps, prefix.drop_substeps)
+    )
+    try:
+        _single_run(
+            recorder,
+            prefix.simulation,
+            options.fork_after,
+            prefix.run,
+            prefix.subset,
+            config.state,
+            config.state_update_blocks,
+            config.params,
+            prefix.deepcopy,
+            prefix.drop_substeps,
+            run_checkpoint=fork_point
+        )
+    except Exception as error:  # pylint: disable=broad-except
+        if options.raise_exceptions:
+            raise error
+        # every subset runs on its own and reports its exception
+        return [_single_run_wrapper((run_args, options)) for run_args in forks]
+
+    return [
+        _single_run_wrapper((run_args, options), fork_point.fork(run_args, options))
+        for run_args in forks
+    ]
+
+
+def _recorded_single_run(
+    run_args: wrappers.RunArgs,
+    options: RunOptions,
+    run_checkpoint: Optional[RunCheckpoint] = None,
+    snapshot: Optional[RunSnapshot] = None
+):
+    """
+    Same as radcad.core._single_run_wrapper but records the states
+    into a ColumnarRecorder and returns its columns, writes them to
+    the sink if there is one, or returns radCAD's state history.
+    A resumed run continues recording into the recorder of its snapshot.
+    """
+    rows = ColumnarRecorder.rows_for(
+        run_args.timesteps,
+        len(run_args.state_update_blocks),
+        run_args.drop_substeps
+    )
+    if snapshot is not None:
+        recorder = snapshot.recorder
+    elif options.sink is None and not options.columnar_results:
+        recorder = HistoryRecorder()
+    elif options.sink is None:
+        recorder = ColumnarRecorder(rows)
+    else:
+        recorder = options.sink.recorder(
+            run_args.simulation,
+            run_args.subset,
+            run_args.run + 1,
+            rows,
+            ColumnarRecorder.rows_per_timestep(
+                len(run_args.state_update_blocks), run_args.drop_substeps)
+        )
+    exception, trace = None, None
+    try:
+        if snapshot is None or not snapshot.completed:
+            _single_run(recorder, *tuple(run_args),
+                        run_checkpoint=run_checkpoint, snapshot=snapshot)
+    except Exception as error:  # pylint: disable=broad-except
+        if options.raise_exceptions:
+            raise error
+        exception, trace = error, traceback.format_exc()
+        logging.warning(
+            "Simulation %s / run %s / subset %s failed! Returning partial results.",
+            run_args.simulation, run_args.run, run_args.subset
+        )
+    if options.sink is not None:
+        recorder.flush()
+        result = {}
+    elif options.columnar_results:
+        result = recorder.to_columns()
+    else:
+        result = recorder.history
+    return result, {
+        'exception': exception,
+        'traceback': trace,
+        'simulation': run_args.simulation,
+        'run': run_args.run,
+        'subset': run_args.subset,
+        'timesteps': run_args.timesteps,
+        'parameters': run_args.parameters,
+        'initial_state': run_args.initial_state,
+    }
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def _single_run(
+    recorder: Union[ColumnarRecorder, HistoryRecorder],
+    simulation: int,
+    timesteps: int,
+    run: int,
+    subset: int,
+    initial_state: dict,
+    state_update_blocks: list,
+    params: dict,
+    deepcopy: bool,
+    drop_substeps: bool,
+    run_checkpoint: Optional[RunCheckpoint] = None,
+    snapshot: Optional[RunSnapshot] = None,
+):
+    """
+    Mirrors radcad.core._single_run, but hands every stored
+    state to the recorder instead of returning the history,
+    which is only kept as far back as the model looks.
+
+    State update blocks can declare an activation schedule with an
+    "active" key, a predicate of the timestep of the previous state.
+    When it's false the block is inert, its policies and state update
+    functions are skipped and the state is carried forward untouched.
+
+    With a run_checkpoint a snapshot of the run is saved whenever it's due,
+    a run resumed from a snapshot continues after its last timestep.
+    """
+    if snapshot is None:
+        logging.info("Starting simulation %s / run %s / subset %s", simulation, run, subset)
+
+        initial_state["simulation"] = simulation
+        initial_state["subset"] = subset
+        initial_state["run"] = run + 1
+        initial_state["substep"] = 0
+        if not initial_state.get("timestep", False):
+            initial_state["timestep"] = 0
+
+        state_history = StateHistory(history_size(params), initial_state)
+        recorder.record(initial_state)
+        start = 0
+    else:
+        logging.info("Resuming simulation %s / run %s / subset %s at timestep %s",
+                     simulation, run, subset, snapshot.timestep)
+        state_history = snapshot.state_history
+        start = snapshot.timestep
+
+    for timestep in range(start, timesteps):
+        previous_state: dict = state_history[-1][-1].copy()
+
+        substeps: list = []
+        substate: dict = previous_state.copy()
+
+        for (substep, psu) in enumerate(state_update_blocks):
+            substate = previous_state.copy() if substep == 0 else substeps[substep - 1].copy()
+            active = psu.get("active")
+            if active is None or active(substate["timestep"]):
+                substate_copy = (
+                    pickle.loads(pickle.dumps(substate, -1)) if deepcopy else substate.copy()
+                )
+                substate["substep"] = substep + 1
+
+                signals: dict = core.reduce_signals(
+                    params, substep, state_history, substate_copy, psu, deepcopy
+                )
+
+                updated_state = map(
+                    partial(core._update_state, initial_state, params, substep,
+                            state_history, substate_copy, signals),
+                    psu["variables"].items()
+                )
+                substate.update(updated_state)
+            else:
+                substate["substep"] = substep + 1
+            substate["timestep"] = (
+                (previous_state["timestep"] + 1) if timestep == 0 else timestep + 1
+            )
+            substeps.append(substate)
+
+        substeps = [substate] if not substeps else substeps
+        state_history.append(substeps if not drop_substeps else [substeps.pop()])
+        recorder.record_all(state_history[-1])
+
+        if run_checkpoint is not None and run_checkpoint.due(timestep + 1, timesteps):
+            run_checkpoint.save(RunSnapshot(
+                fingerprint=run_checkpoint.fingerprint,
+                timestep=timestep + 1,
+                completed=timestep + 1 == timesteps,
+                initial_state=initial_state,
+                state_history=state_history,
+                recorder=recorder,
+                params=params,
+            ))
+
+
 def __inject_rng_provider__(config: SimulationConfig):
     config.params.update({
         'rngp': RNGProvider(config.params['rng_seed'], config.run_index)
@@ -0,0 +1,25 @@
+"""
+File helpers shared by the caches and checkpoints
+"""
+import os
+import tempfile
+from pathlib import Path
+from typing import IO, Callable
+
+
+def write_atomically(path: Path, write: Callable[[IO[bytes]], None]):
+    """
+    Writes a file through a temporary file in the same folder that replaces
+    path once it's complete, so concurrent readers never see a partial file.
+    The temporary file is removed if writing fails.
+    """
+    temporary = None
+    try:
+        with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as file:
+            temporary = Path(file.name)
+            write(file)
+        os.replace(temporary, path)
+    except BaseException:
+        if temporary is not None:
+            temporary.unlink(missing_ok=True)
+        raise
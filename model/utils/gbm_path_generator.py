@@ -0,0 +1,57 @@
+"""
+This module provides a NumPy implementation of correlated
+geometric brownian motion paths
+"""
+from typing import Dict, List
+import numpy as np
+
+from experiments import simulation_configuration
+from model import constants
+from model.types.configs import MarketPriceConfig
+from model.types.pair import Pair
+
+
+class GBMPathGenerator():
+    """
+    Generates the log returns of correlated geometric brownian motions,
+    the same model as QuantLibWrapper with GeometricBrownianMotionProcess
+    processes, param_1 is the yearly drift and param_2 the yearly volatility.
+    All timesteps, assets and paths are drawn in a single vectorized call.
+    """
+
+    processes: List[MarketPriceConfig]
+    correlation: List[List[float]]
+    sample_size: int
+    rng: np.random.Generator
+
+    def __init__(self, processes, correlation, sample_size, rng: np.random.Generator):
+        self.processes = processes
+        self.correlation = correlation
+        self.timesteps_per_year = (constants.blocks_per_year /
+                                   simulation_configuration.BLOCKS_PER_TIMESTEP)
+        self.sample_size = sample_size
+        self.rng = rng
+
+    def correlated_returns(self) -> Dict[Pair, np.ndarray]:
+        log_returns = self.generate_correlated_paths()[0]
+        increments = {}
+        for config, path in zip(self.processes, log_returns):
+            increments[config.pair] = path
+        return increments
+
+    def generate_correlated_paths(self, number_of_paths: int = 1) -> np.ndarray:
+        """
+        Returns log returns in the shape (paths x processes x sample_size)
+        """
+        drift = np.array([config.param_1 for config in self.processes]) / self.timesteps_per_year
+        volatility = (np.array([config.param_2 for config in self.processes])
+                      / np.sqrt(self.timesteps_per_year))
+        # scaling the rows of the cholesky factor by the volatilities gives
+        # correlated shocks with the right variance in a single matmul
+        scaled_cholesky = volatility[:, None] * np.linalg.cholesky(
+            np.array(self.correlation, dtype=float))
+
+        shocks = self.rng.standard_normal((number_of_paths, len(self.processes), self.sample_size))
+        log_returns = scaled_cholesky @ shocks
+        log_returns += (drift - volatility ** 2 / 2)[:, None]
+        return log_returns
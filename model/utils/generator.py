@@ -35,6 +35,13 @@ class Generator(ABC):
     def from_parameters(cls, _params, _initial_state, _container) -> "Generator":
         pass
 
+    def fork(self, _params):
+        """
+        Called when a subset continues from the shared prefix of a parameter
+        sweep (see Engine fork_after) with its own FORKABLE_PARAMETERS.
+        Generators keeping any of them apply the new values here.
+        """
+
     def state_update_blocks(self, selectors: List[str]):
         """
         Either inject all state update blocks for a generator or
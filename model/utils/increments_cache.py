@@ -0,0 +1,76 @@
+"""
+IncrementsCache keeps the market increments generated by the stochastic
+market price models, so that the subsets of a parameter sweep which share
+the market scenario of a run generate it only once.
+
+Increments are keyed by the content hash of everything they depend on:
+the model, the processes, the correlation matrix, the sample size, the
+number of blocks per timestep and the seed of the run. Subsets that
+sweep any of these get their own increments.
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+import hashlib
+import pickle
+import numpy as np
+
+from model.utils.files import write_atomically
+
+
+class IncrementsCache():
+    """
+    Least recently used cache of (processes x sample_size) log returns.
+    Cached arrays are read-only, they are shared by the generators of all
+    subsets. If a folder is given, increments are also persisted there and
+    shared by worker processes and later experiments, the folder isn't
+    pruned.
+    """
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def get(
+        self,
+        key: Any,
+        generate: Callable[[], np.ndarray],
+        folder: Optional[Union[str, Path]] = None
+    ) -> np.ndarray:
+        """
+        Returns the increments cached for key, calling generate only
+        if they are neither in memory nor persisted in folder
+        """
+        content_hash = hashlib.sha256(pickle.dumps(key, pickle.HIGHEST_PROTOCOL)).hexdigest()
+        if content_hash in self.entries:
+            self.entries.move_to_end(content_hash)
+            return self.entries[content_hash]
+        cache_file = Path(folder, f"{content_hash[:32]}.npy") if folder is not None else None
+        try:
+            if cache_file is None:
+                raise FileNotFoundError()
+            increments = np.load(cache_file, mmap_mode="r")
+        except (OSError, ValueError):
+            increments = np.array(generate(), dtype=float)
+            increments.flags.writeable = False
+            if cache_file is not None:
+                write_increments(cache_file, increments)
+        self.entries[content_hash] = increments
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return increments
+
+    def clear(self):
+        self.entries.clear()
+
+
+def write_increments(cache_file: Path, increments: np.ndarray):
+    """
+    Persists the increments for other workers and later experiments,
+    if they can't be written they are generated again when needed
+    """
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        write_atomically(cache_file, lambda file: np.save(file, increments))
+    except OSError:
+        pass
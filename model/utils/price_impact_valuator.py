@@ -1,34 +1,112 @@
 """
 Provides Class for price impact valuation
 """
-from typing import Callable, Dict, List
+# pylint: disable=too-many-instance-attributes
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
 import numpy as np
 
 from model.system_parameters import Parameters
-from model.types.base import Fiat, ImpactDelayType, PriceImpact
+from model.types.base import Currency, Fiat, ImpactDelayType, PriceImpact
+from model.types.configs import ImpactDelayConfig
 from model.types.pair import Pair
+from model.utils.timesteps import blocks_per_timestep
 
 PRICE_IMPACT_FUNCTION: Dict[PriceImpact, Callable] = {
     PriceImpact.ROOT_QUANTITY:
         lambda asset_quantity, variance_daily, average_daily_volume:
             -np.sign(asset_quantity)
-            * np.sqrt(variance_daily * abs(asset_quantity) / average_daily_volume)
+            * np.sqrt(variance_daily * np.abs(asset_quantity) / average_daily_volume)
 }
 
+# Weights per block with which a supply change impacts the current and following blocks
+IMPACT_DELAY_KERNEL: Dict[ImpactDelayType, Callable[[ImpactDelayConfig], np.ndarray]] = {
+    ImpactDelayType.INSTANT:
+        lambda config: np.ones(1),
+    ImpactDelayType.NBLOCKS:
+        lambda config: np.ones(int(config.param_1)),
+    ImpactDelayType.LINEAR:
+        lambda config: np.arange(int(config.param_1), 0, -1, dtype=float),
+    ImpactDelayType.EXPONENTIAL:
+        lambda config: np.exp(-config.param_2 * np.arange(int(config.param_1))),
+    ImpactDelayType.CUSTOM:
+        lambda config: np.array(config.kernel, dtype=float),
+}
+
+# Kernels whose supply changes are integrated from their second differences
+# as their blocks are priced in, so their cost per step doesn't depend on the
+# delay. Shorter kernels are added directly, which is cheaper up to about
+# DIFFERENCE_KERNEL_MIN_LENGTH blocks.
+DIFFERENCE_KERNELS = {ImpactDelayType.NBLOCKS, ImpactDelayType.LINEAR}
+DIFFERENCE_KERNEL_MIN_LENGTH = 1024
+
+
+@lru_cache(maxsize=None)
+def impact_delay_kernel(config: ImpactDelayConfig) -> np.ndarray:
+    """
+    Normalized impact delay kernel, i.e. the weights add up to 1
+    so that the whole supply change is priced in eventually.
+    The kernel is shared by all valuators, so it's read-only.
+    """
+    kernel_fn = IMPACT_DELAY_KERNEL.get(config.model)
+    assert kernel_fn is not None, f"{config.model} does not have a kernel"
+    kernel = kernel_fn(config)
+    assert kernel.size > 0 and kernel.sum() > 0, f"Invalid impact delay kernel for {config}"
+    kernel = kernel / kernel.sum()
+    kernel.flags.writeable = False
+    return kernel
+
+
+def compounded(relative_price_impacts: np.ndarray) -> float:
+    """
+    Relative price impact of consecutive blocks
+    """
+    if relative_price_impacts.size == 1:
+        return relative_price_impacts[0]
+    return np.prod(1 + relative_price_impacts) - 1
+
 
 class PriceImpactValuator():
     """
-    This class evaluates the price impact of trades with CEX / general off-chain market
+    This class evaluates the price impact of trades with CEX / general off-chain market.
+    Supply changes are delayed and priced in per block, the supply change of a
+    timestep spanning several blocks starts at its first block and the price
+    impacts of its blocks are compounded.
     """
 
     impacted_assets: List[Pair]
+    currencies: List[Currency]
+    currency_index: Dict[Currency, int]
+    # (currencies x sample_size * blocks_per_timestep) delayed supply changes per block,
+    # the supply changes of the DIFFERENCE_KERNELS are added once they are integrated
+    supply_changes: np.ndarray
+    # NBLOCKS or LINEAR kernel of the supply changes starting at kernel_starts,
+    # the starts are divided by the sum of the (truncated) kernel's weights and
+    # preceded by kernel length + 1 blocks without supply changes
+    difference_kernel: Optional[ImpactDelayConfig]
+    kernel_starts: Optional[np.ndarray]
+    # The blocks before integrated_blocks are integrated into supply_changes,
+    # level and slope are the supply change and its first difference of the last one
+    integrated_blocks: int
+    level: np.ndarray
+    slope: np.ndarray
+    # Block from which level and slope were last integrated, they are recomputed
+    # every kernel length so the rounding errors of the integration don't accumulate
+    restarted_blocks: int
 
     def __init__(self, impacted_assets: List[Pair], sample_size):
         self.impacted_assets = impacted_assets
-        self.supply_changes = {
-            pair.base: np.zeros(sample_size)
-            for pair in impacted_assets
-        }
+        self.currencies = list(dict.fromkeys(pair.base for pair in impacted_assets))
+        self.currency_index = {ccy: index for index, ccy in enumerate(self.currencies)}
+        self.blocks_per_timestep = blocks_per_timestep()
+        self.blocks = sample_size * self.blocks_per_timestep
+        self.supply_changes = np.zeros((len(self.currencies), self.blocks))
+        self.difference_kernel = None
+        self.kernel_starts = None
+        self.integrated_blocks = 0
+        self.level = np.zeros(len(self.currencies))
+        self.slope = np.zeros(len(self.currencies))
+        self.restarted_blocks = 0
         self.sample_size = sample_size
         self.price_impact_model = PriceImpact.ROOT_QUANTITY
 
@@ -43,14 +121,31 @@ class PriceImpactValuator():
         """
         This functions evaluates price impact of supply changes
         """
-        block_supply_change = {
-            ccy: supply - pre_floating_supply[ccy]
-            for ccy, supply in floating_supply.items()
-        }
-        self.impact_delay(block_supply_change, current_step, params)
-
         impacted_prices = market_prices.copy()
+        for pair, relative_price_impact in self.relative_price_impact(
+            floating_supply, pre_floating_supply, current_step, params
+        ).items():
+            impacted_prices[pair] *= 1 + relative_price_impact
+        return impacted_prices
+
+    def relative_price_impact(
+        self,
+        floating_supply,
+        pre_floating_supply,
+        current_step,
+        params: Parameters
+    ) -> Dict[Pair, float]:
+        """
+        This functions evaluates the relative price impact of
+        supply changes for every impacted asset
+        """
+        block_supply_change = np.zeros(len(self.currencies))
+        for ccy, supply in floating_supply.items():
+            block_supply_change[self.currency_index[ccy]] = supply - pre_floating_supply[ccy]
+        self.impact_delay(block_supply_change, current_step, params)
+        supply_changes = self.priced_in_supply_changes(current_step)
 
+        relative_price_impacts = {}
         for pair in self.impacted_assets:
             if isinstance(pair.base, Fiat):
                 raise Exception(f'Incorrect quoting convention for {pair}')
@@ -58,31 +153,118 @@ class PriceImpactValuator():
             average_daily_volume = params["average_daily_volume"][pair]
             impact_fn = PRICE_IMPACT_FUNCTION.get(self.price_impact_model)
             assert impact_fn is not None, f"{self.price_impact_model} does not have a function"
-            relative_price_impact = impact_fn(
-                self.supply_changes[pair.base][current_step],
+            relative_price_impacts[pair] = compounded(impact_fn(
+                supply_changes[self.currency_index[pair.base]],
                 variance_daily,
                 average_daily_volume,
-            )
-            impacted_prices[pair] *= 1 + relative_price_impact
-        return impacted_prices
+            ))
+        return relative_price_impacts
 
     def impact_delay(
-        self, block_supply_change, current_step, params: Parameters
+        self, block_supply_change: np.ndarray, current_step, params: Parameters
+    ):
+        """
+        This function distributes / delays supply changes across future blocks
+        according to the impact delay kernel, which is truncated and renormalized
+        at the end of the sample. Long DIFFERENCE_KERNELS are added in O(1),
+        all other kernels with a vectorized add over the kernel.
+        """
+        config = params['impact_delay']
+        first_block = current_step * self.blocks_per_timestep
+        if first_block >= self.blocks:
+            return
+        if (config.model in DIFFERENCE_KERNELS
+                and config.param_1 >= DIFFERENCE_KERNEL_MIN_LENGTH):
+            self.add_differences(block_supply_change, first_block, config)
+            return
+        kernel = impact_delay_kernel(config)
+        blocks = min(kernel.size, self.blocks - first_block)
+        if blocks < kernel.size:
+            kernel = kernel[:blocks] / kernel[:blocks].sum()
+        self.supply_changes[:, first_block:first_block + blocks] += np.outer(
+            block_supply_change, kernel)
+
+    def add_differences(
+        self, block_supply_change: np.ndarray, first_block: int, config: ImpactDelayConfig
     ):
         """
-        This function distributes / delays supply changes across future timesteps
-        """
-        impact_delay = params['impact_delay']
-        for ccy in block_supply_change:
-            if impact_delay.model == ImpactDelayType.INSTANT:
-                self.supply_changes[ccy][current_step] += block_supply_change[ccy]
-
-            elif impact_delay.model == ImpactDelayType.NBLOCKS:
-                delay = impact_delay.param_1
-                for block in range(current_step, current_step +
-                                   min(delay, self.sample_size % current_step)):
-                    self.supply_changes[ccy][block] += (1 /
-                                                        min(delay,
-                                                            self.sample_size %
-                                                            current_step) *
-                                                        block_supply_change[ccy])
+        Adds a supply change starting at first_block, divided by the sum
+        of the weights of the kernel truncated at the end of the sample
+        """
+        length = int(config.param_1)
+        assert length > 0, f"Invalid impact delay kernel for {config}"
+        assert self.difference_kernel in (None, config), "The impact delay of a run can't change"
+        assert first_block >= self.integrated_blocks, "Priced in supply changes can't change"
+        if self.difference_kernel is None:
+            self.difference_kernel = config
+            self.kernel_starts = np.zeros((len(self.currencies), length + 1 + self.blocks))
+        blocks = min(length, self.blocks - first_block)
+        if config.model == ImpactDelayType.NBLOCKS:
+            weights = blocks
+        else:
+            # the weights of the first blocks are length, length - 1, ...
+            weights = blocks * length - blocks * (blocks - 1) / 2
+        self.kernel_starts[:, length + 1 + first_block] += block_supply_change / weights
+
+    def priced_in_supply_changes(self, current_step) -> np.ndarray:
+        """
+        Supply changes of the blocks of the current step, the supply changes
+        of the DIFFERENCE_KERNELS are integrated up to its last block
+        """
+        first_block = current_step * self.blocks_per_timestep
+        last_block = min(first_block + self.blocks_per_timestep, self.blocks)
+        if self.difference_kernel is not None and last_block > self.integrated_blocks:
+            length = int(self.difference_kernel.param_1)
+            if self.integrated_blocks - self.restarted_blocks >= length:
+                self.level = self.exact_level(self.integrated_blocks - 1)
+                self.slope = self.level - self.exact_level(self.integrated_blocks - 2)
+                self.restarted_blocks = self.integrated_blocks
+            blocks = slice(self.integrated_blocks, last_block)
+            levels, slopes = self.integrate(blocks)
+            self.supply_changes[:, blocks] += levels
+            self.level, self.slope = levels[:, -1], slopes[:, -1]
+            self.integrated_blocks = last_block
+        return self.supply_changes[:, first_block:last_block]
+
+    def integrate(self, blocks: slice):
+        """
+        Supply changes and their first differences of the blocks following
+        the last integrated block, integrated from their second differences
+        """
+        length = int(self.difference_kernel.param_1)
+        if self.difference_kernel.model == ImpactDelayType.NBLOCKS:
+            slope_differences = (
+                self.lagged_starts(blocks, 0)
+                - self.lagged_starts(blocks, 1)
+                - self.lagged_starts(blocks, length)
+                + self.lagged_starts(blocks, length + 1)
+            )
+        else:
+            slope_differences = (
+                length * self.lagged_starts(blocks, 0)
+                - (length + 1) * self.lagged_starts(blocks, 1)
+                + self.lagged_starts(blocks, length + 1)
+            )
+        slopes = np.cumsum(np.column_stack([self.slope, slope_differences]), axis=1)[:, 1:]
+        levels = np.cumsum(np.column_stack([self.level, slopes]), axis=1)[:, 1:]
+        return levels, slopes
+
+    def lagged_starts(self, blocks: slice, lag: int) -> np.ndarray:
+        """
+        Supply changes starting lag blocks before the given blocks
+        """
+        offset = int(self.difference_kernel.param_1) + 1 - lag
+        return self.kernel_starts[:, blocks.start + offset:blocks.stop + offset]
+
+    def exact_level(self, block: int) -> np.ndarray:
+        """
+        Supply changes of a block, summed over the kernels of the
+        supply changes started within the kernel length before it
+        """
+        length = int(self.difference_kernel.param_1)
+        lags = np.arange(length)
+        if self.difference_kernel.model == ImpactDelayType.NBLOCKS:
+            weights = np.ones(length)
+        else:
+            weights = length - lags
+        return self.kernel_starts[:, length + 1 + block - lags] @ weights
@@ -0,0 +1,163 @@
+"""
+ColumnarRecorder stores the state history of a simulation run in
+preallocated NumPy columns instead of radCAD's list of state dicts,
+HistoryRecorder keeps radCAD's list of state dicts.
+"""
+from collections.abc import Mapping
+from numbers import Number
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# State keys added by radCAD to every state
+META_COLUMNS = ["simulation", "subset", "run", "substep", "timestep"]
+
+ColumnPath = Tuple[Any, ...]
+
+
+class ColumnarRecorder():
+    """
+    Writes every recorded state into one column per flattened state key.
+    Nested dicts are flattened the same way as post_processing.dict_to_columns,
+    e.g. state['mento_buckets'][MentoExchange.CUSD_CELO].stable is stored
+    in the column `mento_buckets_cusd_celo.stable`.
+    Columns are allocated on first sight of a key, rows before that are NaN.
+
+    If on_full is provided the recorder acts as a fixed size buffer, when all
+    rows are written they are passed to on_full and the buffer is reused.
+    """
+    rows: int
+    index: int
+    columns: Dict[ColumnPath, np.ndarray]
+    on_full: Optional[Callable[[Dict[str, np.ndarray]], None]]
+
+    def __init__(
+        self,
+        rows: int,
+        on_full: Optional[Callable[[Dict[str, np.ndarray]], None]] = None
+    ):
+        self.rows = rows
+        self.index = 0
+        self.columns = {}
+        self.on_full = on_full
+
+    @staticmethod
+    def rows_per_timestep(substeps: int, drop_substeps: bool) -> int:
+        return 1 if drop_substeps else max(substeps, 1)
+
+    @staticmethod
+    def rows_for(timesteps: int, substeps: int, drop_substeps: bool) -> int:
+        """
+        Number of rows recorded for a run including the initial state
+        """
+        return 1 + timesteps * ColumnarRecorder.rows_per_timestep(substeps, drop_substeps)
+
+    def record(self, state: Dict[str, Any]):
+        """
+        Writes a state to the next row
+        """
+        if self.index == self.rows:
+            assert self.on_full is not None, "ColumnarRecorder is full"
+            self.flush()
+        for path, value in flatten(state):
+            column = self.columns.get(path)
+            if column is None:
+                column = self.columns[path] = self.allocate(path, value)
+            column[self.index] = value
+        self.index += 1
+
+    def record_all(self, states: Iterable[Dict[str, Any]]):
+        for state in states:
+            self.record(state)
+
+    def flush(self):
+        """
+        Passes the recorded rows to on_full and clears the buffer
+        """
+        if self.index == 0:
+            return
+        self.on_full(self.to_columns())
+        for path, column in self.columns.items():
+            column[:] = 0 if path[0] in META_COLUMNS else (
+                np.nan if column.dtype != object else None
+            )
+        self.index = 0
+
+    def allocate(self, path: ColumnPath, value: Any) -> np.ndarray:
+        if path[0] in META_COLUMNS:
+            return np.zeros(self.rows, dtype=np.int64)
+        if isinstance(value, Number) and not isinstance(value, bool):
+            return np.full(self.rows, np.nan)
+        return np.full(self.rows, None, dtype=object)
+
+    def overwrite(self, key: str, value: Any):
+        """
+        Sets a top-level state variable in all recorded rows
+        """
+        self.columns[(key,)][:self.index] = value
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Returns the recorded rows keyed by column name, top-level state
+        variables first and flattened nested state variables after,
+        matching the column order of dict_to_columns.
+        """
+        paths: List[ColumnPath] = sorted(
+            self.columns,
+            key=lambda path: len(path) > 1
+        )
+        return {
+            column_name(path): self.columns[path][:self.index]
+            for path in paths
+        }
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.to_columns())
+
+
+class HistoryRecorder():
+    """
+    Keeps every recorded state in radCAD's state history layout,
+    i.e. a list of substep states per timestep, for runs that
+    return radCAD's default results
+    """
+    history: List[List[Dict[str, Any]]]
+
+    def __init__(self):
+        self.history = []
+
+    def record(self, state: Dict[str, Any]):
+        self.history.append([state])
+
+    def record_all(self, states: Iterable[Dict[str, Any]]):
+        self.history.append(list(states))
+
+    def overwrite(self, key: str, value: Any):
+        """
+        Sets a top-level state variable in all recorded states
+        """
+        for states in self.history:
+            for state in states:
+                state[key] = value
+
+
+def flatten(state: Dict[Any, Any], prefix: ColumnPath = ()):
+    """
+    Yields the column path and value of every leaf in the nested state,
+    NamedTuple records like MentoBuckets and mappings
+    like Balance are flattened like dicts
+    """
+    for key, value in state.items():
+        if isinstance(value, Mapping):
+            yield from flatten(value, prefix + (key,))
+        elif isinstance(value, tuple) and hasattr(value, "_fields"):
+            for field, field_value in zip(value._fields, value):
+                yield prefix + (key, field), field_value
+        else:
+            yield prefix + (key,), value
+
+
+def column_name(path: ColumnPath) -> str:
+    if len(path) == 1:
+        return str(path[0])
+    return f"{path[0]}_" + ".".join(str(key) for key in path[1:])
@@ -0,0 +1,141 @@
+"""
+ParquetSink streams simulation results to a partitioned Parquet dataset
+instead of keeping them in memory, ParquetDataset reads them back lazily.
+
+Layout: <path>/simulation=<s>/subset=<s>/run=<r>/part-<n>.parquet
+"""
+from pathlib import Path
+from shutil import rmtree
+from typing import Collection, Dict, Iterator, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+from model.utils.recorder import ColumnarRecorder
+
+# pylint: disable=too-few-public-methods
+
+
+class ParquetSink():
+    """
+    Engine result sink. Every run is written by the process that executes it,
+    either once the run has completed or every flush_every timesteps.
+    """
+    path: Path
+    flush_every: Optional[int]
+    overwrite: bool
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        flush_every: Optional[int] = None,
+        overwrite: bool = False
+    ):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.overwrite = overwrite
+
+    def prepare(self, keep: Collection[Path] = ()):
+        """
+        Called once before the experiment, makes sure results of
+        previous experiments don't end up in the dataset. The partitions
+        in keep belong to checkpointed runs which are resumed.
+        """
+        stale_partitions = [
+            partition for partition in self.path.glob("simulation=*/subset=*/run=*")
+            if partition not in keep
+        ]
+        if not self.overwrite and any(
+            any(partition.glob("part-*.parquet")) for partition in stale_partitions
+        ):
+            raise FileExistsError(
+                f"{self.path} already contains results, use overwrite=True to replace them"
+            )
+        for partition in stale_partitions:
+            rmtree(partition)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def recorder(
+        self,
+        simulation: int,
+        subset: int,
+        run: int,
+        rows: int,
+        rows_per_timestep: int
+    ) -> ColumnarRecorder:
+        """
+        Creates a recorder for one run which flushes to the partition of the run
+        """
+        partition = self.partition(simulation, subset, run)
+        partition.mkdir(parents=True, exist_ok=True)
+
+        if self.flush_every is not None:
+            rows = min(rows, self.flush_every * rows_per_timestep)
+        return ColumnarRecorder(rows, on_full=PartWriter(partition))
+
+    def partition(self, simulation: int, subset: int, run: int) -> Path:
+        return self.path / f"simulation={simulation}" / f"subset={subset}" / f"run={run}"
+
+
+class PartWriter():
+    """
+    Writes the rows of a run recorder as numbered parts of the partition of
+    the run, a class rather than a closure so checkpoints can pickle it
+    """
+    partition: Path
+    parts: int
+
+    def __init__(self, partition: Path):
+        self.partition = partition
+        self.parts = 0
+
+    def __call__(self, columns: Dict[str, np.ndarray]):
+        pd.DataFrame(columns).to_parquet(
+            self.partition / f"part-{self.parts:05d}.parquet",
+            index=False
+        )
+        self.parts += 1
+
+
+class ParquetDataset():
+    """
+    Lazy view on the results written by a ParquetSink,
+    iterating it yields one DataFrame per run and subset.
+    """
+    path: Path
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    def partitions(self) -> List[Path]:
+        """
+        Run partitions in the same order radCAD returns results,
+        i.e. by simulation, run and subset, skipping partitions without parts
+        """
+        def sort_key(partition: Path):
+            simulation, subset, run = [
+                int(part.split("=")[1]) for part in partition.relative_to(self.path).parts
+            ]
+            return simulation, run, subset
+        return sorted(
+            (
+                partition for partition in self.path.glob("simulation=*/subset=*/run=*")
+                if any(partition.glob("part-*.parquet"))
+            ),
+            key=sort_key
+        )
+
+    def read_partition(self, partition: Path) -> pd.DataFrame:
+        return pd.concat(
+            [pd.read_parquet(part) for part in sorted(partition.glob("part-*.parquet"))],
+            ignore_index=True
+        )
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        for partition in self.partitions():
+            yield self.read_partition(partition)
+
+    def read(self) -> pd.DataFrame:
+        """
+        Reads the whole dataset into memory
+        """
+        return pd.concat(list(self), ignore_index=True)
@@ -0,0 +1,60 @@
+"""
+Bounded state history for simulation runs whose results are recorded
+outside of radCAD's state history (columnar results or a ParquetSink)
+"""
+from collections import deque
+from typing import Any, Dict, List, Sequence
+
+from model.utils.timesteps import timesteps_for_blocks
+
+# Number of timesteps the model looks back at most, besides the oracle delays,
+# p_price_impact needs the floating supply at the end of the previous timestep
+MIN_HISTORY_SIZE = 1
+
+
+class StateHistory(deque):
+    """
+    Ring buffer of the last `size` timesteps, with the same layout
+    as radCAD's state history, i.e. a list of substep states per timestep.
+    state_history[-1][-1] is the final state of the previous timestep
+    and state_history[-delay][-1] the one of `delay` timesteps ago.
+    """
+
+    def __init__(self, size: int, initial_state: Dict[str, Any]):
+        super().__init__([[initial_state]], maxlen=size)
+
+    def __reduce__(self):
+        # deque pickles as cls(timesteps, maxlen), which doesn't match __init__
+        return restore_state_history, (list(self), self.maxlen)
+
+
+def restore_state_history(timesteps: List[List[Dict[str, Any]]], size: int) -> StateHistory:
+    state_history = StateHistory(size, {})
+    state_history.clear()
+    state_history.extend(timesteps)
+    return state_history
+
+
+def history_size(params: Dict[str, Any]) -> int:
+    """
+    Number of timesteps the model needs to keep in history,
+    i.e. the maximum oracle delay
+    """
+    return max(
+        [timesteps_for_blocks(oracle_config.delay) for oracle_config in params.get("oracles", [])]
+        + [MIN_HISTORY_SIZE]
+    )
+
+
+def lagged(
+    state_history: Sequence[List[Dict[str, Any]]],
+    variable: str,
+    delay: int = 1
+) -> Any:
+    """
+    Value of a state variable at the end of the timestep `delay` timesteps
+    ago, works with radCAD's full state history as well as a StateHistory
+    """
+    assert 1 <= delay <= len(state_history), \
+        f"{variable} lagged by {delay} timesteps isn't in the state history"
+    return state_history[-delay][-1][variable]
@@ -0,0 +1,43 @@
+"""
+Conversions between blocks and timesteps.
+A timestep spans BLOCKS_PER_TIMESTEP blocks, timestep t ends with block
+t * BLOCKS_PER_TIMESTEP, i.e. it spans the blocks
+((t - 1) * BLOCKS_PER_TIMESTEP, t * BLOCKS_PER_TIMESTEP].
+Events scheduled on blocks are aggregated to the timestep they fall in,
+with one block per timestep every block is its own timestep.
+"""
+from math import gcd
+
+from experiments import simulation_configuration
+from model.constants import blocktime_seconds
+
+
+def blocks_per_timestep() -> int:
+    return simulation_configuration.BLOCKS_PER_TIMESTEP
+
+
+def period_in_blocks(period_seconds: int) -> int:
+    """
+    Number of blocks between the blocks whose
+    timestamp is a multiple of period_seconds
+    """
+    return period_seconds // gcd(blocktime_seconds, period_seconds)
+
+
+def events_in_timestep(timestep, period_blocks, offset=0):
+    """
+    Number of blocks within the timestep that are `offset` blocks past a
+    multiple of period_blocks, period_blocks can be an array of periods
+    """
+    blocks = blocks_per_timestep()
+    return (
+        (timestep * blocks - offset) // period_blocks
+        - ((timestep - 1) * blocks - offset) // period_blocks
+    )
+
+
+def timesteps_for_blocks(blocks: int) -> int:
+    """
+    Number of timesteps needed to cover the given number of blocks
+    """
+    return -(-blocks // blocks_per_timestep())
@@ -0,0 +1,270 @@
+"""
+Benchmarks the cost of every state update block and policy per timestep
+across scaled configurations and writes a JSON report that can be diffed
+between commits:
+
+    python -m tests.benchmark --output benchmark.json
+
+Every scenario runs at most max_timesteps timesteps of its horizon,
+the total cost of the horizon is extrapolated from the sampled timesteps.
+Generators are set up for the full horizon, so setup_seconds reflects it.
+"""
+import argparse
+import copy
+import json
+import platform
+import subprocess
+from collections import defaultdict
+from functools import wraps
+from itertools import product
+from time import perf_counter
+from typing import Any, Dict, List, NamedTuple
+from unittest.mock import patch
+
+from experiments import simulation_configuration
+from model.constants import blocks_per_day
+from model import generators
+from model.generators import markets
+from model.system_parameters import parameters
+from model.state_variables import initial_state
+from model.state_update_blocks import state_update_blocks
+from model.utils.engine import SimulationConfig, _single_run, __prepare_simulation_config__
+from model.utils.generator_container import GENERATOR_CONTAINER_PARAM_KEY
+from model.utils.recorder import ColumnarRecorder
+
+TRADERS = [1, 10, 100, 1000]
+ORACLES = [1, 10, 50]
+DAYS = [1, 30]
+MAX_TIMESTEPS = 1000
+
+# Time spent between the last block of a timestep and the first block of
+# the next one, i.e. recording the results and keeping the state history
+ENGINE_LABEL = "engine"
+
+
+class Scenario(NamedTuple):
+    """
+    Number of traders and oracles and the horizon in days of a benchmark run
+    """
+    traders: int
+    oracles: int
+    days: float
+
+    @property
+    def timesteps(self) -> int:
+        """
+        Number of timesteps of the scenario's horizon
+        """
+        return int(self.days * blocks_per_day // simulation_configuration.BLOCKS_PER_TIMESTEP)
+
+
+class BlockTimer():
+    """
+    Times state update blocks with clock blocks placed between them and
+    policies by wrapping them, all timings are accumulated in seconds
+    """
+
+    def __init__(self):
+        self.block_seconds = defaultdict(float)
+        self.block_counts = defaultdict(int)
+        self.policy_seconds = defaultdict(float)
+        self.policy_calls = defaultdict(int)
+        self.last_clock = None
+
+    def instrument(self, blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Returns the blocks with timed policies and a clock block after
+        each of them, the first clock block times the engine
+        """
+        instrumented = [self.clock_block(ENGINE_LABEL)]
+        for block in blocks:
+            label = block_label(block)
+            self.block_counts[label] += 1
+            instrumented.append({
+                **block,
+                "policies": {
+                    key: self.timed_policy(policy)
+                    for key, policy in block["policies"].items()
+                }
+            })
+            instrumented.append(self.clock_block(label))
+        return instrumented
+
+    def clock_block(self, label: str) -> Dict[str, Any]:
+        """
+        A block without state updates attributing the time since
+        the previous clock block to label
+        """
+        def clock(_params, _substep, _state_history, _prev_state):
+            now = perf_counter()
+            if self.last_clock is not None:
+                self.block_seconds[label] += now - self.last_clock
+            self.last_clock = now
+            return {}
+        return {"policies": {"clock": clock}, "variables": {}}
+
+    def timed_policy(self, policy):
+        """
+        Wraps a policy to accumulate its calls and time by name
+        """
+        name = policy.__name__
+
+        @wraps(policy)
+        def timed(*args):
+            start = perf_counter()
+            result = policy(*args)
+            self.policy_seconds[name] += perf_counter() - start
+            self.policy_calls[name] += 1
+            return result
+        return timed
+
+
+def block_label(block: Dict[str, Any]) -> str:
+    """
+    Blocks are labelled by their policies, so e.g. the blocks
+    of all traders with the same policy are accumulated
+    """
+    return "/".join(
+        policy.__name__ for policy in block["policies"].values()
+    ) or "/".join(block["variables"])
+
+
+def scenario_params(scenario: Scenario) -> Dict[str, Any]:
+    """
+    Default parameters with the traders of the scenario spread
+    over the trader configs and its number of oracles per config.
+    The configs are named by exchange, so their traders don't replace
+    the traders of other configs of the same type.
+    """
+    params = {key: copy.deepcopy(values[0]) for key, values in parameters.items()}
+    trader_configs = params["traders"]
+    params["traders"] = [
+        config._replace(
+            count=(
+                scenario.traders // len(trader_configs)
+                + (index < scenario.traders % len(trader_configs))
+            ),
+            name=f"{config.trader_type.value}_{config.exchange.value}"
+        )
+        for index, config in enumerate(trader_configs)
+    ]
+    params["oracles"] = [
+        config._replace(count=scenario.oracles) for config in params["oracles"]
+    ]
+    return params
+
+
+def run_scenario(scenario: Scenario, max_timesteps: int = MAX_TIMESTEPS) -> Dict[str, Any]:
+    """
+    Runs a scenario and returns its timings
+    """
+    timesteps = min(scenario.timesteps, max_timesteps)
+    with patch.object(markets, "TOTAL_BLOCKS", scenario.timesteps + 1), \
+            patch.object(simulation_configuration, "TIMESTEPS", scenario.timesteps):
+        start = perf_counter()
+        config = __prepare_simulation_config__(SimulationConfig(
+            scenario_params(scenario),
+            copy.deepcopy(initial_state),
+            state_update_blocks,
+            0
+        ))
+        # Generators are created lazily, make sure their setup isn't
+        # attributed to the first policy that uses them
+        for generator_class in [
+            generators.AccountGenerator,
+            generators.MarketPriceGenerator,
+            generators.MentoExchangeGenerator,
+            generators.OracleRateGenerator,
+        ]:
+            config.params[GENERATOR_CONTAINER_PARAM_KEY].get(generator_class)
+        setup_seconds = perf_counter() - start
+        accounts = config.params[GENERATOR_CONTAINER_PARAM_KEY].get(generators.AccountGenerator)
+        hydrated_traders = len(accounts.traders()) + (
+            accounts.registry.size if accounts.registry is not None else 0)
+
+        timer = BlockTimer()
+        blocks = timer.instrument(config.state_update_blocks)
+        recorder = ColumnarRecorder(ColumnarRecorder.rows_for(timesteps, len(blocks), True))
+        start = perf_counter()
+        _single_run(recorder, 0, timesteps, 0, 0, config.state, blocks, config.params,
+                    False, True)
+        run_seconds = perf_counter() - start
+
+    return {
+        **scenario._asdict(),
+        "hydrated_traders": hydrated_traders,
+        "horizon_timesteps": scenario.timesteps,
+        "timesteps": timesteps,
+        "setup_seconds": setup_seconds,
+        "run_seconds": run_seconds,
+        "seconds_per_timestep": run_seconds / timesteps,
+        "extrapolated_seconds": setup_seconds + run_seconds / timesteps * scenario.timesteps,
+        "blocks": {
+            label: {
+                "count": timer.block_counts.get(label, 0),
+                "seconds_per_timestep": seconds / timesteps,
+            }
+            for label, seconds in timer.block_seconds.items()
+        },
+        "policies": {
+            name: {
+                "calls": timer.policy_calls[name],
+                "seconds_per_call": seconds / timer.policy_calls[name],
+                "seconds_per_timestep": seconds / timesteps,
+            }
+            for name, seconds in timer.policy_seconds.items()
+        },
+    }
+
+
+def benchmark(scenarios: List[Scenario], max_timesteps: int = MAX_TIMESTEPS) -> Dict[str, Any]:
+    """
+    Runs the scenarios and returns the report
+    """
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "blocks_per_timestep": simulation_configuration.BLOCKS_PER_TIMESTEP,
+            "max_timesteps": max_timesteps,
+        },
+        "scenarios": [run_scenario(scenario, max_timesteps) for scenario in scenarios],
+    }
+
+
+def git_commit() -> str:
+    """
+    Commit the benchmark is run on, to tell reports apart
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    """
+    Runs the benchmark for the product of the given scenario
+    dimensions and writes the report to --output
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--traders", type=int, nargs="+", default=TRADERS)
+    parser.add_argument("--oracles", type=int, nargs="+", default=ORACLES)
+    parser.add_argument("--days", type=float, nargs="+", default=DAYS)
+    parser.add_argument("--max-timesteps", type=int, default=MAX_TIMESTEPS)
+    args = parser.parse_args()
+
+    scenarios = [
+        Scenario(traders, oracles, days)
+        for traders, oracles, days in product(args.traders, args.oracles, args.days)
+    ]
+    report = benchmark(scenarios, args.max_timesteps)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
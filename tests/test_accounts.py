@@ -0,0 +1,153 @@
+"""
+Tests of the trader accounts and the arbitrage cohorts
+"""
+from copy import deepcopy
+from unittest.mock import patch
+from uuid import uuid4
+import pandas as pd
+from pandas._testing import assert_frame_equal
+
+from experiments import simulation_configuration
+from experiments.default_experiment import experiment
+from model.entities.account_registry import AccountRegistry
+from model.entities.balance import Balance
+from model.generators.accounts import AccountGenerator
+from model.system_parameters import parameters
+from model.types.base import CryptoAsset, MentoExchange, Stable, TraderType
+from model.types.configs import TraderConfig
+
+
+def short_experiment():
+    short = deepcopy(experiment)
+    for simulation in short.simulations:
+        simulation.timesteps = 100
+        simulation.runs = 1
+    return short
+
+
+def run_with_execution_units(traders, execution_units=AccountGenerator.execution_units):
+    """
+    Runs a short experiment with the given trader configs and execution units,
+    returns the results and the trader balances of every account generator
+    """
+    units_experiment = short_experiment()
+    for simulation in units_experiment.simulations:
+        simulation.model.params["traders"] = [traders]
+    generators = []
+    from_parameters = AccountGenerator.from_parameters
+
+    def hydrate(*args):
+        generators.append(from_parameters(*args))
+        return generators[-1]
+    with patch.object(AccountGenerator, "from_parameters", side_effect=hydrate), \
+            patch.object(AccountGenerator, "execution_units", execution_units):
+        df = pd.DataFrame(units_experiment.run())
+    balances = [
+        {trader.account_id: trader.balance for trader in generator.traders()}
+        for generator in generators
+    ]
+    return df, balances
+
+
+def test_arbitrage_cohort_matches_trader_blocks():
+    """
+    Check that the fused ArbitrageCohort of an exchange trades exactly
+    like one state update block per arbitrage trader, budget constrained
+    traders leave arbitrage to the traders acting after them
+    """
+    traders = [TraderConfig(
+        trader_type=TraderType.ARBITRAGE_TRADER,
+        count=4,
+        balance=Balance({CryptoAsset.CELO: 20, Stable.CUSD: 50}),
+        exchange=MentoExchange.CUSD_CELO
+    )]
+    df_cohort, balances_cohort = run_with_execution_units(traders)
+    df_traders, balances_traders = run_with_execution_units(traders, AccountGenerator.traders)
+
+    # one substep per trader instead of one for the cohort
+    assert df_traders.substep.max() == df_cohort.substep.max() + 3
+    assert_frame_equal(df_cohort.drop(columns="substep"), df_traders.drop(columns="substep"))
+    assert balances_cohort == balances_traders
+    # more than one trader of the exchange traded
+    assert sum(
+        balance != Balance({CryptoAsset.CELO: 20, Stable.CUSD: 50})
+        for balance in balances_cohort[0].values()
+    ) > 1
+
+
+def interleaved_traders():
+    """
+    Arbitrage traders of two exchanges with a random trader between them
+    """
+    arbitrage_trader = TraderConfig(
+        trader_type=TraderType.ARBITRAGE_TRADER,
+        count=1,
+        balance=Balance({CryptoAsset.CELO: 20, Stable.CUSD: 50}),
+        exchange=MentoExchange.CUSD_CELO
+    )
+    return [
+        arbitrage_trader,
+        TraderConfig(
+            trader_type=TraderType.RANDOM_TRADER,
+            count=1,
+            balance=Balance({CryptoAsset.CELO: 500, Stable.CUSD: 1000}),
+            exchange=MentoExchange.CUSD_CELO
+        ),
+        # replaces ArbitrageTrading_0 in its position and adds ArbitrageTrading_1
+        arbitrage_trader._replace(count=2),
+        arbitrage_trader._replace(
+            count=3,
+            balance=Balance({CryptoAsset.CELO: 20, Stable.CEUR: 50}),
+            exchange=MentoExchange.CEUR_CELO
+        ),
+    ]
+
+
+def test_interleaved_arbitrage_traders_act_in_configured_order():
+    """
+    Check that a trader configured between arbitrage traders of an exchange
+    splits them into two cohorts, so every trader acts in the configured order
+    """
+    traders = interleaved_traders()
+    df_cohort, balances_cohort = run_with_execution_units(traders)
+    df_traders, balances_traders = run_with_execution_units(traders, AccountGenerator.traders)
+
+    assert_frame_equal(df_cohort.drop(columns="substep"), df_traders.drop(columns="substep"))
+    assert balances_cohort == balances_traders
+
+
+def test_tracked_floating_supply_matches_account_balances():
+    """
+    Check that the incrementally maintained tracked floating supply
+    stays equal to the sum of all account balances while trading
+    """
+    checked_experiment = short_experiment()
+    with patch.object(simulation_configuration, "CHECK_INVARIANTS", True):
+        checked_experiment.run()
+
+    assert not [run for run in checked_experiment.exceptions if run.get("exception")]
+
+
+def test_account_registry_matches_trader_objects():
+    """
+    Check that arbitrage traders stored in the account registry
+    trade exactly like Trader objects, in a compact memory footprint
+    """
+    df_objects = pd.DataFrame(short_experiment().run())
+    with patch.object(simulation_configuration, "ACCOUNT_REGISTRY", True):
+        df_registry = pd.DataFrame(short_experiment().run())
+    assert_frame_equal(df_objects, df_registry)
+
+    df_objects, _ = run_with_execution_units(interleaved_traders())
+    with patch.object(simulation_configuration, "ACCOUNT_REGISTRY", True):
+        df_registry, _ = run_with_execution_units(interleaved_traders())
+    assert_frame_equal(df_objects, df_registry)
+
+    config = next(
+        config for config in parameters["traders"][0]
+        if config.trader_type == TraderType.ARBITRAGE_TRADER
+    )
+    registry = AccountRegistry()
+    registry.add([uuid4() for _ in range(100000)], config)
+    assert registry.size == 100000
+    assert registry.nbytes < 20e6
@@ -0,0 +1,25 @@
+"""
+Tests of the vector backed Balance
+"""
+import pickle
+
+from model.entities.balance import Balance
+from model.types.base import CryptoAsset, Stable
+
+
+def test_balance_behaves_like_dict_of_held_currencies():
+    """
+    Check that the array backed balance only exposes the currencies it
+    holds, combines the currencies of both operands and round trips
+    """
+    celo_cusd = Balance({Stable.CUSD: 10, CryptoAsset.CELO: 2})
+    celo_ceur = Balance({CryptoAsset.CELO: 5, Stable.CEUR: -1})
+
+    total = celo_cusd + celo_ceur
+    assert total == {CryptoAsset.CELO: 7, Stable.CUSD: 10, Stable.CEUR: -1}
+    assert list(total) == [CryptoAsset.CELO, Stable.CUSD, Stable.CEUR]
+    assert total.any_negative and not celo_cusd.any_negative
+    assert total.get(Stable.CREAL) is None and Stable.CREAL not in total
+    assert celo_cusd - celo_cusd == {CryptoAsset.CELO: 0, Stable.CUSD: 0}
+    assert Balance.total([celo_cusd, celo_ceur, celo_cusd]) == total + celo_cusd
+    assert pickle.loads(pickle.dumps(total)) == total
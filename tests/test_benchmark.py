@@ -0,0 +1,25 @@
+"""
+Test of the benchmark suite
+"""
+import json
+
+from tests.benchmark import Scenario, benchmark
+
+
+def test_benchmark_report():
+    """
+    Check that the benchmark suite times every block and
+    policy and produces a JSON serializable report
+    """
+    report = json.loads(json.dumps(benchmark([Scenario(10, 2, 0.01)], max_timesteps=20)))
+
+    scenario = report["scenarios"][0]
+    assert scenario["timesteps"] == 20
+    assert scenario["hydrated_traders"] == 10
+    for policy in ["p_market_price", "p_oracle_report",
+                   "p_price_impact", "p_reserve_statistics"]:
+        assert scenario["policies"][policy]["calls"] == 20
+        assert policy in scenario["blocks"]
+    # bucket updates are only active on timestep 1 and when the buckets are reset
+    assert scenario["policies"]["p_bucket_update"]["calls"] < 20
+    assert scenario["blocks"]["engine"]["seconds_per_timestep"] > 0
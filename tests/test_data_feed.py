@@ -0,0 +1,32 @@
+"""
+Tests of the cached market data sources
+"""
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+from model.utils import data_feed
+from model.utils.data_feed import DataFeed
+
+
+def test_data_feed_converts_source_once(tmp_path):
+    """
+    Check that the cached log returns equal the parsed source and
+    that later data feeds, also of other processes, don't parse it again
+    """
+    prices = pd.DataFrame({"cusd_usd": [1.0, 1.01, 0.99, 1.0], "celo_usd": [3.0, 3.3, 2.7, 3.0]})
+    (tmp_path / "historical_market_data").mkdir()
+    prices.to_csv(tmp_path / data_feed.HISTORICAL_DATA_FILE_NAME, index=False)
+
+    with patch.object(data_feed, "DATA_SOURCE", "historical"):
+        feed = DataFeed(tmp_path)
+        np.testing.assert_array_equal(feed.data, np.log(prices / prices.shift(1)).dropna())
+        assert feed.assets == ["cusd_usd", "celo_usd"] and feed.length == 3
+        assert not feed.data.flags.writeable
+
+        with patch.object(DataFeed, "load_historical_data") as load:
+            assert DataFeed(tmp_path).data is feed.data
+            # a new process only finds the cache on disk
+            with patch.object(data_feed, "_loaded", {}):
+                np.testing.assert_array_equal(DataFeed(tmp_path).data, feed.data)
+            load.assert_not_called()
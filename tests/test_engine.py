@@ -0,0 +1,151 @@
+"""
+Tests of the Engine execution options
+"""
+from copy import deepcopy
+from unittest.mock import patch
+import pandas as pd
+from pandas._testing import assert_frame_equal
+from pytest import mark, raises
+from radcad import Backend
+
+from experiments.default_experiment import experiment
+from model.generators.mento import MentoExchangeGenerator
+from model.types.base import MarketPriceModel
+from model.utils import engine
+from model.utils.checkpoint import Checkpoint, RunCheckpoint
+from model.utils.recorder import HistoryRecorder
+
+
+@mark.parametrize("market_price_model", [MarketPriceModel.QUANTLIB, MarketPriceModel.HIST_SIM])
+def test_process_pool_matches_single_process(market_price_model):
+    """
+    Check that runs executed in the process pool are identical
+    to runs executed in a single process for the same rng_seed
+    """
+    experiment_1 = deepcopy(experiment)
+    for simulation in experiment_1.simulations:
+        simulation.model.params["market_price_model"] = [market_price_model]
+    experiment_2 = deepcopy(experiment_1)
+
+    experiment_1.engine.backend = Backend.SINGLE_PROCESS
+    df_1 = pd.DataFrame(experiment_1.run())
+
+    experiment_2.engine.backend = Backend.MULTIPROCESSING
+    experiment_2.engine.processes = 2
+    df_2 = pd.DataFrame(experiment_2.run())
+
+    assert_frame_equal(df_1, df_2)
+
+
+class Interruption(Exception):
+    pass
+
+
+def test_resumed_experiment_matches_uninterrupted_experiment(tmp_path):
+    """
+    Check that an interrupted experiment resumes its runs from their
+    checkpoints and produces the same results as an uninterrupted one
+    """
+    experiment_1 = deepcopy(experiment)
+    for simulation in experiment_1.simulations:
+        simulation.timesteps = 200
+    experiment_2 = deepcopy(experiment_1)
+    experiment_3 = deepcopy(experiment_1)
+    df_1 = pd.DataFrame(experiment_1.run())
+
+    save = RunCheckpoint.save
+
+    def save_and_interrupt(run_checkpoint, snapshot):
+        save(run_checkpoint, snapshot)
+        if snapshot.initial_state["run"] == 2 and snapshot.timestep == 100:
+            raise Interruption()
+
+    experiment_2.engine.checkpoint = Checkpoint(tmp_path, every=50)
+    with patch.object(RunCheckpoint, "save", save_and_interrupt), raises(Interruption):
+        experiment_2.run()
+    assert sorted(experiment_2.engine.checkpoint.runs()) == [(0, 0, 1), (0, 0, 2)]
+
+    experiment_3.engine.checkpoint = Checkpoint(tmp_path, every=50)
+    # pylint: disable=protected-access
+    with patch.object(engine, "_single_run", wraps=engine._single_run) as single_run:
+        df_3 = pd.DataFrame(experiment_3.run())
+
+    # the completed run isn't executed again, the interrupted one is resumed
+    assert [call.kwargs["snapshot"].timestep for call in single_run.call_args_list] == [100]
+    assert_frame_equal(df_1, df_3)
+    assert not experiment_3.engine.checkpoint.runs()
+
+
+def test_forked_subsets_continue_from_shared_prefix():
+    """
+    Check that subsets only differing in forkable parameters continue
+    from the prefix simulated once with the parameters of the first subset
+    """
+    experiment_1 = deepcopy(experiment)
+    for simulation in experiment_1.simulations:
+        simulation.timesteps = 200
+        simulation.runs = 1
+        # only affects the reserve ratio, not the rest of the simulation
+        simulation.model.params["reserve_target_weight"] = [0.1, 0.2]
+    experiment_2 = deepcopy(experiment_1)
+    df_1 = pd.DataFrame(experiment_1.run())
+
+    experiment_2.engine.fork_after = 100
+    with patch.object(engine, "__prepare_simulation_config__",
+                      wraps=engine.__prepare_simulation_config__) as prepare:
+        df_2 = pd.DataFrame(experiment_2.run())
+
+    # generators are hydrated once for both subsets
+    assert prepare.call_count == 1
+    assert_frame_equal(df_1.drop(columns="reserve_ratio"), df_2.drop(columns="reserve_ratio"))
+    prefix = (df_1.subset == 1) & (df_1.timestep <= 100)
+    assert (df_2.reserve_ratio[prefix].to_numpy()
+            == df_1.reserve_ratio[(df_1.subset == 0) & (df_1.timestep <= 100)].to_numpy()).all()
+    assert_frame_equal(df_1[~prefix], df_2[~prefix])
+
+
+def test_inactive_blocks_carry_state_forward():
+    """
+    Check that the policies and state updates of a block are skipped on
+    timesteps its schedule isn't active and the state is carried forward,
+    and that skipping the inert bucket updates doesn't change the results
+    """
+    scheduled_calls = []
+
+    def count(_params, _substep, _state_history, prev_state):
+        return {"count": prev_state["count"] + 1}
+
+    def scheduled_count(params, substep, state_history, prev_state):
+        scheduled_calls.append(prev_state["timestep"])
+        return count(params, substep, state_history, prev_state)
+
+    def update_count(_params, _substep, _state_history, _prev_state, signal):
+        return "count", signal["count"]
+
+    blocks = [
+        {"policies": {"count": count}, "variables": {"count": update_count}},
+        {"policies": {"count": scheduled_count},
+         "active": lambda timestep: timestep % 3 == 0,
+         "variables": {"count": update_count}},
+    ]
+    recorder = HistoryRecorder()
+    engine._single_run(  # pylint: disable=protected-access
+        recorder, 0, 9, 0, 0, {"count": 0}, blocks, {}, False, False)
+
+    # after the first substep the previous state holds the current timestep
+    assert scheduled_calls == [3, 6, 9]
+    for substeps in recorder.history[1:]:
+        assert [state["substep"] for state in substeps] == [1, 2]
+        if substeps[0]["timestep"] % 3:
+            assert substeps[1]["count"] == substeps[0]["count"]
+        else:
+            assert substeps[1]["count"] == substeps[0]["count"] + 1
+
+    experiment_1 = deepcopy(experiment)
+    for simulation in experiment_1.simulations:
+        simulation.timesteps = 200
+    experiment_2 = deepcopy(experiment_1)
+    df_1 = pd.DataFrame(experiment_1.run())
+    with patch.object(MentoExchangeGenerator, "any_buckets_reset_due", return_value=True):
+        df_2 = pd.DataFrame(experiment_2.run())
+    assert_frame_equal(df_1, df_2)
@@ -0,0 +1,24 @@
+"""
+Tests of the file helpers
+"""
+from pytest import raises
+
+from model.utils.files import write_atomically
+
+
+def test_failed_atomic_write_keeps_previous_file(tmp_path):
+    """
+    Check that a failing write leaves the previous file in place
+    and doesn't leave its temporary file behind
+    """
+    path = tmp_path / "cache.bin"
+    write_atomically(path, lambda file: file.write(b"previous"))
+
+    def fail(file):
+        file.write(b"partial")
+        raise OSError("disk full")
+    with raises(OSError):
+        write_atomically(path, fail)
+
+    assert path.read_bytes() == b"previous"
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,41 @@
+"""
+Tests of the import time of the model
+"""
+import json
+import subprocess
+import sys
+
+# seconds, generous to be robust on slow machines, the model
+# used to take several seconds as it imported QuantLib and cvxpy
+IMPORT_BUDGET = 0.2
+MODEL_BUDGET = 1.5
+
+MEASURE_IMPORTS = """
+import json, sys, time
+start = time.perf_counter()
+import model
+imported = time.perf_counter()
+from model import model
+built = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "model": built - imported,
+    "modules": [name for name in ["QuantLib", "cvxpy", "data.mock_data"] if name in sys.modules],
+}))
+"""
+
+
+def test_import_time():
+    """
+    Check that importing model and building the radCAD model stays within budget
+    and doesn't load QuantLib, cvxpy or the mock data, which are only needed
+    by some market price models and trader strategies
+    """
+    result = json.loads(subprocess.run(
+        [sys.executable, "-c", MEASURE_IMPORTS],
+        capture_output=True, check=True, text=True
+    ).stdout)
+
+    assert result["import"] < IMPORT_BUDGET
+    assert result["model"] < MODEL_BUDGET
+    assert not result["modules"]
@@ -0,0 +1,163 @@
+"""
+Tests of the market price generation and price impact
+"""
+from copy import deepcopy
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from pandas._testing import assert_frame_equal
+import pytest
+
+from experiments import simulation_configuration
+from experiments.default_experiment import experiment
+from model.generators.markets import INCREMENTS, MarketPriceGenerator
+from model.state_variables import initial_state
+from model.system_parameters import parameters
+from model.types.base import ImpactDelayType
+from model.types.configs import ImpactDelayConfig
+from model.utils.gbm_path_generator import GBMPathGenerator
+from model.utils import price_impact_valuator
+from model.utils.price_impact_valuator import PriceImpactValuator, impact_delay_kernel
+from model.utils.quantlib_wrapper import QuantLibWrapper
+from model.utils.rng_provider import RNGProvider
+
+SAMPLE_SIZE = 100000
+
+
+def test_numpy_gbm_matches_quantlib_distribution():
+    """
+    Check that the NumPy GBM log returns have the same volatility
+    and correlation as the ones generated by QuantLib
+    """
+    processes = parameters['market_price_processes'][0]
+    correlation = (np.eye(len(processes)) * 0.5 + 0.5).tolist()
+
+    quantlib_returns = QuantLibWrapper(
+        processes, correlation, SAMPLE_SIZE, 1).generate_correlated_paths()
+    numpy_returns = GBMPathGenerator(
+        processes, correlation, SAMPLE_SIZE, np.random.default_rng(1)
+    ).generate_correlated_paths()[0]
+
+    assert numpy_returns.shape == quantlib_returns.shape
+    np.testing.assert_allclose(numpy_returns.std(axis=1), quantlib_returns.std(axis=1), rtol=0.02)
+    np.testing.assert_allclose(np.corrcoef(numpy_returns), np.corrcoef(quantlib_returns), atol=0.02)
+
+
+def test_precomputed_price_paths_match_stepwise_prices():
+    """
+    Check that the precomputed price paths equal the market prices
+    scaled by the increment of every timestep one by one for a fixed seed
+    """
+    params = {key: values[0] for key, values in parameters.items()}
+    params["rngp"] = RNGProvider(params["rng_seed"], 0)
+    generator = MarketPriceGenerator.from_parameters(params, initial_state, None)
+
+    market_price = dict(initial_state["market_price"])
+    for timestep in range(200):
+        market_price = {
+            pair: price * np.exp(generator.increments[pair][timestep])
+            if pair in generator.increments else price
+            for pair, price in market_price.items()
+        }
+        precomputed = generator.market_price({"timestep": timestep})
+        assert precomputed.keys() == market_price.keys()
+        for pair, price in market_price.items():
+            assert precomputed[pair] == pytest.approx(price, rel=1e-12)
+
+    # the paths only depend on the seed
+    INCREMENTS.clear()
+    np.testing.assert_array_equal(
+        MarketPriceGenerator.from_parameters(params, initial_state, None).price_paths,
+        generator.price_paths
+    )
+
+
+@pytest.mark.parametrize("impact_delay", [
+    ImpactDelayConfig(model=ImpactDelayType.INSTANT, param_1=0),
+    ImpactDelayConfig(model=ImpactDelayType.NBLOCKS, param_1=10),
+    ImpactDelayConfig(model=ImpactDelayType.LINEAR, param_1=10),
+    ImpactDelayConfig(model=ImpactDelayType.EXPONENTIAL, param_1=10, param_2=0.5),
+    ImpactDelayConfig(model=ImpactDelayType.CUSTOM, param_1=0, kernel=(1, 2, 1)),
+])
+def test_impact_delay_spreads_whole_supply_change(impact_delay):
+    """
+    Check that a supply change is spread over the kernel starting at the
+    current step and that it's fully priced in, also at the end of the sample,
+    and that the kernels added as differences match the kernel
+    """
+    valuator = PriceImpactValuator(parameters['impacted_assets'][0], 100)
+    supply_change = np.ones(len(valuator.currencies))
+    kernel = impact_delay_kernel(impact_delay)
+    assert not kernel.flags.writeable
+    expected = np.zeros_like(valuator.supply_changes)
+    for step in range(100):
+        if step in [1, 50, 95]:
+            valuator.impact_delay(supply_change, step, {'impact_delay': impact_delay})
+            first_block = step * valuator.blocks_per_timestep
+            blocks = min(kernel.size, valuator.blocks - first_block)
+            expected[:, first_block:first_block + blocks] += np.outer(
+                supply_change, kernel[:blocks] / kernel[:blocks].sum())
+        valuator.priced_in_supply_changes(step)
+
+    for step in [1, 50, 95]:
+        assert valuator.supply_changes[:, step * valuator.blocks_per_timestep].all()
+    assert not valuator.supply_changes[:, :1].any()
+    np.testing.assert_allclose(valuator.supply_changes.sum(axis=1), 3)
+    np.testing.assert_allclose(valuator.supply_changes, expected, atol=1e-12)
+
+
+@pytest.mark.parametrize("model", [ImpactDelayType.NBLOCKS, ImpactDelayType.LINEAR])
+@pytest.mark.parametrize("length", [1, 3, 10])
+def test_difference_kernels_match_kernel(model, length):
+    """
+    Check that supply changes integrated from their differences match
+    the supply changes added with the kernel, also at the end of the sample
+    """
+    impact_delay = ImpactDelayConfig(model=model, param_1=length)
+    rng = np.random.default_rng(0)
+    valuators = [PriceImpactValuator(parameters['impacted_assets'][0], 200) for _ in range(2)]
+    for step in range(200):
+        supply_change = rng.normal(0, 1e6, len(valuators[0].currencies)) * (step % 7 != 0)
+        valuators[0].impact_delay(supply_change, step, {'impact_delay': impact_delay})
+        with patch.object(price_impact_valuator, "DIFFERENCE_KERNEL_MIN_LENGTH", 1):
+            valuators[1].impact_delay(supply_change, step, {'impact_delay': impact_delay})
+        np.testing.assert_allclose(
+            valuators[1].priced_in_supply_changes(step),
+            valuators[0].priced_in_supply_changes(step),
+            rtol=1e-9, atol=1e-6
+        )
+    assert valuators[1].difference_kernel == impact_delay
+    assert valuators[0].difference_kernel is None
+
+
+def test_increments_generated_once_for_subsets_sharing_market(tmp_path):
+    """
+    Check that subsets sharing the market price configuration reuse the
+    increments of a run, also when they are persisted between experiments
+    """
+    sweep = deepcopy(experiment)
+    for simulation in sweep.simulations:
+        simulation.timesteps = 100
+        simulation.runs = 1
+        simulation.model.params["reserve_target_weight"] = [0.1, 0.2]
+    generate_correlated_paths = QuantLibWrapper.generate_correlated_paths
+
+    def run(folder=None):
+        INCREMENTS.clear()
+        with patch.object(simulation_configuration, "MARKET_INCREMENTS_FOLDER", folder), \
+                patch.object(QuantLibWrapper, "generate_correlated_paths", autospec=True,
+                             side_effect=generate_correlated_paths) as generate:
+            return pd.DataFrame(deepcopy(sweep).run()), generate.call_count
+
+    df_1, calls_1 = run()
+    assert calls_1 == 1
+    assert_frame_equal(
+        df_1[df_1.subset == 0].drop(columns=["subset", "reserve_ratio"]).reset_index(drop=True),
+        df_1[df_1.subset == 1].drop(columns=["subset", "reserve_ratio"]).reset_index(drop=True)
+    )
+
+    df_2, calls_2 = run(tmp_path)
+    df_3, calls_3 = run(tmp_path)
+    assert (calls_2, calls_3) == (1, 0)
+    assert_frame_equal(df_1, df_2)
+    assert_frame_equal(df_1, df_3)
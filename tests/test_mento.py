@@ -0,0 +1,25 @@
+"""
+Tests of the Mento bucket state
+"""
+import pickle
+import pytest
+
+from model.types.base import MentoBuckets, MentoBucketState, MentoExchange
+
+
+def test_bucket_state_is_shared_copy_on_write():
+    """
+    Check that replacing the buckets of one exchange leaves the previous
+    state untouched and shares the buckets of the other exchanges
+    """
+    state = MentoBucketState({
+        exchange: MentoBuckets(stable=1, reserve_asset=2) for exchange in MentoExchange
+    })
+    next_state = state.replace(MentoExchange.CUSD_CELO, MentoBuckets(stable=3, reserve_asset=4))
+
+    assert state[MentoExchange.CUSD_CELO] == MentoBuckets(stable=1, reserve_asset=2)
+    assert next_state[MentoExchange.CUSD_CELO] == MentoBuckets(stable=3, reserve_asset=4)
+    assert next_state[MentoExchange.CEUR_CELO] is state[MentoExchange.CEUR_CELO]
+    assert pickle.loads(pickle.dumps(next_state)) == next_state
+    with pytest.raises(TypeError):
+        state[MentoExchange.CUSD_CELO] = next_state[MentoExchange.CUSD_CELO]
@@ -0,0 +1,94 @@
+"""
+Tests of the oracle reports and rates
+"""
+from unittest.mock import patch
+import numpy as np
+
+from experiments import simulation_configuration
+from model.generators.oracles import OracleRateGenerator
+from model.system_parameters import parameters
+from model.utils.rng_provider import RNGProvider
+from model.utils.timesteps import period_in_blocks
+
+
+def oracle_generator(**config) -> OracleRateGenerator:
+    oracle_config = parameters["oracles"][0][0]._replace(**config)
+    return OracleRateGenerator(
+        [oracle_config], parameters["oracle_pairs"][0], RNGProvider(1, 0))
+
+
+def test_medians_match_reports_after_partial_reports():
+    """
+    Check that the medians recomputed for dirty pairs only equal
+    the medians over all reports of every pair
+    """
+    generator = oracle_generator(count=7)
+    rng = np.random.default_rng(1)
+    pairs, oracles = generator.reports.shape
+    reports = rng.uniform(0.5, 1.5, (pairs, oracles))
+    generator.report(np.arange(oracles), reports.copy())
+
+    for _ in range(50):
+        reporting = rng.choice(oracles, size=rng.integers(1, oracles), replace=False)
+        new_reports = rng.uniform(0.5, 1.5, (pairs, reporting.size))
+        mask = rng.random((pairs, reporting.size)) < 0.5
+        generator.report(reporting, new_reports, mask)
+        reports[:, reporting] = np.where(mask, new_reports, reports[:, reporting])
+
+        medians = generator.median_rates()
+        np.testing.assert_array_equal(
+            [medians[pair] for pair in generator.oracle_pairs],
+            np.median(reports, axis=1)
+        )
+
+
+def test_jittered_report_schedules():
+    """
+    Check that jittered providers report once per period on offsets
+    drawn reproducibly from their rngs, unjittered ones on the same blocks
+    """
+    def offsets(generator):
+        return {
+            int(oracle): schedule.offset
+            for schedule in generator.report_schedules for oracle in schedule.oracles
+        }
+    generator = oracle_generator(count=20, reporting_interval=60, reporting_jitter=True)
+    period = period_in_blocks(60)
+    assert {schedule.period for schedule in generator.report_schedules} == {period}
+    assert sorted(offsets(generator)) == list(range(20))
+    assert len(set(offsets(generator).values())) > 1
+    assert all(0 <= offset < period for offset in offsets(generator).values())
+    assert offsets(generator) == offsets(oracle_generator(
+        count=20, reporting_interval=60, reporting_jitter=True))
+
+    with patch.object(simulation_configuration, "BLOCKS_PER_TIMESTEP", 1):
+        reports = np.concatenate([
+            generator.scheduled_reports(timestep) for timestep in range(1, period + 1)
+        ])
+    np.testing.assert_array_equal(np.sort(reports), np.arange(20))
+
+    unjittered = oracle_generator(count=20, reporting_interval=60)
+    assert [(schedule.period, schedule.offset) for schedule in unjittered.report_schedules] \
+        == [(period, 0)]
+
+
+def test_relative_deviation_triggers_reports():
+    """
+    Check that a provider reports a pair outside its schedule if the market
+    price deviates from the oracle rate by more than the relative threshold
+    """
+    generator = oracle_generator(
+        count=3, delay=0, price_threshold=0.02, reporting_interval=3600)
+    celo_usd, celo_eur, celo_brl = generator.oracle_pairs
+
+    def report(timestep, market_price, oracle_rate):
+        return generator.exchange_rate([], {
+            "timestep": timestep, "market_price": market_price, "oracle_rate": oracle_rate})
+
+    with patch.object(simulation_configuration, "BLOCKS_PER_TIMESTEP", 1):
+        oracle_rate = report(1, {celo_usd: 0.5, celo_eur: 0.5, celo_brl: 100.0}, None)
+        # a 4% deviation is reported, a 1.5% deviation of a larger price isn't
+        oracle_rate = report(2, {celo_usd: 0.52, celo_eur: 0.5, celo_brl: 101.5}, oracle_rate)
+        assert oracle_rate == {celo_usd: 0.52, celo_eur: 0.5, celo_brl: 100.0}
+        oracle_rate = report(3, {celo_usd: 0.53, celo_eur: 0.5, celo_brl: 103.0}, oracle_rate)
+        assert oracle_rate == {celo_usd: 0.52, celo_eur: 0.5, celo_brl: 103.0}
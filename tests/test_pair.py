@@ -0,0 +1,29 @@
+"""
+Tests of the pair rate conversions
+"""
+from model.types.base import CryptoAsset, Fiat, Stable
+from model.types.pair import Pair, Rate
+
+
+def test_get_rate_resolves_routes_per_market_pairs():
+    """
+    Check that cross rates follow the path of market pairs, also
+    when the same pair is requested for different market pairs
+    """
+    celo_usd, cusd_usd = Pair(CryptoAsset.CELO, Fiat.USD), Pair(Stable.CUSD, Fiat.USD)
+    state = {"market_price": {celo_usd: 3.0, cusd_usd: 1.01}}
+    expected = Rate(3.0, celo_usd) * Rate(1.01, cusd_usd)
+
+    for _ in range(2):
+        rate = Pair(CryptoAsset.CELO, Stable.CUSD).get_rate(state)
+        assert rate == expected
+    assert Pair(Fiat.USD, CryptoAsset.CELO).get_rate(state).value == 1 / 3.0
+
+    direct_state = {"market_price": {
+        **state["market_price"], Pair(CryptoAsset.CELO, Stable.CUSD): 2.5}}
+    assert Pair(CryptoAsset.CELO, Stable.CUSD).get_rate(direct_state).value == 2.5
+    assert Pair(CryptoAsset.CELO, Stable.CUSD).get_rate(state) == expected
+
+    # pairs added to the same dict are used for the following conversions
+    state["market_price"][Pair(CryptoAsset.CELO, Stable.CUSD)] = 2.5
+    assert Pair(CryptoAsset.CELO, Stable.CUSD).get_rate(state).value == 2.5
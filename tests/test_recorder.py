@@ -0,0 +1,27 @@
+"""
+Tests of the columnar run results
+"""
+from copy import deepcopy
+import pandas as pd
+from pandas._testing import assert_frame_equal
+
+from experiments.default_experiment import experiment
+from experiments.post_processing import dict_to_columns
+
+
+def test_columnar_results_match_dict_to_columns():
+    """
+    Check that the ColumnarRecorder records the same columns as
+    expanding radCAD's state dicts with dict_to_columns
+    """
+    experiment_1 = deepcopy(experiment)
+    for simulation in experiment_1.simulations:
+        simulation.timesteps = 100
+    experiment_2 = deepcopy(experiment_1)
+
+    df_1 = dict_to_columns(pd.DataFrame(experiment_1.run()))
+    experiment_2.engine.columnar_results = True
+    df_2 = experiment_2.run()
+
+    assert list(df_2.columns) == list(df_1.columns)
+    assert_frame_equal(df_1, df_2)
@@ -0,0 +1,29 @@
+"""
+Tests of the reserve statistics
+"""
+import pandas as pd
+
+from experiments.post_processing import dict_to_columns
+from model.parts.reserve import p_reserve_statistics, reserve_statistics
+from model.state_variables import initial_state
+from model.system_parameters import parameters
+
+
+def test_column_wise_reserve_statistics_match_block():
+    """
+    Check that the post processing reserve statistics are identical
+    to the ones of the state update block for the same states
+    """
+    states = [
+        {**initial_state, "market_price": {
+            pair: price * (1 + step / 100) ** index
+            for index, (pair, price) in enumerate(initial_state["market_price"].items())
+        }}
+        for step in range(5)
+    ]
+    params = {key: values[0] for key, values in parameters.items()}
+    dataframe = reserve_statistics(dict_to_columns(pd.DataFrame(states)), parameters)
+
+    for index, state in enumerate(states):
+        for key, value in p_reserve_statistics(params, 0, [], state).items():
+            assert dataframe[key][index] == value
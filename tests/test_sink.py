@@ -0,0 +1,61 @@
+"""
+Tests of streaming run results to a Parquet dataset
+"""
+from copy import deepcopy
+from pandas._testing import assert_frame_equal
+from pytest import raises
+
+from experiments.default_experiment import experiment
+from model.utils.sink import ParquetDataset, ParquetSink
+
+
+def test_parquet_dataset_reads_back_runs_in_order(tmp_path):
+    """
+    Check that runs written to a ParquetSink in parts are read back
+    in radCAD's result order and equal the in-memory columnar results
+    """
+    experiment_1 = deepcopy(experiment)
+    for simulation in experiment_1.simulations:
+        simulation.timesteps = 100
+        simulation.runs = 2
+        simulation.model.params["reserve_target_weight"] = [0.1, 0.2]
+    experiment_2 = deepcopy(experiment_1)
+
+    experiment_1.engine.columnar_results = True
+    df_1 = experiment_1.run()
+    experiment_2.engine.sink = ParquetSink(tmp_path, flush_every=30)
+    dataset = experiment_2.run()
+
+    assert isinstance(dataset, ParquetDataset)
+    # 101 rows per run are written in parts of 30 timesteps
+    assert len(list(tmp_path.glob("simulation=0/subset=1/run=2/part-*.parquet"))) == 4
+    assert [(df.run[0], df.subset[0]) for df in dataset] == [(1, 0), (1, 1), (2, 0), (2, 1)]
+    assert_frame_equal(df_1, dataset.read())
+
+    with raises(FileExistsError):
+        ParquetSink(tmp_path).prepare()
+
+
+def test_overwritten_dataset_only_contains_new_runs(tmp_path):
+    """
+    Check that writing a smaller experiment into the path of a previous one
+    with overwrite=True removes the partitions of the previous runs
+    """
+    experiment_1 = deepcopy(experiment)
+    for simulation in experiment_1.simulations:
+        simulation.timesteps = 50
+        simulation.runs = 2
+    experiment_2 = deepcopy(experiment_1)
+    for simulation in experiment_2.simulations:
+        simulation.runs = 1
+    experiment_3 = deepcopy(experiment_2)
+
+    experiment_1.engine.sink = ParquetSink(tmp_path)
+    experiment_1.run()
+    experiment_2.engine.sink = ParquetSink(tmp_path, overwrite=True)
+    dataset = experiment_2.run()
+
+    assert not (tmp_path / "simulation=0" / "subset=0" / "run=2").exists()
+    assert [df.run[0] for df in dataset] == [1]
+    experiment_3.engine.columnar_results = True
+    assert_frame_equal(experiment_3.run(), dataset.read())
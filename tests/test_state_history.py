@@ -0,0 +1,33 @@
+"""
+Tests of the bounded state history
+"""
+from pytest import raises
+
+from model.system_parameters import parameters
+from model.utils.state_history import StateHistory, history_size, lagged
+
+
+def test_bounded_state_history_matches_full_history():
+    """
+    Check that the StateHistory keeps exactly history_size timesteps
+    and that lagged values agree with radCAD's full state history
+    """
+    params = {key: values[0] for key, values in parameters.items()}
+    size = history_size(params)
+    assert size == max(oracle.delay for oracle in params["oracles"])
+
+    initial_state = {"timestep": 0}
+    state_history = StateHistory(size, initial_state)
+    full_history = [[initial_state]]
+    for timestep in range(1, 3 * size):
+        substeps = [{"timestep": timestep, "substep": substep} for substep in (1, 2)]
+        state_history.append(substeps)
+        full_history.append(substeps)
+
+        assert len(state_history) == min(timestep + 1, size)
+        for delay in range(1, len(state_history) + 1):
+            assert (lagged(state_history, "timestep", delay)
+                    == lagged(full_history, "timestep", delay))
+
+    with raises(AssertionError):
+        lagged(state_history, "timestep", size + 1)
@@ -0,0 +1,66 @@
+"""
+Tests of the trader strategies solving compiled cvxpy problems
+"""
+from types import SimpleNamespace
+from unittest.mock import patch
+import cvxpy
+import pytest
+
+from model.entities.strategies import SellMax
+from model.entities.strategies.trader_strategy import TraderStrategy
+from model.system_parameters import parameters
+from model.types.base import CryptoAsset, Fiat, MentoBuckets, MentoExchange
+from model.types.pair import Pair
+
+
+def sell_max_strategy():
+    parent = SimpleNamespace(
+        mento=SimpleNamespace(configs=parameters["mento_exchanges_config"][0]),
+        config=SimpleNamespace(exchange=MentoExchange.CUSD_CELO),
+    )
+    return SellMax(parent)
+
+
+def prev_state(celo_usd: float, bucket_stable: float):
+    return {
+        "market_price": {Pair(CryptoAsset.CELO, Fiat.USD): celo_usd},
+        "mento_buckets": {
+            MentoExchange.CUSD_CELO: MentoBuckets(stable=bucket_stable, reserve_asset=1000.0)
+        },
+    }
+
+
+def test_problem_is_compiled_once_per_trade_direction():
+    """
+    Check that acting timesteps re-solve the problem compiled for the
+    trade direction with updated parameters instead of compiling it again
+    """
+    strategy = sell_max_strategy()
+    with patch.object(TraderStrategy, "compile", autospec=True,
+                      side_effect=TraderStrategy.compile) as compile_problem:
+        for bucket_stable in [3000.0, 3100.0, 3200.0]:
+            strategy.optimize({}, prev_state(1.0, bucket_stable))
+        assert compile_problem.call_count == 1
+        assert strategy.parameters["bucket_stable"].value == 3200.0
+
+        strategy.optimize({}, prev_state(5.0, 3000.0))
+        strategy.optimize({}, prev_state(1.0, 3000.0))
+        assert compile_problem.call_count == 2
+    assert len(strategy.problems) == 2
+
+
+def test_single_bound_closed_form_matches_cvxpy():
+    """
+    Check that a problem maximising the sell amount subject to a single
+    bound is solved in closed form with the same solution as cvxpy
+    """
+    strategy = sell_max_strategy()
+    state = prev_state(1.0, 3000.0)
+    strategy.optimize({}, state)
+    compiled = strategy.problems[strategy.problem_key({}, state)]
+
+    assert compiled.bound is strategy.parameters["max_budget"]
+    compiled.problem.solve(solver=cvxpy.ECOS)
+    assert compiled.problem.status == "optimal"
+    assert strategy.sell_amount == pytest.approx(
+        compiled.variables["sell_amount"].value, rel=1e-6)
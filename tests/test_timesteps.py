@@ -0,0 +1,119 @@
+"""
+Tests of the coarse timestep mode
+"""
+from copy import deepcopy
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import pytest
+
+from experiments import simulation_configuration
+from experiments.default_experiment import experiment
+from model.constants import blocktime_seconds
+from model.generators.oracles import OracleRateGenerator
+from model.system_parameters import parameters
+from model.types.base import ImpactDelayType
+from model.types.configs import ImpactDelayConfig
+from model.utils.price_impact_valuator import PriceImpactValuator
+from model.utils.rng_provider import RNGProvider
+from model.utils.state_history import StateHistory
+from model.utils.timesteps import events_in_timestep
+
+
+@pytest.mark.parametrize("blocks_per_timestep", [1, 7, 12, 720])
+@pytest.mark.parametrize("period, offset", [(1, 0), (60, 0), (17280, 0), (7, 3)])
+def test_events_in_timestep_aggregate_blocks(blocks_per_timestep, period, offset):
+    """
+    Check that every block event is counted in exactly one timestep
+    """
+    blocks = np.arange(1, 10 * 17280 + 1)
+    with patch.object(simulation_configuration, "BLOCKS_PER_TIMESTEP", blocks_per_timestep):
+        timesteps = np.arange(1, len(blocks) // blocks_per_timestep + 1)
+        events = events_in_timestep(timesteps, period, offset)
+
+    block_events = (blocks - offset) % period == 0
+    assert events.sum() == block_events[:timesteps[-1] * blocks_per_timestep].sum()
+    if blocks_per_timestep == 1:
+        np.testing.assert_array_equal(events, block_events)
+
+
+def test_coarse_price_impact_compounds_blocks():
+    """
+    Check that a timestep spanning a whole impact delay kernel has the
+    same price impact as the blocks of the kernel one by one
+    """
+    params = {**{key: values[0] for key, values in parameters.items()},
+              'impact_delay': ImpactDelayConfig(model=ImpactDelayType.NBLOCKS, param_1=10)}
+    pair = params['impacted_assets'][0]
+    supply, pre_supply = {pair.base: 1e6}, {pair.base: 0}
+
+    block_valuator = PriceImpactValuator(params['impacted_assets'], 100)
+    block_impact = np.prod([
+        1 + block_valuator.relative_price_impact(
+            supply, pre_supply if step == 0 else supply, step, params)[pair]
+        for step in range(10)
+    ])
+
+    with patch.object(simulation_configuration, "BLOCKS_PER_TIMESTEP", 10):
+        coarse_valuator = PriceImpactValuator(params['impacted_assets'], 10)
+    coarse_impact = 1 + coarse_valuator.relative_price_impact(
+        supply, pre_supply, 0, params)[pair]
+
+    assert coarse_impact == pytest.approx(block_impact, rel=1e-12)
+
+
+def test_coarse_oracle_delay_lags_market_price():
+    """
+    Check that in the report block, which sees the market prices of the
+    current timestep, a delay of one timestep reports the market prices
+    of the previous timestep and a delay within a timestep interpolates
+    toward the market prices of the next older timestep
+    """
+    pairs = parameters["oracle_pairs"][0]
+
+    def state(timestep):
+        return {"timestep": timestep,
+                "market_price": {pair: 2.0 ** timestep * (index + 1)
+                                 for index, pair in enumerate(pairs)}}
+
+    state_history = StateHistory(4, state(0))
+    for timestep in range(1, 4):
+        state_history.append([state(timestep)])
+    prev_state = state(4)
+    with patch.object(simulation_configuration, "BLOCKS_PER_TIMESTEP", 10):
+        generator = OracleRateGenerator([], pairs, RNGProvider(1, 0))
+
+        def lagged_market_price(delay):
+            return generator.lagged_market_price(state_history, prev_state, delay)
+
+        def market_price(timestep):
+            return generator.pair_values(state(timestep)["market_price"])
+
+        np.testing.assert_array_equal(lagged_market_price(0), market_price(4))
+        np.testing.assert_array_equal(lagged_market_price(10), market_price(3))
+        np.testing.assert_allclose(
+            lagged_market_price(5), np.sqrt(market_price(4) * market_price(3)))
+        np.testing.assert_allclose(
+            lagged_market_price(12), market_price(3) * 2 ** -0.2)
+        np.testing.assert_array_equal(lagged_market_price(30), market_price(1))
+
+
+def test_oracle_delay_of_a_block_reports_previous_timestep():
+    """
+    Check that oracles with a delay of one block, reporting on every
+    block, report the market price at the end of the previous timestep
+    """
+    short_experiment = deepcopy(experiment)
+    for simulation in short_experiment.simulations:
+        simulation.timesteps = 50
+        simulation.runs = 1
+        simulation.model.params["oracles"] = [[
+            oracle._replace(delay=1, reporting_interval=blocktime_seconds)
+            for oracle in simulation.model.params["oracles"][0]
+        ]]
+    with patch.object(simulation_configuration, "BLOCKS_PER_TIMESTEP", 1):
+        df = pd.DataFrame(short_experiment.run())
+
+    for pair in parameters["oracle_pairs"][0]:
+        np.testing.assert_array_equal(
+            df[f"oracle_rate_{pair}"][2:], df[f"market_price_{pair}"].shift(1)[2:])